@@ -0,0 +1,91 @@
+"""
+Benchmark vault writes under each VAULT_DURABILITY mode.
+
+Measures the latency of the three write shapes the bot uses: appending a
+daily-note section, creating a new note, and patching one line of a large
+project note (/done). Run it against the disk your vault lives on:
+
+    uv run python scripts/bench_vault_writes.py --dir /path/on/vault/disk -n 200
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Settings need these to load; the benchmark never talks to Telegram
+for key, value in {
+    "TELEGRAM_TOKEN": "bench",
+    "TELEGRAM_USER_ID": "0",
+    "ELEVENLABS_API_KEY": "bench",
+    "VAULT_PATH": tempfile.gettempdir(),
+}.items():
+    os.environ.setdefault(key, value)
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config import settings  # noqa: E402
+from src.services import vault_writer  # noqa: E402
+
+SECTION = b"\n### 12:00\nA captured thought, about one line long.\n"
+NOTE = b"---\ndateCreated: 2026-01-01\n---\n" + SECTION * 3
+PROJECT_LINES = 20_000  # ~0.5 MB note for the /done case
+
+
+def _timed(fn, n: int) -> list[float]:
+    samples = []
+    for i in range(n):
+        start = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def bench_mode(mode: str, root: Path, n: int) -> dict[str, list[float]]:
+    settings.vault_durability = mode
+    folder = root / mode
+    folder.mkdir()
+
+    daily = folder / "daily.md"
+    project = folder / "project.md"
+    # Fixed-width lines, so line i starts at i * len(line)
+    line = b"- [ ] #to/do task %06d\n"
+    project.write_bytes(b"".join(line % i for i in range(PROJECT_LINES)))
+    width = len(line % 0)
+
+    def patch_line(i: int) -> None:
+        vault_writer.replace_span(project, i * width, b"- [ ]", b"- [x]")
+
+    results = {
+        "append": _timed(lambda i: vault_writer.append_bytes(daily, SECTION), n),
+        "create": _timed(lambda i: vault_writer.create_unique(folder / "note.md", NOTE), n),
+        "patch": _timed(patch_line, min(n, 50)),
+    }
+    vault_writer.flush_pending()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dir", type=Path, help="Folder on the disk to test (default: temp)")
+    parser.add_argument("-n", type=int, default=200, help="Writes per case (default: 200)")
+    parser.add_argument("--group-ms", type=int, default=settings.vault_group_commit_ms)
+    args = parser.parse_args()
+    settings.vault_group_commit_ms = args.group_ms
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        print(f"{'mode':<6} {'case':<7} {'p50 ms':>8} {'p99 ms':>8} {'ops/s':>8}")
+        for mode in ("none", "group", "fsync"):
+            for case, samples in bench_mode(mode, Path(tmp), args.n).items():
+                samples.sort()
+                p50 = statistics.median(samples)
+                p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+                ops = len(samples) / (sum(samples) / 1000)
+                print(f"{mode:<6} {case:<7} {p50:>8.3f} {p99:>8.3f} {ops:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
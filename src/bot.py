@@ -2,18 +2,34 @@
 
 import structlog
 from telegram import Update
-from telegram.ext import Application, CommandHandler, MessageHandler, filters
+from telegram.ext import (
+    Application,
+    CallbackQueryHandler,
+    CommandHandler,
+    MessageHandler,
+    filters,
+)
 
 from src.config import settings
 from src.handlers import handle_document, handle_photo, handle_text, handle_voice
+from src.handlers.capture_buffer import flush_all_captures
+from src.handlers.capture_worker import start_capture_worker, stop_capture_worker
 from src.handlers.commands import (
+    TASK_PAGE_CALLBACK,
     handle_daily,
     handle_done,
     handle_task,
+    handle_task_find,
     handle_task_list,
+    handle_task_list_page,
     handle_undo,
 )
+from src.handlers.media_group import flush_all_albums
+from src.handlers.reminders import start_reminders
 from src.handlers.video import handle_video, handle_video_note
+from src.services.executor import loop_lag_monitor, shutdown_executor
+from src.services.vault_watcher import start_vault_watcher
+from src.services.vault_writer import flush_pending
 
 structlog.configure(
     processors=[
@@ -29,11 +45,49 @@ def user_filter() -> filters.BaseFilter:
     return filters.User(user_id=settings.telegram_user_id)
 
 
+async def post_init(app: Application) -> None:
+    """Start background monitors, reminders and the capture worker once the loop runs."""
+    loop_lag_monitor.start()
+    app.bot_data["reminders"] = start_reminders(app)
+    start_capture_worker(app.bot)
+
+
+async def post_stop(app: Application) -> None:
+    """Write albums and captures still being buffered while the bot can reply."""
+    await flush_all_albums()
+    await flush_all_captures()
+    # Journaled captures not written yet are replayed on the next start
+    await stop_capture_worker()
+
+
+async def post_shutdown(app: Application) -> None:
+    """Stop background monitors and reminders, and drain pending vault I/O."""
+    if reminders := app.bot_data.get("reminders"):
+        reminders.stop()
+    await loop_lag_monitor.stop()
+    stats = loop_lag_monitor.stats
+    log.info(
+        "event_loop_lag_summary",
+        blocked_count=stats.blocked_count,
+        blocked_ms=round(stats.blocked_seconds * 1000),
+        max_lag_ms=round(stats.max_lag_seconds * 1000),
+    )
+    shutdown_executor()
+    flush_pending()
+
+
 def main() -> None:
     """Start the bot."""
     log.info("starting_bot", user_id=settings.telegram_user_id)
 
-    app = Application.builder().token(settings.telegram_token).build()
+    app = (
+        Application.builder()
+        .token(settings.telegram_token)
+        .post_init(post_init)
+        .post_stop(post_stop)
+        .post_shutdown(post_shutdown)
+        .build()
+    )
 
     # Register handlers with user whitelist filter
     allowed = user_filter()
@@ -43,8 +97,12 @@ def main() -> None:
     app.add_handler(CommandHandler("daily", handle_daily, filters=allowed))
     app.add_handler(CommandHandler("task", handle_task, filters=allowed))
     app.add_handler(CommandHandler("task_list", handle_task_list, filters=allowed))
+    app.add_handler(CommandHandler("task_find", handle_task_find, filters=allowed))
     app.add_handler(CommandHandler("done", handle_done, filters=allowed))
 
+    # /task_list page buttons (the callback checks the user itself)
+    app.add_handler(CallbackQueryHandler(handle_task_list_page, pattern=TASK_PAGE_CALLBACK))
+
     # Message handlers
     app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND & allowed, handle_text))
     app.add_handler(MessageHandler(filters.VOICE & allowed, handle_voice))
@@ -53,8 +111,15 @@ def main() -> None:
     app.add_handler(MessageHandler(filters.VIDEO_NOTE & allowed, handle_video_note))
     app.add_handler(MessageHandler(filters.Document.ALL & allowed, handle_document))
 
+    # Keep the task index hot so /task_list never scans the vault
+    watcher = start_vault_watcher()
+
     log.info("bot_ready")
-    app.run_polling(allowed_updates=Update.ALL_TYPES)
+    try:
+        app.run_polling(allowed_updates=Update.ALL_TYPES)
+    finally:
+        if watcher:
+            watcher.stop()
 
 
 if __name__ == "__main__":
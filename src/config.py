@@ -1,6 +1,8 @@
 """Configuration via pydantic-settings with env var support."""
 
+from datetime import time
 from pathlib import Path
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -26,6 +28,14 @@ class Settings(BaseSettings):
     # Note formatting
     note_filename_format: str = "%Y-%m-%d %H%M"
     timezone: str = "Europe/Rome"
+    # Captures less than this many seconds apart become one note/section (0 = off)
+    capture_coalesce_seconds: float = 0.0
+    # Journal each capture in DATA_DIR and reply at once; a background worker writes the vault
+    capture_journal: bool = False
+
+    # Vault scanning: hidden folders are always skipped; these add to them
+    vault_ignore_globs: list[str] = []  # e.g. ["Templates", "/archive/old"]
+    vault_use_obsidian_excludes: bool = True  # Honour "Excluded files" from .obsidian/app.json
 
     # Daily notes
     daily_notes_folder: str = "calendar/days"
@@ -35,7 +45,31 @@ class Settings(BaseSettings):
     task_inbox_file: str = "+/task-inbox.md"
     task_tag: str = "#to/do"
     task_tag_followup: str = "#to/follow-up"
-    task_list_limit: int = 10
+    task_list_limit: int = 10  # Tasks per /task_list page
+    task_list_max_results: int = 200  # Tasks kept for paging through one /task_list
+    task_duplicates: Literal["warn", "skip", "allow"] = "warn"  # Re-sent open tasks
+    task_list_sort: Literal["recent", "due", "overdue"] = "overdue"  # Default /task_list order
+    task_index_enabled: bool = True  # Answer /task_list from the persistent task index
+    vault_watcher: Literal["auto", "inotify", "poll", "off"] = "auto"  # Keeps the index hot
+    vault_poll_seconds: float = 30.0  # Reconcile interval when inotify is unavailable
+    task_scan_workers: int = 8  # Threads reading notes during scans (1 = sequential)
+
+    # Due-date reminders (times in TIMEZONE; unset = off)
+    reminder_digest_time: time | None = None  # Daily digest of overdue and due-today tasks
+    reminder_task_time: time | None = None  # One message per task on its due date
+
+    # Bot state (task index, journals) kept outside the vault
+    data_dir: Path = Path("data")
+    undo_depth: int = 20  # Vault writes /undo can step back through (kept across restarts)
+
+    # Vault write durability: "fsync" (every write), "group" (flush every N ms) or "none"
+    vault_durability: Literal["none", "fsync", "group"] = "fsync"
+    vault_group_commit_ms: int = 50
+
+    # Concurrency
+    vault_io_workers: int = 4  # Threads for blocking vault I/O used by handlers
+    album_download_workers: int = 4  # Concurrent downloads per album (media group)
+    loop_lag_threshold_ms: int = 100  # Log event_loop_blocked above this delay
 
     @property
     def inbox_path(self) -> Path:
@@ -53,5 +87,17 @@ class Settings(BaseSettings):
     def task_inbox_path(self) -> Path:
         return self.vault_path / self.task_inbox_file
 
+    @property
+    def task_index_path(self) -> Path:
+        return self.data_dir / "task-index.sqlite3"
+
+    @property
+    def undo_journal_path(self) -> Path:
+        return self.data_dir / "undo-journal.sqlite3"
+
+    @property
+    def capture_journal_path(self) -> Path:
+        return self.data_dir / "capture-journal.sqlite3"
+
 
 settings = Settings()
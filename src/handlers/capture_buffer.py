@@ -0,0 +1,155 @@
+"""Coalesce bursts of captures into one note or one daily section."""
+
+import asyncio
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import structlog
+from telegram import Message
+from telegram.ext import ContextTypes
+
+from src.config import settings
+from src.services.executor import run_blocking
+from src.services.note_writer import create_note
+from src.services.undo_journal import record_capture
+
+log = structlog.get_logger()
+
+# Flush early once a batch holds this many captures
+_MAX_BATCH = 100
+
+_FLUSH_FAILED = "❌ Capture failed; retrying with your next message"
+
+
+@dataclass
+class _Batch:
+    """Captures buffered for one chat, written together when the chat goes quiet."""
+
+    is_daily: bool
+    message: Message  # Latest message; the batch reply goes to it
+    reply: str
+    parts: list[str] = field(default_factory=list)
+    attachments: list[Path] = field(default_factory=list)
+    timer: asyncio.Task | None = None
+
+
+_batches: dict[int, _Batch] = {}
+
+
+def coalescing_enabled() -> bool:
+    """True if CAPTURE_COALESCE_SECONDS is set."""
+    return settings.capture_coalesce_seconds > 0
+
+
+def capture_body(content: str, wikilink_path: str | None) -> str:
+    """Note body for one capture, embedding its attachment like create_note does."""
+    if not wikilink_path:
+        return content
+    return f"{content}\n\n![[{wikilink_path}]]" if content else f"![[{wikilink_path}]]"
+
+
+async def buffer_capture(
+    message: Message,
+    context: ContextTypes.DEFAULT_TYPE,
+    content: str,
+    attachment: tuple[Path, str] | None = None,
+    reply: str = "✓ Captured",
+) -> None:
+    """
+    Queue a capture for its chat; the batch is written once no capture
+    has arrived for CAPTURE_COALESCE_SECONDS.
+
+    Args:
+        message: The captured message (the batch reply goes to the latest one)
+        context: Handler context; daily mode lives in its user_data
+        content: Note text for this capture
+        attachment: Saved attachment as (file path, wikilink path)
+        reply: Reply used if the batch ends up holding only this capture
+    """
+    chat_id = message.chat_id
+    is_daily = context.user_data.get("daily_mode", False)
+
+    batch = _batches.get(chat_id)
+    if batch is not None and batch.is_daily != is_daily:
+        # Daily mode was toggled mid-burst: the old batch goes where it started
+        try:
+            await flush_captures(chat_id)
+            batch = None
+        except Exception as e:
+            # The old batch was kept; this capture joins it rather than being lost
+            log.error("capture_flush_failed", chat_id=chat_id, error=str(e))
+            await batch.message.reply_text(_FLUSH_FAILED)
+    if batch is None:
+        batch = _batches[chat_id] = _Batch(is_daily, message, reply)
+    elif batch.timer is not None:
+        batch.timer.cancel()
+
+    file_path, wikilink_path = attachment or (None, None)
+    batch.parts.append(capture_body(content, wikilink_path))
+    if file_path:
+        batch.attachments.append(file_path)
+    batch.message, batch.reply = message, reply
+
+    if len(batch.parts) >= _MAX_BATCH:
+        await flush_captures(chat_id)
+    else:
+        batch.timer = asyncio.create_task(_flush_later(chat_id, batch))
+
+
+async def _flush_later(chat_id: int, batch: _Batch) -> None:
+    await asyncio.sleep(settings.capture_coalesce_seconds)
+    if _batches.get(chat_id) is batch:
+        try:
+            await flush_captures(chat_id)
+        except Exception as e:
+            log.error("capture_flush_failed", chat_id=chat_id, error=str(e))
+            await batch.message.reply_text(_FLUSH_FAILED)
+
+
+def _restore(chat_id: int, batch: _Batch) -> None:
+    """Put a batch that failed to write back in front of anything buffered since."""
+    newer = _batches.get(chat_id)
+    if newer is not None:
+        if newer.timer is not None:
+            newer.timer.cancel()
+        batch.parts += newer.parts
+        batch.attachments += newer.attachments
+        batch.message, batch.reply = newer.message, newer.reply
+    batch.timer = None  # Written with the chat's next capture, /undo or shutdown
+    _batches[chat_id] = batch
+
+
+async def flush_captures(chat_id: int) -> None:
+    """Write the chat's buffered captures now, as one note or daily section."""
+    batch = _batches.pop(chat_id, None)
+    if batch is None:
+        return
+    if batch.timer is not None and batch.timer is not asyncio.current_task():
+        batch.timer.cancel()
+
+    content = "\n\n".join(batch.parts)
+    section = None
+    try:
+        if batch.is_daily:
+            from src.services.daily_notes import append_to_daily
+
+            section = await run_blocking(append_to_daily, content=content)
+            note_path = section.path
+        else:
+            note_path = await run_blocking(create_note, content=content)
+    except BaseException:
+        _restore(chat_id, batch)
+        raise
+    log.info("captures_flushed", path=str(note_path), count=len(batch.parts))
+
+    # Undo removes the whole batch: its note or section and every attachment
+    await run_blocking(record_capture, note_path, batch.attachments, section)
+
+    count = len(batch.parts)
+    await batch.message.reply_text(batch.reply if count == 1 else f"✓ Captured {count} messages")
+
+
+async def flush_all_captures() -> None:
+    """Write every pending batch (on shutdown)."""
+    for chat_id in list(_batches):
+        await flush_captures(chat_id)
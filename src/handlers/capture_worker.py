@@ -0,0 +1,350 @@
+"""
+Acknowledge captures at once and write them to the vault in the background.
+
+With CAPTURE_JOURNAL on, a handler only commits the capture to the capture
+journal and replies. The worker then downloads, transcribes and writes it
+(through create_note / append_to_daily, so undo and coalescing behave as
+before), and drops it from the journal once it is in the vault. A capture
+that fails (vault unmounted, Scribe down) is retried with backoff; the
+journal is replayed on startup, so nothing acknowledged is lost. One that
+can never succeed (Telegram refuses the file: too big, expired file_id)
+is dropped and the user told. Delivery
+is at least once: a crash between the vault write and the journal update
+can write a capture twice, never zero times.
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from pathlib import Path
+
+import structlog
+from telegram import Bot, Message, ReplyParameters
+from telegram.error import BadRequest
+from telegram.ext import ContextTypes
+
+from src.config import settings
+from src.handlers.capture_buffer import capture_body
+from src.services.capture_journal import CaptureJournal, get_capture_journal
+from src.services.executor import run_blocking
+from src.services.file_manager import download_attachment
+from src.services.note_writer import create_note
+from src.services.undo_journal import record_capture
+
+log = structlog.get_logger()
+
+# Longest wait between retries of a failed capture
+_MAX_RETRY_DELAY = 300.0
+# Tell the user once a capture has failed this many times in a row
+_NOTIFY_AFTER = 3
+# Seconds to let an in-flight capture finish on shutdown
+_STOP_TIMEOUT = 10.0
+# Pause after an unexpected worker error (e.g. the journal is unreadable)
+_ERROR_DELAY = 5.0
+
+
+def journal_enabled() -> bool:
+    """True if CAPTURE_JOURNAL is set."""
+    return settings.capture_journal
+
+
+async def queue_capture(
+    message: Message,
+    context: ContextTypes.DEFAULT_TYPE,
+    content: str = "",
+    *,
+    file_id: str | None = None,
+    save_as: tuple[str, str] | None = None,
+    transcribe: str | None = None,
+    album: list[dict] | None = None,
+    reply: str = "✓ Captured",
+) -> None:
+    """
+    Journal a capture and acknowledge it; the worker writes it to the vault.
+
+    Args:
+        message: The captured message
+        context: Handler context; daily mode lives in its user_data
+        content: Note text known up front (text, caption, filename line)
+        file_id: Telegram file to download
+        save_as: (extension, prefix) to save the file as an attachment
+        transcribe: "voice" (note is the transcription) or "video" (appended)
+        album: Album items (media_group.AlbumItem fields), written as one note
+        reply: Acknowledgement sent once the capture is journaled
+    """
+    entry = {
+        "chat_id": message.chat_id,
+        "message_id": message.message_id,
+        "date": message.date.isoformat(),
+        "daily": context.user_data.get("daily_mode", False),
+        "content": content,
+        "reply": reply,
+        "file_id": file_id,
+        "save_as": list(save_as) if save_as else None,
+        "transcribe": transcribe,
+        "album": album,
+    }
+    seq = await run_blocking(get_capture_journal().append, entry)
+    log.info("capture_queued", seq=seq, transcribe=transcribe, attachment=save_as is not None)
+    if _worker is not None:
+        _worker.notify()
+    await message.reply_text(reply)
+
+
+def _note_content(entry: dict) -> str:
+    """Note body for one journaled capture, attachment embeds included."""
+    if entry.get("album"):
+        return "\n\n".join(capture_body(text, wikilink) for _, wikilink, text in entry["files"])
+    if entry["transcribe"] == "voice":
+        content = entry["transcription"]
+    elif entry["transcribe"] == "video":
+        from src.handlers.video import build_video_note_content
+
+        content = build_video_note_content(entry["content"], entry["transcription"])
+    else:
+        content = entry["content"]
+    return capture_body(content, entry.get("wikilink"))
+
+
+class _UnusableCaptureError(Exception):
+    """The capture cannot produce a note (e.g. no speech); tell the user and forget it."""
+
+
+class CaptureWorker:
+    """Background task writing journaled captures to the vault, oldest first."""
+
+    def __init__(self, bot: Bot, journal: CaptureJournal) -> None:
+        self.bot = bot
+        self.journal = journal
+        self._wake = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._last_queued = 0.0
+        self._draining = False
+        self._stopping = False
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Let the capture in flight finish; the rest stays journaled for the next start."""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wake.set()
+        try:
+            await asyncio.wait_for(self._task, _STOP_TIMEOUT)
+        except (TimeoutError, asyncio.CancelledError):
+            pass
+        self._task = None
+
+    def notify(self) -> None:
+        """A capture was journaled."""
+        self._last_queued = asyncio.get_running_loop().time()
+        self._idle.clear()
+        self._wake.set()
+
+    async def drain(self, timeout: float) -> bool:
+        """
+        Write everything that is due now, skipping the coalescing wait.
+
+        Returns:
+            True if nothing due is left; captures postponed after a failure
+            are waiting for their retry and don't count
+        """
+        self._draining = True
+        self.notify()
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except TimeoutError:
+            pass
+        finally:
+            self._draining = False
+        return not await run_blocking(self.journal.due)
+
+    async def _sleep(self, seconds: float | None) -> None:
+        """Sleep until `seconds` pass or a capture is journaled."""
+        try:
+            await asyncio.wait_for(self._wake.wait(), seconds)
+        except TimeoutError:
+            pass
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await self._cycle()
+            except Exception as e:
+                # Keep the worker alive; the journal still holds every capture
+                log.error("capture_worker_failed", error=str(e))
+                await self._sleep(_ERROR_DELAY)
+
+    async def _cycle(self) -> None:
+        """Prepare and write what is due, or sleep until something is."""
+        loop = asyncio.get_running_loop()
+        self._wake.clear()
+        due = await run_blocking(self.journal.due)
+        if not due:
+            self._idle.set()
+            next_try = await run_blocking(self.journal.next_try)
+            await self._sleep(None if next_try is None else max(0.0, next_try - time.time()))
+            return
+
+        ready = []
+        for seq, entry in due:
+            if self._stopping:
+                return
+            try:
+                await self._prepare(seq, entry)
+                ready.append((seq, entry))
+            except _UnusableCaptureError as e:
+                await self._drop(seq, entry, str(e))
+            except BadRequest as e:
+                # Telegram won't serve this file (too big, expired file_id); retrying can't help
+                await self._drop(seq, entry, f"❌ Could not download the file: {e.message}")
+            except Exception as e:
+                await self._failed([(seq, entry)], e)
+
+        # Coalescing: wait for the chat to go quiet, then write the burst at once
+        queued = self._last_queued
+        while settings.capture_coalesce_seconds > 0 and not (self._draining or self._stopping):
+            remaining = self._last_queued + settings.capture_coalesce_seconds - loop.time()
+            if remaining <= 0:
+                break
+            await self._sleep(remaining)
+        if self._last_queued != queued and not self._stopping:
+            return  # More arrived: start over, prepared captures are checkpointed
+
+        for group in self._groups(ready):
+            try:
+                await self._write(group)
+            except Exception as e:
+                await self._failed(group, e)
+
+    async def _prepare(self, seq: int, entry: dict) -> None:
+        """Save the attachment and transcribe, checkpointing each step in the journal."""
+        if entry.get("album"):
+            if "files" not in entry:
+                from src.handlers.media_group import AlbumItem, fetch_album
+
+                files = await fetch_album(self.bot, [AlbumItem(**i) for i in entry["album"]])
+                entry["files"] = [[str(path), wikilink, text] for path, wikilink, text in files]
+                await run_blocking(self.journal.update, seq, entry)
+            return
+
+        if entry["save_as"] and "file" not in entry:
+            file = await self.bot.get_file(entry["file_id"])
+            extension, prefix = entry["save_as"]
+            file_path, wikilink_path = await download_attachment(file, extension, prefix=prefix)
+            entry["file"], entry["wikilink"] = str(file_path), wikilink_path
+            await run_blocking(self.journal.update, seq, entry)
+
+        if entry["transcribe"] and "transcription" not in entry:
+            if entry["transcribe"] == "voice":
+                from src.services.transcription import transcribe_voice
+
+                file = await self.bot.get_file(entry["file_id"])
+                transcription = await transcribe_voice(bytes(await file.download_as_bytearray()))
+                if not transcription:
+                    raise _UnusableCaptureError("❌ No speech detected")
+            else:
+                from src.handlers.video import transcribe_video
+
+                # A video is kept without its transcript, as when captured inline
+                transcription = await transcribe_video(
+                    Path(entry["file"]), "video_transcription_failed"
+                )
+            entry["transcription"] = transcription or ""
+            await run_blocking(self.journal.update, seq, entry)
+
+    @staticmethod
+    def _groups(ready: list[tuple[int, dict]]) -> list[list[tuple[int, dict]]]:
+        """One group per capture, or per run of same-chat, same-mode captures when coalescing."""
+        if settings.capture_coalesce_seconds <= 0:
+            return [[item] for item in ready]
+        groups: list[list[tuple[int, dict]]] = []
+        for seq, entry in ready:
+            last = groups[-1][-1][1] if groups else None
+            if last and (last["chat_id"], last["daily"]) == (entry["chat_id"], entry["daily"]):
+                groups[-1].append((seq, entry))
+            else:
+                groups.append([(seq, entry)])
+        return groups
+
+    async def _write(self, group: list[tuple[int, dict]]) -> None:
+        """Write one note or daily section for `group`, record undo, then forget it."""
+        first = group[0][1]
+        when = datetime.fromisoformat(first["date"])
+        content = "\n\n".join(_note_content(entry) for _, entry in group)
+        section = None
+        if first["daily"]:
+            from src.services.daily_notes import append_to_daily
+
+            section = await run_blocking(append_to_daily, content=content, when=when)
+            note_path = section.path
+        else:
+            note_path = await run_blocking(create_note, content=content, when=when)
+        attachments = []
+        for _, entry in group:
+            if "file" in entry:
+                attachments.append(Path(entry["file"]))
+            attachments.extend(Path(path) for path, _, _ in entry.get("files", []))
+        await run_blocking(record_capture, note_path, attachments, section)
+        await run_blocking(self.journal.remove, [seq for seq, _ in group])
+        log.info("capture_written", path=str(note_path), count=len(group))
+
+    async def _failed(self, group: list[tuple[int, dict]], error: Exception) -> None:
+        for seq, entry in group:
+            attempts, delay = await run_blocking(self.journal.retry_later, seq, _MAX_RETRY_DELAY)
+            log.warning("capture_retry", seq=seq, attempts=attempts, delay=delay, error=str(error))
+            if attempts == _NOTIFY_AFTER:
+                await self._tell(entry, "⚠️ Not saved to the vault yet; retrying in the background")
+
+    async def _drop(self, seq: int, entry: dict, reason: str) -> None:
+        await run_blocking(self.journal.remove, [seq])
+        log.info("capture_dropped", seq=seq, reason=reason)
+        await self._tell(entry, reason)
+
+    async def _tell(self, entry: dict, text: str) -> None:
+        try:
+            await self.bot.send_message(
+                entry["chat_id"],
+                text,
+                reply_parameters=ReplyParameters(
+                    entry["message_id"], allow_sending_without_reply=True
+                ),
+            )
+        except Exception as e:
+            log.warning("capture_notify_failed", error=str(e))
+
+
+_worker: CaptureWorker | None = None
+
+
+def start_capture_worker(bot: Bot) -> CaptureWorker | None:
+    """Start the capture worker if CAPTURE_JOURNAL is on, replaying what a crash left behind."""
+    global _worker
+    if not journal_enabled():
+        return None
+    journal = get_capture_journal()
+    journal.retry_all_now()
+    if pending := len(journal):
+        log.info("capture_journal_replay", pending=pending)
+    _worker = CaptureWorker(bot, journal)
+    _worker.start()
+    return _worker
+
+
+async def stop_capture_worker() -> None:
+    """Stop the worker; captures not yet written stay journaled."""
+    global _worker
+    if _worker is not None:
+        await _worker.stop()
+        _worker = None
+
+
+async def drain_captures(timeout: float = 30.0) -> bool:
+    """Write journaled captures now (before /undo). Returns True if none are due."""
+    if _worker is None:
+        return True
+    return await _worker.drain(timeout)
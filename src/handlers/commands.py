@@ -1,80 +1,63 @@
-"""Command handlers for /undo and /daily."""
+"""Command handlers for /undo, /daily and the task commands."""
 
 import re
 
 import structlog
-from telegram import Update
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.ext import ContextTypes
 
-log = structlog.get_logger()
-
-
-def _remove_last_daily_section(note_path, section_time: str) -> bool:
-    """Remove the last section from a daily note. Returns True if section removed."""
-    if not note_path.exists():
-        return False
-
-    content = note_path.read_text(encoding="utf-8")
-
-    # Find ALL sections matching ### HH:MM pattern and remove only the LAST one
-    # Section starts with ### HH:MM and ends at next ### or end of file
-    pattern = rf"\n### {re.escape(section_time)}\n.*?(?=\n### |\Z)"
-    matches = list(re.finditer(pattern, content, flags=re.DOTALL))
+from src.services.executor import run_blocking
 
-    if not matches:
-        return False
+log = structlog.get_logger()
 
-    # Remove the last match
-    last_match = matches[-1]
-    new_content = content[: last_match.start()] + content[last_match.end() :]
 
-    note_path.write_text(new_content, encoding="utf-8")
-    return True
+def _format_undo_step(done: dict[str, list[str]]) -> str:
+    if not done:
+        return "Already undone"
+    return "; ".join(f"{verb}: {', '.join(items)}" for verb, items in done.items())
 
 
 async def handle_undo(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Handle /undo command - deletes last captured note/section and attachments."""
+    """Handle /undo [N] command - reverses the last N vault writes (default 1).
+
+    Captures (note or daily section plus attachments), added tasks and
+    /done completions are each one step. Steps are kept on disk, so /undo
+    works across restarts, up to UNDO_DEPTH steps back.
+    """
     message = update.message
     if not message:
         return
 
-    last_capture = context.user_data.get("last_capture")
-    if not last_capture:
-        await message.reply_text("Nothing to undo")
+    args = context.args or []
+    if len(args) > 1 or (args and not (args[0].isdecimal() and int(args[0]) > 0)):
+        await message.reply_text("Usage: /undo [N]")
+        return
+    steps = int(args[0]) if args else 1
+
+    # Albums and captures still waiting in the coalescing window or the
+    # capture journal are written first, so /undo removes the batch they belong to
+    from src.handlers.capture_buffer import flush_captures
+    from src.handlers.capture_worker import drain_captures
+    from src.handlers.media_group import flush_all_albums
+
+    await flush_all_albums()
+    await flush_captures(message.chat_id)
+    if not await drain_captures():
+        await message.reply_text("⏳ Some captures are not in the vault yet; try /undo again later")
         return
 
-    note_path = last_capture.get("note_path")
-    attachments = last_capture.get("attachments", [])
-    is_daily = last_capture.get("is_daily", False)
-    section_time = last_capture.get("section_time")
-    deleted_items = []
+    from src.services.undo_journal import undo_last
 
-    if is_daily and section_time:
-        # Remove only the last section from daily note
-        if note_path and _remove_last_daily_section(note_path, section_time):
-            deleted_items.append(f"section {section_time}")
-            log.info("daily_section_removed", path=str(note_path), time=section_time)
-    else:
-        # Delete entire note (non-daily mode)
-        if note_path and note_path.exists():
-            note_path.unlink()
-            deleted_items.append(note_path.name)
-            log.info("note_deleted", path=str(note_path))
-
-    # Delete attachments
-    for attachment_path in attachments:
-        if attachment_path and attachment_path.exists():
-            attachment_path.unlink()
-            deleted_items.append(attachment_path.name)
-            log.info("attachment_deleted", path=str(attachment_path))
-
-    # Clear last_capture (single-use undo)
-    context.user_data["last_capture"] = None
-
-    if deleted_items:
-        await message.reply_text(f"Deleted: {', '.join(deleted_items)}")
-    else:
-        await message.reply_text("Files already removed")
+    results = await run_blocking(undo_last, steps)
+    if not results:
+        await message.reply_text("Nothing to undo")
+        return
+
+    log.info("undo", steps=len(results))
+    lines = [_format_undo_step(done) for done in results]
+    if len(results) < steps:
+        lines.append(f"Nothing more to undo ({len(results)} of {steps})")
+    await message.reply_text("\n".join(lines))
 
 
 async def handle_daily(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -111,6 +94,8 @@ async def handle_task(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
         --follow-up: Use #to/follow-up tag instead of #to/do
         --YYYY-MM-DD or --today/--tomorrow: Set due date
         Note: Telegram may convert -- to em-dash (—), both work
+
+    A multi-line body adds one task per line, each with its own flags.
     """
     message = update.message
     if not message:
@@ -121,7 +106,23 @@ async def handle_task(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
         await message.reply_text("Usage: /task Buy milk [--follow-up] [--today]")
         return
 
-    from src.services.task_manager import add_task, parse_date_arg
+    from src.services.task_manager import (
+        add_task_checked,
+        add_tasks,
+        format_added_reply,
+        format_duplicate_reply,
+        parse_date_arg,
+    )
+
+    # context.args loses line breaks: read the body from the message itself
+    text = message.text if isinstance(message.text, str) else ""
+    command_and_body = text.split(maxsplit=1)
+    body = command_and_body[1] if len(command_and_body) > 1 else ""
+    if len(body.strip().splitlines()) > 1:
+        task_path, tasks, duplicates = await run_blocking(add_tasks, body.splitlines())
+        log.info("tasks_added", path=str(task_path), count=len(tasks), duplicates=len(duplicates))
+        await message.reply_text(format_added_reply(len(tasks), duplicates))
+        return
 
     # Parse flags (handle both -- and em/en-dash variants)
     follow_up = False
@@ -144,11 +145,18 @@ async def handle_task(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
 
     task_text = " ".join(task_words)
 
-    task_path = add_task(task_text, follow_up=follow_up, due_date=due_date)
+    task_path, duplicate = await run_blocking(
+        add_task_checked, task_text, follow_up=follow_up, due_date=due_date
+    )
     log.info(
-        "task_added", path=str(task_path), task=task_text, follow_up=follow_up, due_date=due_date
+        "task_added",
+        path=str(task_path),
+        task=task_text,
+        follow_up=follow_up,
+        due_date=due_date,
+        duplicate=duplicate is not None,
     )
-    await message.reply_text("✓ Task added")
+    await message.reply_text(format_duplicate_reply(task_path, duplicate))
 
 
 async def handle_task_list(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -156,38 +164,228 @@ async def handle_task_list(update: Update, context: ContextTypes.DEFAULT_TYPE) -
 
     Optional filter:
         --YYYY-MM-DD or --today: Show only tasks due on or before this date
+    Optional order (default: TASK_LIST_SORT):
+        --overdue: Overdue tasks first, then newest files
+        --due: Earliest due date first
+        --recent: Newest files first
     """
     message = update.message
     if not message:
         return
 
-    from src.services.task_manager import format_task_list, parse_date_arg, search_tasks
+    from src.config import settings
+    from src.services.task_manager import (
+        TASK_SORT_MODES,
+        parse_date_arg,
+    )
 
-    # Parse optional date filter
+    # Parse optional date filter and sort order
     due_filter = None
+    sort = settings.task_list_sort
     for arg in context.args or []:
-        if parsed_date := parse_date_arg(arg):
+        if arg.lstrip("-–—") in TASK_SORT_MODES:
+            sort = arg.lstrip("-–—")
+        elif due_filter is None and (parsed_date := parse_date_arg(arg)):
             due_filter = parsed_date
-            break
 
-    tasks = search_tasks(due_before=due_filter)
+    # Vault scans can take seconds: keep the event loop free for other captures
+    snapshot = await run_blocking(task_list_snapshot, due_filter, sort)
 
-    if not tasks:
+    if not snapshot["tasks"]:
         if due_filter:
             await message.reply_text(f"No tasks due by {due_filter}")
         else:
             await message.reply_text("No open tasks found")
         return
 
-    # Store task list for /done command
-    context.user_data["last_task_list"] = tasks
+    context.user_data["task_list_snapshot"] = snapshot
+    text, markup = render_task_page(context, 0)
+    if markup:
+        await message.reply_text(text, reply_markup=markup)
+    else:
+        await message.reply_text(text)
+
+
+_TASK_FIND_USAGE = "Usage: /task_find milk #home path:Projects due:week followup"
+
+
+async def handle_task_find(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handle /task_find QUERY - search open tasks with the task query language.
+
+    Query parts (combined with AND): words, #tag, path:Folder, due:<range>
+    (today, overdue, week, none, YYYY-MM-DD, A..B) and followup.
+    Optional order: --overdue, --due, --recent (default: TASK_LIST_SORT).
+    Results page like /task_list, and /done works on them the same way.
+    """
+    message = update.message
+    if not message:
+        return
+
+    from src.config import settings
+    from src.services.task_manager import TASK_SORT_MODES
+    from src.services.task_query import TaskQueryError, parse_task_query
+
+    sort = settings.task_list_sort
+    parts = []
+    for arg in context.args or []:
+        if arg[:1] in "-–—" and arg.lstrip("-–—") in TASK_SORT_MODES:
+            sort = arg.lstrip("-–—")
+        else:
+            parts.append(arg)
+    query = " ".join(parts)
+    if not query:
+        await message.reply_text(_TASK_FIND_USAGE)
+        return
+
+    try:
+        parse_task_query(query)
+    except TaskQueryError as e:
+        await message.reply_text(f"{e}\n{_TASK_FIND_USAGE}")
+        return
+
+    snapshot = await run_blocking(task_list_snapshot, None, sort, query)
+    if not snapshot["tasks"]:
+        await message.reply_text(f"No open tasks match: {query}")
+        return
+
+    context.user_data["task_list_snapshot"] = snapshot
+    text, markup = render_task_page(context, 0)
+    if markup:
+        await message.reply_text(text, reply_markup=markup)
+    else:
+        await message.reply_text(text)
+
+
+# Callback data for the /task_list page buttons: "tasks:page:<n>"
+TASK_PAGE_CALLBACK = re.compile(r"^tasks:page:(\d+)$")
+
+
+def task_list_snapshot(due_filter: str | None, sort: str, query: str | None = None) -> dict:
+    """Run the task search (or /task_find query) once and keep every result for paging."""
+    from src.config import settings
+    from src.services.task_manager import find_tasks, search_tasks, task_list_generation
+
+    limit = max(settings.task_list_max_results, settings.task_list_limit)
+    if query is None:
+        tasks = search_tasks(limit=limit, due_before=due_filter, sort=sort)
+    else:
+        from src.services.task_query import parse_task_query
+
+        tasks = find_tasks(parse_task_query(query), limit=limit, sort=sort)
+    return {
+        "tasks": tasks,
+        "due_before": due_filter,
+        "sort": sort,
+        "query": query,
+        "generation": task_list_generation(),
+    }
+
+
+def render_task_page(
+    context: ContextTypes.DEFAULT_TYPE, page: int
+) -> tuple[str, InlineKeyboardMarkup | None]:
+    """Format one page of the cached snapshot and point /done at it."""
+    from src.config import settings
+    from src.services.task_manager import format_task_list
+
+    tasks = context.user_data["task_list_snapshot"]["tasks"]
+    page_size = settings.task_list_limit
+    pages = max(1, -(-len(tasks) // page_size))
+    page = min(page, pages - 1)
+    start = page * page_size
+
+    # /done numbers refer to the page on screen; it shares entries with the snapshot
+    page_tasks = tasks[start : start + page_size]
+    context.user_data["last_task_list"] = page_tasks
+    context.user_data["task_list_page"] = (start, len(page_tasks))
+
+    text = format_task_list(page_tasks)
+    if pages == 1:
+        return text, None
+
+    buttons = []
+    if page > 0:
+        buttons.append(InlineKeyboardButton("‹ Prev", callback_data=f"tasks:page:{page - 1}"))
+    if page < pages - 1:
+        buttons.append(InlineKeyboardButton("Next ›", callback_data=f"tasks:page:{page + 1}"))
+    return f"{text}\n\nPage {page + 1}/{pages}", InlineKeyboardMarkup([buttons])
+
+
+async def handle_task_list_page(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handle the /task_list Prev/Next buttons.
+
+    Pages come from the snapshot cached by /task_list. The search only runs
+    again when the task index has picked up vault changes since then.
+    """
+    query = update.callback_query
+    if not query:
+        return
+
+    from src.config import settings
+
+    if not query.from_user or query.from_user.id != settings.telegram_user_id:
+        await query.answer()
+        return
+
+    match = TASK_PAGE_CALLBACK.match(query.data or "")
+    snapshot = context.user_data.get("task_list_snapshot")
+    if not match or not snapshot:
+        await query.answer("List expired. Run /task_list again")
+        return
 
-    formatted = format_task_list(tasks)
-    await message.reply_text(formatted)
+    from src.services.task_manager import task_list_generation
+
+    if task_list_generation() != snapshot["generation"]:
+        snapshot = await run_blocking(
+            task_list_snapshot, snapshot["due_before"], snapshot["sort"], snapshot.get("query")
+        )
+        if not snapshot["tasks"]:
+            context.user_data.pop("task_list_snapshot", None)
+            context.user_data["last_task_list"] = None
+            await query.answer()
+            await query.edit_message_text("No open tasks found")
+            return
+        context.user_data["task_list_snapshot"] = snapshot
+
+    text, markup = render_task_page(context, int(match.group(1)))
+    await query.answer()
+    await query.edit_message_text(text, reply_markup=markup)
+
+
+def _retire_in_snapshot(context: ContextTypes.DEFAULT_TYPE, task_num: int) -> None:
+    """Mark task `task_num` of the displayed page as done in the cached snapshot."""
+    snapshot = context.user_data.get("task_list_snapshot")
+    page = context.user_data.get("task_list_page")
+    if snapshot and page and task_num <= page[1]:
+        snapshot["tasks"][page[0] + task_num - 1] = None
+
+
+def _parse_task_numbers(args: list[str], limit: int) -> list[int] | None:
+    """
+    Parse `1 3 5-8` (commas allowed) into distinct task numbers in order, or None if malformed.
+
+    Numbers above `limit` are clamped to limit + 1: `/done 1-100000000` expands to a
+    short range that fails the caller's range check instead of to a huge list.
+    """
+    numbers: dict[int, None] = {}
+    for token in " ".join(args).replace(",", " ").split():
+        first, sep, last = re.sub(r"[–—]", "-", token).partition("-")
+        try:
+            start = min(int(first), limit + 1)
+            stop = min(int(last), limit + 1) if sep else start
+        except ValueError:
+            return None
+        step = 1 if stop >= start else -1
+        numbers.update(dict.fromkeys(range(start, stop + step, step)))
+    return list(numbers)
 
 
 async def handle_done(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Handle /done N command - complete task N from last /task_list."""
+    """Handle /done N [M ...] command - complete tasks from last /task_list.
+
+    Accepts several numbers and ranges (`/done 1 3 5-8`). Tasks are completed
+    with one write per note, and the reply lists the outcome of each one.
+    """
     message = update.message
     if not message:
         return
@@ -197,33 +395,55 @@ async def handle_done(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
         await message.reply_text("Usage: /done 3")
         return
 
-    try:
-        task_num = int(args[0])
-    except ValueError:
+    # None once a page flip found the list emptied
+    last_tasks = context.user_data.get("last_task_list") or []
+    task_nums = _parse_task_numbers(args, len(last_tasks))
+    if not task_nums:
         await message.reply_text("Usage: /done 3 (number required)")
         return
 
-    last_tasks = context.user_data.get("last_task_list", [])
     if not last_tasks:
         await message.reply_text("Run /task_list first")
         return
 
-    if task_num < 1 or task_num > len(last_tasks):
+    if any(n < 1 or n > len(last_tasks) for n in task_nums):
         await message.reply_text(f"Invalid number. Range: 1-{len(last_tasks)}")
         return
 
-    from src.services.task_manager import complete_task
-
-    location = last_tasks[task_num - 1]
-    success = complete_task(location)
+    from src.services.task_manager import complete_tasks
 
-    if success:
-        # Clear the list to prevent stale completions
-        context.user_data["last_task_list"] = None
+    # Entries completed earlier are None: numbers stay aligned with the displayed list
+    pending = [n for n in task_nums if last_tasks[n - 1] is not None]
+    locations = [last_tasks[n - 1] for n in pending]
+    results = await run_blocking(complete_tasks, locations) if locations else []
+    outcomes = dict(zip(pending, results, strict=True))
 
+    lines = []
+    for n in task_nums:
+        if n not in outcomes:
+            lines.append(f"· {n}. already done")
+            continue
+        location = last_tasks[n - 1]
         # Extract task description for confirmation (strip checkbox and tag)
         task_desc = re.sub(r"^- \[ \] #to/(do|follow-up)\s*", "", location.task_text)
-        log.info("task_completed", file=str(location.file_path), line=location.line_number)
-        await message.reply_text(f"✓ Done: {task_desc}")
-    else:
-        await message.reply_text("Task changed or missing. Run /task_list again")
+        if outcomes[n]:
+            # Remember the completion so the same number cannot complete a stale line
+            last_tasks[n - 1] = None
+            _retire_in_snapshot(context, n)
+            log.info("task_completed", file=str(location.file_path), line=location.line_number)
+            lines.append(f"✓ {n}. {task_desc}")
+        else:
+            lines.append(f"✗ {n}. changed or missing: {task_desc}")
+
+    if len(task_nums) == 1:
+        if outcomes.get(task_nums[0]):
+            await message.reply_text(f"✓ Done: {task_desc}")
+        elif task_nums[0] in outcomes:
+            await message.reply_text("Task changed or missing. Run /task_list again")
+        else:
+            await message.reply_text("Task already done. Run /task_list again")
+        return
+
+    if not all(outcomes.get(n) for n in task_nums):
+        lines.append("Run /task_list again to refresh")
+    await message.reply_text("\n".join(lines))
@@ -4,8 +4,13 @@ import structlog
 from telegram import Update
 from telegram.ext import ContextTypes
 
-from src.services.file_manager import save_attachment
+from src.handlers.capture_buffer import buffer_capture, coalescing_enabled
+from src.handlers.capture_worker import journal_enabled, queue_capture
+from src.handlers.media_group import AlbumItem, buffer_album_item
+from src.services.executor import run_blocking
+from src.services.file_manager import download_attachment
 from src.services.note_writer import create_note
+from src.services.undo_journal import record_capture
 
 log = structlog.get_logger()
 
@@ -22,41 +27,51 @@ async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
     log.info("received_document", user_id=message.from_user.id, filename=filename)
 
-    # Download document
-    file = await context.bot.get_file(document.file_id)
-    doc_data = await file.download_as_bytearray()
-
     # Get extension from original filename
     extension = filename.rsplit(".", 1)[-1] if "." in filename else "bin"
 
-    # Save attachment
-    file_path, wikilink_path = save_attachment(bytes(doc_data), extension, prefix="doc")
-
     note_content = (
         f"{caption}\n\nOriginal filename: `{filename}`"
         if caption
         else f"Original filename: `{filename}`"
     )
 
+    if message.media_group_id:
+        item = AlbumItem(document.file_id, extension, "doc", note_content)
+        await buffer_album_item(message, context, item)
+        return
+
+    if journal_enabled():
+        await queue_capture(
+            message, context, note_content, file_id=document.file_id, save_as=(extension, "doc")
+        )
+        return
+
+    # Download document straight into the attachments folder
+    file = await context.bot.get_file(document.file_id)
+    file_path, wikilink_path = await download_attachment(file, extension, prefix="doc")
+
+    if coalescing_enabled():
+        await buffer_capture(message, context, note_content, (file_path, wikilink_path))
+        return
+
     # Check for daily mode
     is_daily = context.user_data.get("daily_mode", False)
-    section_time = None
+    section = None
     if is_daily:
         from src.services.daily_notes import append_to_daily
 
-        note_path, section_time = append_to_daily(
-            content=note_content, attachment_path=wikilink_path
+        section = await run_blocking(
+            append_to_daily, content=note_content, attachment_path=wikilink_path
         )
+        note_path = section.path
     else:
-        note_path = create_note(content=note_content, attachment_path=wikilink_path)
+        note_path = await run_blocking(
+            create_note, content=note_content, attachment_path=wikilink_path
+        )
     log.info("note_created", path=str(note_path))
 
     # Track for undo
-    context.user_data["last_capture"] = {
-        "note_path": note_path,
-        "attachments": [file_path],
-        "is_daily": is_daily,
-        "section_time": section_time,
-    }
+    await run_blocking(record_capture, note_path, [file_path], section)
 
     await message.reply_text("✓ Captured")
@@ -0,0 +1,151 @@
+"""Capture an album (media group) as one note with a single reply."""
+
+import asyncio
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import structlog
+from telegram import Bot, Message
+from telegram.ext import ContextTypes
+
+from src.config import settings
+from src.handlers.capture_buffer import buffer_capture, capture_body, coalescing_enabled
+from src.handlers.capture_worker import journal_enabled, queue_capture
+from src.services.executor import run_blocking
+from src.services.file_manager import download_attachment
+from src.services.note_writer import create_note
+from src.services.undo_journal import record_capture
+from src.services.vault_writer import remove_file
+
+log = structlog.get_logger()
+
+# Telegram delivers an album as separate messages within about a second
+_ALBUM_WAIT_SECONDS = 1.0
+
+
+@dataclass
+class AlbumItem:
+    """One photo, video or document of an album."""
+
+    file_id: str
+    extension: str
+    prefix: str
+    content: str  # Caption (or filename line) shown above the embed
+    transcribe: bool = False  # Video: append its transcription
+
+
+@dataclass
+class _Album:
+    """Album messages received so far; written once no more arrive."""
+
+    message: Message  # First message; the reply goes to it
+    context: ContextTypes.DEFAULT_TYPE
+    items: list[tuple[int, AlbumItem]]
+    timer: asyncio.Task | None = None
+
+
+_albums: dict[str, _Album] = {}
+
+
+async def buffer_album_item(
+    message: Message, context: ContextTypes.DEFAULT_TYPE, item: AlbumItem
+) -> None:
+    """Hold an album message until the rest of its media group has arrived."""
+    group_id = message.media_group_id
+    album = _albums.get(group_id)
+    if album is None:
+        album = _albums[group_id] = _Album(message, context, [])
+    elif album.timer is not None:
+        album.timer.cancel()
+    album.items.append((message.message_id, item))
+    album.timer = asyncio.create_task(_flush_later(group_id, album))
+
+
+async def _flush_later(group_id: str, album: _Album) -> None:
+    await asyncio.sleep(_ALBUM_WAIT_SECONDS)
+    if _albums.get(group_id) is album:
+        try:
+            await flush_album(group_id)
+        except Exception as e:
+            log.error("album_capture_failed", media_group_id=group_id, error=str(e))
+            await album.message.reply_text("❌ Album capture failed")
+
+
+async def fetch_album(bot: Bot, items: list[AlbumItem]) -> list[tuple[Path, str, str]]:
+    """
+    Download and save an album's files, ALBUM_DOWNLOAD_WORKERS at a time.
+
+    If any file fails, the ones already saved are removed and the error is
+    raised, so an album is captured whole or not at all.
+
+    Returns:
+        (file path, wikilink path, note text) per item, in album order
+    """
+    from src.handlers.video import build_video_note_content, transcribe_video
+
+    semaphore = asyncio.Semaphore(settings.album_download_workers)
+
+    async def fetch(item: AlbumItem) -> tuple[Path, str, str]:
+        async with semaphore:
+            file = await bot.get_file(item.file_id)
+            file_path, wikilink_path = await download_attachment(
+                file, item.extension, prefix=item.prefix
+            )
+        content = item.content
+        if item.transcribe:
+            transcription = await transcribe_video(file_path, "video_transcription_failed")
+            content = build_video_note_content(content, transcription)
+        return file_path, wikilink_path, content
+
+    results = await asyncio.gather(*(fetch(item) for item in items), return_exceptions=True)
+    if errors := [r for r in results if isinstance(r, BaseException)]:
+        for result in results:
+            if not isinstance(result, BaseException):
+                await run_blocking(remove_file, result[0])
+        raise errors[0]
+    return results
+
+
+async def flush_album(group_id: str) -> None:
+    """Capture a buffered album now: one note (or daily section) and one reply."""
+    album = _albums.pop(group_id, None)
+    if album is None:
+        return
+    if album.timer is not None and album.timer is not asyncio.current_task():
+        album.timer.cancel()
+
+    message, context = album.message, album.context
+    items = [item for _, item in sorted(album.items, key=lambda pair: pair[0])]
+    reply = f"✓ Captured {len(items)} files"
+    log.info("received_album", media_group_id=group_id, count=len(items))
+
+    if journal_enabled():
+        await queue_capture(message, context, album=[asdict(item) for item in items], reply=reply)
+        return
+
+    files = await fetch_album(context.bot, items)
+
+    if coalescing_enabled():
+        for file_path, wikilink_path, content in files:
+            await buffer_capture(message, context, content, (file_path, wikilink_path), reply)
+        return
+
+    content = "\n\n".join(capture_body(text, wikilink) for _, wikilink, text in files)
+    section = None
+    if context.user_data.get("daily_mode", False):
+        from src.services.daily_notes import append_to_daily
+
+        section = await run_blocking(append_to_daily, content=content)
+        note_path = section.path
+    else:
+        note_path = await run_blocking(create_note, content=content)
+    log.info("note_created", path=str(note_path), attachments=len(files))
+
+    await run_blocking(record_capture, note_path, [path for path, _, _ in files], section)
+    await message.reply_text(reply)
+
+
+async def flush_all_albums() -> None:
+    """Capture every album still waiting for messages (before /undo, on shutdown)."""
+    for group_id in list(_albums):
+        await flush_album(group_id)
@@ -0,0 +1,139 @@
+"""Due-date reminders: a daily digest and per-task messages, scheduled on the JobQueue."""
+
+import asyncio
+import re
+from datetime import date, datetime
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import structlog
+from apscheduler.jobstores.base import JobLookupError
+from telegram.ext import Application, ContextTypes, Job
+
+from src.config import settings
+from src.handlers.commands import render_task_page, task_list_snapshot
+from src.services.executor import run_blocking
+from src.services.task_index import TaskIndex, get_task_index
+from src.services.task_manager import TaskLocation, _extract_due_date, _today
+
+log = structlog.get_logger()
+
+
+async def send_due_digest(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Send overdue and due-today tasks as a /task_list page; /done works on it."""
+    today = _today()
+    # Same snapshot as /task_find due:..today, so paging and /done behave as usual
+    snapshot = await run_blocking(task_list_snapshot, None, "overdue", f"due:..{today}")
+    if not snapshot["tasks"]:
+        return
+
+    context.user_data["task_list_snapshot"] = snapshot
+    text, markup = render_task_page(context, 0)
+    await context.bot.send_message(
+        chat_id=context.job.chat_id, text=f"📅 Due by {today}:\n\n{text}", reply_markup=markup
+    )
+    log.info("due_digest_sent", tasks=len(snapshot["tasks"]))
+
+
+async def send_task_reminder(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Remind about one task on its due date."""
+    task: TaskLocation = context.job.data
+    desc = re.sub(r"^- \[ \] #to/(do|follow-up)\s*", "", task.task_text)
+    await context.bot.send_message(chat_id=context.job.chat_id, text=f"⏰ Due today: {desc}")
+    log.info("task_reminder_sent", file=str(task.file_path), line=task.line_number)
+
+
+class ReminderScheduler:
+    """
+    Keep one JobQueue job per due task, in step with the task index.
+
+    Jobs are keyed by file, line content hash and due date. When the index
+    re-scans files, only the jobs of those files are compared with their
+    current due tasks: new ones are scheduled, vanished or completed ones
+    removed, unchanged ones left alone.
+    """
+
+    def __init__(self, application: Application, index: TaskIndex) -> None:
+        self.application = application
+        self.index = index
+        self._jobs: dict[tuple[Path, str, str], Job] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def start(self) -> None:
+        """Schedule the digest and every known due task. Call from the event loop."""
+        job_queue = self.application.job_queue
+        tz = ZoneInfo(settings.timezone)
+        user_id = settings.telegram_user_id
+
+        if settings.reminder_digest_time:
+            job_queue.run_daily(
+                send_due_digest,
+                time=settings.reminder_digest_time.replace(tzinfo=tz),
+                name="due-digest",
+                chat_id=user_id,
+                user_id=user_id,
+            )
+
+        if settings.reminder_task_time:
+            self._loop = asyncio.get_running_loop()
+            self.index.add_listener(self._on_index_change)
+            self.reschedule(None)
+
+    def stop(self) -> None:
+        self.index.remove_listener(self._on_index_change)
+
+    def _on_index_change(self, paths: set[Path]) -> None:
+        # Index changes arrive on watcher/executor threads; the JobQueue lives on the loop
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self.reschedule, paths)
+
+    def reschedule(self, paths: set[Path] | None) -> None:
+        """Bring the jobs for `paths` (None: all files) in line with the index."""
+        wanted = {}
+        for task in self.index.due_tasks(paths):
+            due = _extract_due_date(task.task_text)
+            wanted[(task.file_path, task.line_hash or task.task_text, due)] = task
+
+        for key in [k for k in self._jobs if (paths is None or k[0] in paths) and k not in wanted]:
+            try:
+                self._jobs.pop(key).schedule_removal()
+            except JobLookupError:
+                pass  # Already sent
+
+        tz = ZoneInfo(settings.timezone)
+        now = datetime.now(tz)
+        added = 0
+        for key, task in wanted.items():
+            if key in self._jobs:
+                continue
+            when = datetime.combine(date.fromisoformat(key[2]), settings.reminder_task_time, tz)
+            if when <= now:
+                continue
+            self._jobs[key] = self.application.job_queue.run_once(
+                send_task_reminder,
+                when,
+                data=task,
+                name=f"task-reminder:{task.file_path.name}:{task.line_number}",
+                chat_id=settings.telegram_user_id,
+                user_id=settings.telegram_user_id,
+            )
+            added += 1
+
+        if added or paths is None:
+            log.info("task_reminders_scheduled", added=added, total=len(self._jobs))
+
+
+def start_reminders(application: Application) -> ReminderScheduler | None:
+    """Start due-date reminders if a reminder time is configured."""
+    if not settings.reminder_digest_time and not settings.reminder_task_time:
+        return None
+    if not settings.task_index_enabled:
+        log.warning("reminders_need_task_index")
+        return None
+    if application.job_queue is None:
+        log.warning("reminders_need_job_queue")
+        return None
+
+    scheduler = ReminderScheduler(application, get_task_index(settings.vault_path))
+    scheduler.start()
+    return scheduler
@@ -4,7 +4,11 @@ import structlog
 from telegram import Update
 from telegram.ext import ContextTypes
 
+from src.handlers.capture_buffer import buffer_capture, coalescing_enabled
+from src.handlers.capture_worker import journal_enabled, queue_capture
+from src.services.executor import run_blocking
 from src.services.note_writer import create_note
+from src.services.undo_journal import record_capture
 
 log = structlog.get_logger()
 
@@ -18,32 +22,47 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
     text = message.text
     log.info("received_text", user_id=message.from_user.id, length=len(text))
 
+    from src.services.task_manager import split_bulk_tasks
+
+    # Several task lines at once ("tasks:" header or a "- [ ]" checklist)
+    if task_lines := split_bulk_tasks(text):
+        from src.services.task_manager import add_tasks, format_added_reply
+
+        task_path, tasks, duplicates = await run_blocking(add_tasks, task_lines)
+        log.info("tasks_added", path=str(task_path), count=len(tasks), duplicates=len(duplicates))
+        await message.reply_text(format_added_reply(len(tasks), duplicates))
+        return
+
     # Check for task syntax: "task: ..." or "Task: ..."
     if text.lower().startswith("task:"):
-        from src.services.task_manager import add_task
+        from src.services.task_manager import add_task_checked, format_duplicate_reply
+
+        task_path, duplicate = await run_blocking(add_task_checked, text)
+        log.info("task_added", path=str(task_path), duplicate=duplicate is not None)
+        await message.reply_text(format_duplicate_reply(task_path, duplicate))
+        return
+
+    if journal_enabled():
+        await queue_capture(message, context, text)
+        return
 
-        task_path = add_task(text)
-        log.info("task_added", path=str(task_path))
-        await message.reply_text("✓ Task added")
+    if coalescing_enabled():
+        await buffer_capture(message, context, text)
         return
 
     # Check for daily mode
     is_daily = context.user_data.get("daily_mode", False)
-    section_time = None
+    section = None
     if is_daily:
         from src.services.daily_notes import append_to_daily
 
-        note_path, section_time = append_to_daily(content=text)
+        section = await run_blocking(append_to_daily, content=text)
+        note_path = section.path
     else:
-        note_path = create_note(content=text)
+        note_path = await run_blocking(create_note, content=text)
     log.info("note_created", path=str(note_path))
 
     # Track for undo
-    context.user_data["last_capture"] = {
-        "note_path": note_path,
-        "attachments": [],
-        "is_daily": is_daily,
-        "section_time": section_time,
-    }
+    await run_blocking(record_capture, note_path, [], section)
 
     await message.reply_text("✓ Captured")
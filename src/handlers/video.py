@@ -1,18 +1,25 @@
 """Video message handlers."""
 
+from pathlib import Path
+
 import structlog
 from telegram import Update
 from telegram.ext import ContextTypes
 
-from src.services.file_manager import save_attachment
+from src.handlers.capture_buffer import buffer_capture, coalescing_enabled
+from src.handlers.capture_worker import journal_enabled, queue_capture
+from src.handlers.media_group import AlbumItem, buffer_album_item
+from src.services.executor import run_blocking
+from src.services.file_manager import download_attachment
 from src.services.note_writer import create_note
 from src.services.transcription import transcribe_mp3
+from src.services.undo_journal import record_capture
 from src.services.video_processor import extract_audio_from_video
 
 log = structlog.get_logger()
 
 
-def _build_video_note_content(caption: str, transcription: str | None) -> str:
+def build_video_note_content(caption: str, transcription: str | None) -> str:
     """Combine caption and transcription into note body."""
     if not transcription:
         return caption
@@ -20,17 +27,22 @@ def _build_video_note_content(caption: str, transcription: str | None) -> str:
     return f"{caption}\n\n{transcription_block}" if caption else transcription_block
 
 
-async def _try_transcribe(message, video_data: bytes, log_key: str) -> str | None:
-    """Extract audio from video bytes and transcribe. Returns None on failure."""
+async def transcribe_video(video_path: Path, log_key: str) -> str | None:
+    """Extract audio from a saved video and transcribe. Returns None on failure."""
     try:
-        await message.reply_text("Processing video...")
-        mp3_data = extract_audio_from_video(video_data, "mp4")
+        mp3_data = await run_blocking(extract_audio_from_video, video_path, "mp4")
         return await transcribe_mp3(mp3_data)
     except Exception as e:
         log.warning(log_key, error=str(e))
         return None
 
 
+async def _try_transcribe(message, video_path: Path, log_key: str) -> str | None:
+    """Tell the user, then transcribe. Returns None on failure."""
+    await message.reply_text("Processing video...")
+    return await transcribe_video(video_path, log_key)
+
+
 async def _save_video_capture(
     message,
     context: ContextTypes.DEFAULT_TYPE,
@@ -40,24 +52,28 @@ async def _save_video_capture(
     duration: int,
 ) -> None:
     """Write note (daily or regular), record undo state, reply to user."""
+    if coalescing_enabled():
+        await buffer_capture(
+            message, context, note_content, (file_path, wikilink_path), f"✓ Captured ({duration}s)"
+        )
+        return
+
     is_daily = context.user_data.get("daily_mode", False)
-    section_time = None
+    section = None
     if is_daily:
         from src.services.daily_notes import append_to_daily
 
-        note_path, section_time = append_to_daily(
-            content=note_content, attachment_path=wikilink_path
+        section = await run_blocking(
+            append_to_daily, content=note_content, attachment_path=wikilink_path
         )
+        note_path = section.path
     else:
-        note_path = create_note(content=note_content, attachment_path=wikilink_path)
+        note_path = await run_blocking(
+            create_note, content=note_content, attachment_path=wikilink_path
+        )
     log.info("note_created", path=str(note_path))
 
-    context.user_data["last_capture"] = {
-        "note_path": note_path,
-        "attachments": [file_path],
-        "is_daily": is_daily,
-        "section_time": section_time,
-    }
+    await run_blocking(record_capture, note_path, [file_path], section)
     await message.reply_text(f"✓ Captured ({duration}s)")
 
 
@@ -71,12 +87,28 @@ async def handle_video(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     caption = message.caption or ""
     log.info("received_video", user_id=message.from_user.id, duration=video.duration)
 
+    if message.media_group_id:
+        item = AlbumItem(video.file_id, "mp4", "vid", caption, transcribe=True)
+        await buffer_album_item(message, context, item)
+        return
+
+    if journal_enabled():
+        await queue_capture(
+            message,
+            context,
+            caption,
+            file_id=video.file_id,
+            save_as=("mp4", "vid"),
+            transcribe="video",
+            reply=f"✓ Captured ({video.duration}s)",
+        )
+        return
+
     file = await context.bot.get_file(video.file_id)
-    video_data = bytes(await file.download_as_bytearray())
-    file_path, wikilink_path = save_attachment(video_data, "mp4", prefix="vid")
+    file_path, wikilink_path = await download_attachment(file, "mp4", prefix="vid")
 
-    transcription = await _try_transcribe(message, video_data, "video_transcription_failed")
-    note_content = _build_video_note_content(caption, transcription)
+    transcription = await _try_transcribe(message, file_path, "video_transcription_failed")
+    note_content = build_video_note_content(caption, transcription)
     await _save_video_capture(
         message, context, note_content, wikilink_path, file_path, video.duration
     )
@@ -91,12 +123,22 @@ async def handle_video_note(update: Update, context: ContextTypes.DEFAULT_TYPE)
     video_note = message.video_note
     log.info("received_video_note", user_id=message.from_user.id, duration=video_note.duration)
 
+    if journal_enabled():
+        await queue_capture(
+            message,
+            context,
+            file_id=video_note.file_id,
+            save_as=("mp4", "vnote"),
+            transcribe="video",
+            reply=f"✓ Captured ({video_note.duration}s)",
+        )
+        return
+
     file = await context.bot.get_file(video_note.file_id)
-    video_data = bytes(await file.download_as_bytearray())
-    file_path, wikilink_path = save_attachment(video_data, "mp4", prefix="vnote")
+    file_path, wikilink_path = await download_attachment(file, "mp4", prefix="vnote")
 
-    transcription = await _try_transcribe(message, video_data, "video_note_transcription_failed")
-    note_content = _build_video_note_content("", transcription)
+    transcription = await _try_transcribe(message, file_path, "video_note_transcription_failed")
+    note_content = build_video_note_content("", transcription)
     await _save_video_capture(
         message, context, note_content, wikilink_path, file_path, video_note.duration
     )
@@ -4,8 +4,12 @@ import structlog
 from telegram import Update
 from telegram.ext import ContextTypes
 
+from src.handlers.capture_buffer import buffer_capture, coalescing_enabled
+from src.handlers.capture_worker import journal_enabled, queue_capture
+from src.services.executor import run_blocking
 from src.services.note_writer import create_note
 from src.services.transcription import transcribe_voice
+from src.services.undo_journal import record_capture
 
 log = structlog.get_logger()
 
@@ -19,6 +23,16 @@ async def handle_voice(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     voice = message.voice
     log.info("received_voice", user_id=message.from_user.id, duration=voice.duration)
 
+    if journal_enabled():
+        await queue_capture(
+            message,
+            context,
+            file_id=voice.file_id,
+            transcribe="voice",
+            reply=f"✓ Captured ({voice.duration}s)",
+        )
+        return
+
     # Download voice file
     file = await context.bot.get_file(voice.file_id)
     ogg_data = await file.download_as_bytearray()
@@ -36,23 +50,25 @@ async def handle_voice(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
         await message.reply_text("❌ No speech detected")
         return
 
+    if coalescing_enabled():
+        await buffer_capture(
+            message, context, transcription, reply=f"✓ Captured ({voice.duration}s)"
+        )
+        return
+
     # Check for daily mode
     is_daily = context.user_data.get("daily_mode", False)
-    section_time = None
+    section = None
     if is_daily:
         from src.services.daily_notes import append_to_daily
 
-        note_path, section_time = append_to_daily(content=transcription)
+        section = await run_blocking(append_to_daily, content=transcription)
+        note_path = section.path
     else:
-        note_path = create_note(content=transcription)
+        note_path = await run_blocking(create_note, content=transcription)
     log.info("note_created", path=str(note_path))
 
     # Track for undo
-    context.user_data["last_capture"] = {
-        "note_path": note_path,
-        "attachments": [],
-        "is_daily": is_daily,
-        "section_time": section_time,
-    }
+    await run_blocking(record_capture, note_path, [], section)
 
     await message.reply_text(f"✓ Captured ({voice.duration}s)")
@@ -0,0 +1,134 @@
+"""
+Write-ahead journal of captures not yet written to the vault.
+
+A capture is committed here (SQLite, synchronous=FULL) before the bot
+replies, then written to the vault by the capture worker and removed.
+Whatever is still in the journal after a crash, or while the vault or
+Scribe is unreachable, is retried until it lands.
+
+Entries are JSON objects:
+    {"chat_id", "message_id", "date": ISO time, "daily": bool,
+     "content": text, "reply": text,
+     "file_id": Telegram file or null,
+     "save_as": [extension, prefix] or null (voice: transcribe only),
+     "transcribe": "voice" | "video" | null,
+     "album": [AlbumItem fields] or null}
+The worker adds checkpoints as it goes ("file" and "wikilink" once the
+attachment is saved, "transcription" once transcribed, "files" once an
+album is saved), so a retry never saves an attachment twice or calls
+Scribe again.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from src.config import settings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS captures (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    entry TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_try REAL NOT NULL DEFAULT 0
+);
+"""
+
+
+class CaptureJournal:
+    """Oldest-first queue of pending captures, stored in SQLite."""
+
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # An acknowledged capture must survive a power cut
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def append(self, entry: dict) -> int:
+        """Durably add a capture. Returns its sequence number."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO captures (entry) VALUES (?)", (json.dumps(entry),)
+            )
+        return cursor.lastrowid
+
+    def update(self, seq: int, entry: dict) -> None:
+        """Store a checkpoint (saved attachment, transcription) for a capture."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE captures SET entry = ? WHERE seq = ?", (json.dumps(entry), seq)
+            )
+
+    def due(self, now: float | None = None) -> list[tuple[int, dict]]:
+        """Captures ready to be (re)tried, oldest first."""
+        now = time.time() if now is None else now
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, entry FROM captures WHERE next_try <= ? ORDER BY seq", (now,)
+            ).fetchall()
+        return [(seq, json.loads(entry)) for seq, entry in rows]
+
+    def next_try(self) -> float | None:
+        """When the earliest postponed capture is due, or None if the journal is empty."""
+        with self._lock:
+            return self._conn.execute("SELECT MIN(next_try) FROM captures").fetchone()[0]
+
+    def retry_later(self, seq: int, max_delay: float) -> tuple[int, float]:
+        """
+        Postpone a failed capture: 2, 4, 8... seconds, up to `max_delay`.
+
+        Returns:
+            (failed attempts so far, delay in seconds)
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT attempts FROM captures WHERE seq = ?", (seq,))
+            row = row.fetchone()
+            if row is None:
+                return 0, 0.0
+            attempts = row[0] + 1
+            delay = min(2.0**attempts, max_delay)
+            self._conn.execute(
+                "UPDATE captures SET attempts = ?, next_try = ? WHERE seq = ?",
+                (attempts, time.time() + delay, seq),
+            )
+        return attempts, delay
+
+    def retry_all_now(self) -> None:
+        """Make postponed captures due again (on startup)."""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE captures SET next_try = 0")
+
+    def remove(self, seqs: list[int]) -> None:
+        """Drop captures that were written to the vault (or cannot be)."""
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM captures WHERE seq = ?", [(s,) for s in seqs])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM captures").fetchone()[0]
+
+
+_journal: CaptureJournal | None = None
+_journal_lock = threading.Lock()
+
+
+def get_capture_journal() -> CaptureJournal:
+    """Return the shared capture journal, opening it on first use."""
+    global _journal
+    db_path = settings.capture_journal_path
+    with _journal_lock:
+        if _journal is None or _journal.db_path != db_path:
+            if _journal is not None:
+                _journal.close()
+            _journal = CaptureJournal(db_path)
+        return _journal
@@ -2,27 +2,44 @@
 
 from datetime import datetime
 from pathlib import Path
+from typing import NamedTuple
 from zoneinfo import ZoneInfo
 
 from src.config import settings
+from src.services.vault_writer import append_bytes, create_exclusive
+
+
+class DailySection(NamedTuple):
+    """A `### HH:MM` section as written to a daily note: where, and exactly which bytes."""
+
+    path: Path
+    time: str
+    offset: int
+    data: bytes
 
 
 def append_to_daily(
     content: str,
     attachment_path: str | None = None,
-) -> tuple[Path, str]:
+    when: datetime | None = None,
+) -> DailySection:
     """
-    Append content to today's daily note, creating it if needed.
+    Append content to the day's daily note, creating it if needed.
+
+    Only the new section is written: an existing note is appended to in
+    place, never read and rewritten, so edits made in Obsidian meanwhile
+    survive. A new note is created with its frontmatter in one atomic step.
 
     Args:
         content: The content to append
         attachment_path: Optional wikilink path to attachment
+        when: Capture time (default now); picks the day's note and the header
 
     Returns:
-        Tuple of (path to daily note, section time string for undo)
+        The written section, for undo
     """
     tz = ZoneInfo(settings.timezone)
-    now = datetime.now(tz)
+    now = when.astimezone(tz) if when else datetime.now(tz)
 
     # Build daily note path
     filename = now.strftime(settings.daily_note_format) + ".md"
@@ -43,18 +60,19 @@ def append_to_daily(
         else:
             section_content = f"![[{attachment_path}]]"
 
-    if note_path.exists():
-        # Append to existing daily note
-        existing = note_path.read_text(encoding="utf-8")
-        new_content = f"{existing}\n{time_header}\n{section_content}\n"
-    else:
-        # Create new daily note with frontmatter
-        frontmatter = f"""---
+    section = f"{time_header}\n{section_content}\n"
+    frontmatter = f"""---
 dateCreated: {now.strftime("%Y-%m-%d")}
 tags:
   - k/daily
 ---"""
-        new_content = f"{frontmatter}\n\n{time_header}\n{section_content}\n"
+    # Frontmatter only for a new note. The exclusive create decides a race;
+    # the exists() check only spares an existing note's appends a staged temp file
+    header = f"{frontmatter}\n\n".encode()
+    data = section.encode()
+    if not note_path.exists() and create_exclusive(note_path, header + data):
+        return DailySection(note_path, section_time, len(header), data)
 
-    note_path.write_text(new_content, encoding="utf-8")
-    return note_path, section_time
+    data = b"\n" + data
+    offset = append_bytes(note_path, data)
+    return DailySection(note_path, section_time, offset, data)
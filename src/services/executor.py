@@ -0,0 +1,111 @@
+"""Bounded executor for blocking vault I/O and event-loop lag monitoring."""
+
+import asyncio
+import functools
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+import structlog
+
+from src.config import settings
+
+log = structlog.get_logger()
+
+T = TypeVar("T")
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.vault_io_workers, thread_name_prefix="vault-io"
+            )
+        return _executor
+
+
+async def run_blocking(func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    """
+    Run blocking vault I/O off the event loop.
+
+    Calls share a dedicated pool of VAULT_IO_WORKERS threads, so a slow vault
+    scan cannot starve other captures and vault work cannot exhaust the
+    loop's default executor.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
+
+
+def shutdown_executor() -> None:
+    """Wait for in-flight vault I/O and release the worker threads."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+@dataclass
+class LoopLagStats:
+    """How long the event loop was blocked, as seen by LoopLagMonitor."""
+
+    samples: int = 0
+    blocked_count: int = 0
+    blocked_seconds: float = 0.0
+    max_lag_seconds: float = 0.0
+    last_lag_seconds: float = 0.0
+
+
+class LoopLagMonitor:
+    """
+    Measure event-loop blocking by timing a periodic sleep.
+
+    Every `interval` seconds the monitor wakes up; any delay beyond the
+    requested sleep is time the loop spent running something else without
+    yielding. Delays above `threshold` are logged as `event_loop_blocked`.
+    """
+
+    def __init__(self, interval: float = 0.25, threshold: float = 0.1) -> None:
+        self.interval = interval
+        self.threshold = threshold
+        self.stats = LoopLagStats()
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def record(self, lag: float) -> None:
+        stats = self.stats
+        stats.samples += 1
+        stats.last_lag_seconds = lag
+        stats.max_lag_seconds = max(stats.max_lag_seconds, lag)
+        if lag >= self.threshold:
+            stats.blocked_count += 1
+            stats.blocked_seconds += lag
+            log.warning("event_loop_blocked", blocked_ms=round(lag * 1000))
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, loop.time() - started - self.interval))
+
+
+loop_lag_monitor = LoopLagMonitor(threshold=settings.loop_lag_threshold_ms / 1000)
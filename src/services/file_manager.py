@@ -1,10 +1,37 @@
 """Attachment file handling service."""
 
+from collections.abc import AsyncIterable, AsyncIterator
 from datetime import datetime
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
+import httpx
+from telegram import File
+
 from src.config import settings
+from src.services.executor import run_blocking
+from src.services.vault_writer import StagedFile, create_unique
+
+# Download chunk size: memory per download stays at about this much
+_CHUNK_SIZE = 256 * 1024
+
+
+def _attachment_path(extension: str, prefix: str) -> Path:
+    """Timestamped path for a new attachment; its folder is created if missing."""
+    tz = ZoneInfo(settings.timezone)
+    now = datetime.now(tz)
+
+    filename = f"{prefix}-{now.strftime('%Y-%m-%d-%H%M%S')}.{extension}"
+    file_path = settings.attachments_path / filename
+
+    # Ensure directory exists
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    return file_path
+
+
+def _wikilink(file_path: Path) -> str:
+    """Wikilink-compatible path relative to vault."""
+    return f"{settings.attachments_folder}/{file_path.name}"
 
 
 def save_attachment(data: bytes, extension: str, prefix: str = "tg") -> tuple[Path, str]:
@@ -19,17 +46,65 @@ def save_attachment(data: bytes, extension: str, prefix: str = "tg") -> tuple[Pa
     Returns:
         Tuple of (absolute path, wikilink path for embedding)
     """
-    tz = ZoneInfo(settings.timezone)
-    now = datetime.now(tz)
+    # Two attachments in the same second get -2, -3... instead of overwriting
+    file_path = create_unique(_attachment_path(extension, prefix), data)
+    return file_path, _wikilink(file_path)
 
-    filename = f"{prefix}-{now.strftime('%Y-%m-%d-%H%M%S')}.{extension}"
-    file_path = settings.attachments_path / filename
 
-    # Ensure directory exists
-    file_path.parent.mkdir(parents=True, exist_ok=True)
+async def save_attachment_stream(
+    chunks: AsyncIterable[bytes], extension: str, prefix: str = "tg"
+) -> tuple[Path, str]:
+    """
+    Save an attachment arriving in chunks, without holding it in memory.
+
+    Chunks are written to a temp file in the attachments folder, which is
+    given its name (with save_attachment's -2, -3... rule) once complete;
+    if the stream fails, the temp file is removed and nothing is saved.
+
+    Returns:
+        Tuple of (absolute path, wikilink path for embedding)
+    """
+    staged = await run_blocking(lambda: StagedFile(_attachment_path(extension, prefix)))
+    try:
+        async for chunk in chunks:
+            await run_blocking(staged.write, chunk)
+        file_path = await run_blocking(staged.create_unique)
+    except BaseException:
+        staged.discard()
+        raise
+    return file_path, _wikilink(file_path)
+
 
-    file_path.write_bytes(data)
+async def _file_chunks(file: File) -> AsyncIterator[bytes]:
+    """Stream a Telegram file's content in chunks."""
+    if not file.file_path:
+        raise RuntimeError("Telegram returned no file_path; cannot download")
 
-    # Return wikilink-compatible path relative to vault
-    wikilink_path = f"{settings.attachments_folder}/{filename}"
-    return file_path, wikilink_path
+    if not file.file_path.startswith(("http://", "https://")):
+        # Local Bot API server: the file is already on this machine
+        with open(file.file_path, "rb") as f:
+            while chunk := await run_blocking(f.read, _CHUNK_SIZE):
+                yield chunk
+        return
+
+    # PTB's download_* methods buffer the whole file, so stream it ourselves
+    async with (
+        httpx.AsyncClient(timeout=60.0) as client,
+        client.stream("GET", file.file_path) as response,
+    ):
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes(_CHUNK_SIZE):
+            yield chunk
+
+
+async def download_attachment(file: File, extension: str, prefix: str = "tg") -> tuple[Path, str]:
+    """
+    Download a Telegram file straight into the attachments folder.
+
+    Memory use is one chunk however large the file is (see
+    save_attachment_stream).
+
+    Returns:
+        Tuple of (absolute path, wikilink path for embedding)
+    """
+    return await save_attachment_stream(_file_chunks(file), extension, prefix)
@@ -5,11 +5,13 @@ from pathlib import Path
 from zoneinfo import ZoneInfo
 
 from src.config import settings
+from src.services.vault_writer import create_unique
 
 
 def create_note(
     content: str,
     attachment_path: str | None = None,
+    when: datetime | None = None,
 ) -> Path:
     """
     Create a timestamped note in the inbox folder.
@@ -17,12 +19,13 @@ def create_note(
     Args:
         content: The note body text
         attachment_path: Optional wikilink path to attachment
+        when: Capture time (default now), for captures written later
 
     Returns:
         Path to the created note file
     """
     tz = ZoneInfo(settings.timezone)
-    now = datetime.now(tz)
+    now = when.astimezone(tz) if when else datetime.now(tz)
 
     # Build frontmatter
     frontmatter = f"""---
@@ -45,13 +48,9 @@ tags:
     filename = now.strftime(settings.note_filename_format) + ".md"
     note_path = settings.inbox_path / filename
 
-    # Handle same-minute collision by appending seconds
-    if note_path.exists():
-        filename = now.strftime("%Y-%m-%d %H%M%S") + ".md"
-        note_path = settings.inbox_path / filename
-
     # Ensure directory exists
     note_path.parent.mkdir(parents=True, exist_ok=True)
 
-    note_path.write_text(note_content, encoding="utf-8")
-    return note_path
+    # Same-minute collision: -2, -3... The name is claimed and written in
+    # one step, so concurrent captures never share or overwrite a note.
+    return create_unique(note_path, note_content.encode("utf-8"))
@@ -0,0 +1,437 @@
+"""Persistent, incrementally updated index of open tasks in the vault."""
+
+import sqlite3
+import stat
+import threading
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import structlog
+
+from src.config import settings
+from src.services.task_manager import (
+    TaskLocation,
+    _extract_due_date,
+    rank_tasks,
+    scan_files_for_tasks,
+    task_fingerprint,
+)
+from src.services.task_query import TaskQuery, task_terms
+from src.services.vault_walker import load_ignore_rules, walk_vault
+
+log = structlog.get_logger()
+
+# Bump when the stored layout changes; a mismatch triggers a full rebuild
+SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    path TEXT NOT NULL,
+    line_number INTEGER NOT NULL,
+    task_text TEXT NOT NULL,
+    byte_offset INTEGER NOT NULL,
+    line_hash TEXT NOT NULL,
+    PRIMARY KEY (path, line_number)
+);
+"""
+
+
+@dataclass
+class _FileEntry:
+    """Indexed state of a single vault file."""
+
+    mtime_ns: int
+    size: int
+    tasks: list[TaskLocation] = field(default_factory=list)
+
+
+class TaskIndex:
+    """
+    Open-task index stored in SQLite and mirrored in memory.
+
+    Files are keyed by path, mtime and size. `sync()` stats the vault and
+    re-scans only files whose signature changed since the last run, so the
+    cost of keeping the index fresh grows with churn, not vault size.
+    """
+
+    def __init__(self, vault_path: Path, db_path: Path) -> None:
+        self.vault_path = vault_path
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self._files: dict[Path, _FileEntry] = {}
+        # Set while a VaultWatcher keeps the index current; searches then skip sync()
+        self.watched = False
+        # Bumped on every applied change, so cached result sets can detect staleness
+        self.generation = 0
+        # Inverted index for /task_find: term -> ids of matching tasks.
+        # Small int ids keep posting-set intersections cheap.
+        self._postings: defaultdict[str, set[int]] = defaultdict(set)
+        self._by_id: dict[int, tuple[TaskLocation, _FileEntry]] = {}
+        self._ids_by_file: dict[Path, list[int]] = {}
+        # Due date (None: no due date) -> task ids, for due: ranges
+        self._by_due: defaultdict[str | None, set[int]] = defaultdict(set)
+        self._next_id = 0
+        # Task fingerprint -> task ids, for duplicate detection
+        self._by_fingerprint: defaultdict[str, set[int]] = defaultdict(set)
+        # Tasks the bot appended that the index has not re-scanned yet
+        self._pending: dict[str, TaskLocation] = {}
+        # Called with the set of re-indexed/removed paths after every change
+        self._listeners: list[Callable[[set[Path]], None]] = []
+        self.ignore = load_ignore_rules(vault_path)
+        self._conn = self._connect()
+        self._load()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database, rebuilding it if it is unreadable."""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            return self._open_db()
+        except sqlite3.DatabaseError as e:
+            log.warning("task_index_corrupt", path=str(self.db_path), error=str(e))
+            self.db_path.unlink(missing_ok=True)
+            return self._open_db()
+
+    def _open_db(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+
+        meta = dict(conn.execute("SELECT key, value FROM meta"))
+        expected = {"schema_version": str(SCHEMA_VERSION), "vault_path": str(self.vault_path)}
+        if meta != expected:
+            # Different vault or layout: start from scratch
+            conn.executescript("DROP TABLE files; DROP TABLE tasks; DELETE FROM meta;")
+            conn.executescript(_SCHEMA)
+            with conn:
+                conn.executemany("INSERT INTO meta VALUES (?, ?)", expected.items())
+        return conn
+
+    def _load(self) -> None:
+        """Mirror the stored index into memory."""
+        for rel, mtime_ns, size in self._conn.execute("SELECT path, mtime_ns, size FROM files"):
+            self._files[self.vault_path / rel] = _FileEntry(mtime_ns, size)
+
+        rows = self._conn.execute(
+            "SELECT path, line_number, task_text, byte_offset, line_hash"
+            " FROM tasks ORDER BY path, line_number"
+        )
+        for rel, *task in rows:
+            path = self.vault_path / rel
+            entry = self._files.get(path)
+            if entry is not None:
+                entry.tasks.append(TaskLocation(path, *task))
+
+        for path, entry in self._files.items():
+            self._index_terms(path, entry)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _is_indexable(self, path: Path) -> bool:
+        """True for .md files the vault walker would visit."""
+        return path.suffix == ".md" and not self.ignore.is_ignored_path(self.vault_path, path)
+
+    def _walk(self) -> dict[Path, tuple[int, int]]:
+        """Return {path: (mtime_ns, size)} for every non-ignored .md file in the vault."""
+        # Reload rules so edits to Obsidian's excluded files take effect
+        self.ignore = load_ignore_rules(self.vault_path)
+        return {f.path: (f.mtime_ns, f.size) for f in walk_vault(self.vault_path, self.ignore)}
+
+    def _changed(self, signatures: dict[Path, tuple[int, int]]) -> list[Path]:
+        with self._lock:
+            return [
+                path
+                for path, signature in signatures.items()
+                if (entry := self._files.get(path)) is None
+                or (entry.mtime_ns, entry.size) != signature
+            ]
+
+    def sync(self) -> int:
+        """
+        Bring the index up to date with the vault.
+
+        Returns:
+            Number of files that were re-scanned
+        """
+        current = self._walk()
+        changed = self._changed(current)
+        with self._lock:
+            # Also drops files that became ignored since they were indexed
+            removed = [path for path in self._files if path not in current]
+
+        self._apply(removed, changed, current)
+        return len(changed)
+
+    def refresh(self, paths: Iterable[Path]) -> int:
+        """
+        Re-index specific files after create/modify/delete/move events.
+
+        Paths that no longer exist are dropped from the index.
+
+        Returns:
+            Number of files that were re-scanned
+        """
+        current: dict[Path, tuple[int, int]] = {}
+        removed: list[Path] = []
+        for path in set(paths):
+            if not self._is_indexable(path):
+                continue
+            try:
+                st = path.stat()
+            except OSError:
+                removed.append(path)
+                continue
+            if stat.S_ISREG(st.st_mode):
+                current[path] = (st.st_mtime_ns, st.st_size)
+            else:
+                removed.append(path)
+
+        with self._lock:
+            removed = [path for path in removed if path in self._files]
+        changed = self._changed(current)
+        self._apply(removed, changed, current)
+        return len(changed)
+
+    def remove_tree(self, directory: Path) -> None:
+        """Drop every indexed file below `directory` (deleted or moved-out folder)."""
+        with self._lock:
+            removed = [path for path in self._files if path.is_relative_to(directory)]
+        self._apply(removed, [], {})
+
+    def _apply(
+        self,
+        removed: list[Path],
+        changed: list[Path],
+        signatures: dict[Path, tuple[int, int]],
+    ) -> None:
+        """Re-scan `changed`, drop `removed`, and store the result."""
+        if not removed and not changed:
+            return
+
+        scanned = dict(scan_files_for_tasks(changed, workers=settings.task_scan_workers))
+
+        with self._lock:
+            touched = {*removed, *scanned}
+            for path in touched:
+                if self._files.pop(path, None) is not None:
+                    self._unindex_terms(path)
+            self._pending = {
+                fp: task for fp, task in self._pending.items() if task.file_path not in touched
+            }
+            for path, tasks in scanned.items():
+                mtime_ns, size = signatures[path]
+                entry = self._files[path] = _FileEntry(mtime_ns, size, tasks)
+                self._index_terms(path, entry)
+            self._persist(removed, scanned, signatures)
+            self.generation += 1
+
+        log.info("task_index_updated", scanned=len(changed), removed=len(removed))
+        for listener in list(self._listeners):
+            try:
+                listener(touched)
+            except Exception as e:
+                log.error("task_index_listener_failed", error=str(e))
+
+    def add_listener(self, listener: Callable[[set[Path]], None]) -> None:
+        """Call `listener(paths)` after each change, from the thread that applied it."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[set[Path]], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def due_tasks(self, paths: Iterable[Path] | None = None) -> list[TaskLocation]:
+        """
+        Open tasks that have a due date, from the due-date index.
+
+        Args:
+            paths: Only tasks in these files (default: the whole vault)
+        """
+        with self._lock:
+            if paths is None:
+                ids = [i for due, ids in self._by_due.items() if due is not None for i in ids]
+            else:
+                ids = [i for path in paths for i in self._ids_by_file.get(path, [])]
+            tasks = [self._by_id[i][0] for i in ids]
+        return [task for task in tasks if _extract_due_date(task.task_text)]
+
+    def _persist(
+        self,
+        removed: list[Path],
+        scanned: dict[Path, list[TaskLocation]],
+        signatures: dict[Path, tuple[int, int]],
+    ) -> None:
+        """Write removed and re-scanned files to SQLite in one transaction."""
+        stale = [(self._rel(path),) for path in (*removed, *scanned)]
+        with self._conn:
+            self._conn.executemany("DELETE FROM tasks WHERE path = ?", stale)
+            self._conn.executemany("DELETE FROM files WHERE path = ?", stale)
+            self._conn.executemany(
+                "INSERT INTO files VALUES (?, ?, ?)",
+                [(self._rel(path), *signatures[path]) for path in scanned],
+            )
+            self._conn.executemany(
+                "INSERT INTO tasks VALUES (?, ?, ?, ?, ?)",
+                [
+                    (
+                        self._rel(task.file_path),
+                        task.line_number,
+                        task.task_text,
+                        task.byte_offset,
+                        task.line_hash,
+                    )
+                    for tasks in scanned.values()
+                    for task in tasks
+                ],
+            )
+
+    def _rel(self, path: Path) -> str:
+        return path.relative_to(self.vault_path).as_posix()
+
+    def _index_terms(self, path: Path, entry: _FileEntry) -> None:
+        rel = self._rel(path)
+        ids = self._ids_by_file[path] = []
+        for task in entry.tasks:
+            task_id = self._next_id
+            self._next_id += 1
+            ids.append(task_id)
+            self._by_id[task_id] = (task, entry)
+            self._by_due[_extract_due_date(task.task_text)].add(task_id)
+            self._by_fingerprint[task_fingerprint(task.task_text)].add(task_id)
+            for term in task_terms(task, rel):
+                self._postings[term].add(task_id)
+
+    def _unindex_terms(self, path: Path) -> None:
+        rel = self._rel(path)
+        for task_id in self._ids_by_file.pop(path, []):
+            task, _entry = self._by_id.pop(task_id)
+            due = _extract_due_date(task.task_text)
+            self._by_due[due].discard(task_id)
+            if not self._by_due[due]:
+                del self._by_due[due]
+            fingerprint = task_fingerprint(task.task_text)
+            self._by_fingerprint[fingerprint].discard(task_id)
+            if not self._by_fingerprint[fingerprint]:
+                del self._by_fingerprint[fingerprint]
+            for term in task_terms(task, rel):
+                ids = self._postings.get(term)
+                if ids is not None:
+                    ids.discard(task_id)
+                    if not ids:
+                        del self._postings[term]
+
+    def find_duplicate(self, fingerprint: str) -> TaskLocation | None:
+        """Return an open task with this fingerprint (see task_fingerprint), if any."""
+        with self._lock:
+            ids = self._by_fingerprint.get(fingerprint)
+            if ids:
+                return self._by_id[min(ids)][0]
+            return self._pending.get(fingerprint)
+
+    def remember_added(self, path: Path, task_texts: list[str]) -> None:
+        """
+        Record tasks just appended to `path` so duplicates are caught right away.
+
+        They count as open until `path` is re-indexed (line number 0 until then).
+        """
+        with self._lock:
+            for text in task_texts:
+                self._pending[task_fingerprint(text)] = TaskLocation(path, 0, text)
+
+    def find(self, query: TaskQuery, limit: int, sort: str = "recent") -> list[TaskLocation]:
+        """
+        Return open tasks matching a /task_find query, without reading any file.
+
+        Term and due-date lookups intersect posting sets (smallest first);
+        only the surviving candidates are ranked.
+        """
+        with self._lock:
+            postings = [self._postings.get(term, set()) for term in set(query.terms)]
+            if query.has_due is not None:
+                # Few distinct due dates: union the ones in range
+                in_range = [ids for due, ids in self._by_due.items() if query.matches_due(due)]
+                postings.append(set().union(*in_range))
+            if postings:
+                postings.sort(key=len)
+                ids = postings[0].intersection(*postings[1:])
+                candidates = [self._by_id[task_id] for task_id in ids]
+            else:
+                candidates = list(self._by_id.values())
+
+        return rank_tasks(((task, entry.mtime_ns) for task, entry in candidates), limit, sort)
+
+    def search(
+        self,
+        limit: int,
+        due_before: str | None = None,
+        sort: str = "recent",
+    ) -> list[TaskLocation]:
+        """
+        Return open tasks from the index.
+
+        Args:
+            limit: Maximum tasks to return
+            due_before: Only return tasks due on or before this date (YYYY-MM-DD).
+                        Tasks without a due date are always included.
+            sort: One of TASK_SORT_MODES; "recent" lists newest files first
+        """
+        with self._lock:
+            entries = [entry for entry in self._files.values() if entry.tasks]
+
+        if sort != "recent":
+            candidates = ((task, entry.mtime_ns) for entry in entries for task in entry.tasks)
+            return rank_tasks(candidates, limit, sort, due_before)
+
+        entries.sort(key=lambda entry: entry.mtime_ns, reverse=True)
+        results: list[TaskLocation] = []
+        for entry in entries:
+            for task in entry.tasks:
+                if due_before:
+                    task_due = _extract_due_date(task.task_text)
+                    if task_due and task_due > due_before:
+                        continue
+                results.append(task)
+                if len(results) >= limit:
+                    return results
+        return results
+
+
+_index: TaskIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_task_index(vault_path: Path) -> TaskIndex:
+    """Return the shared task index for `vault_path`, opening it on first use."""
+    global _index
+    db_path = settings.task_index_path
+    with _index_lock:
+        if _index is None or _index.vault_path != vault_path or _index.db_path != db_path:
+            if _index is not None:
+                _index.close()
+            _index = TaskIndex(vault_path, db_path)
+        return _index
+
+
+def watched_index() -> TaskIndex | None:
+    """The open task index if the vault watcher keeps it current, else None."""
+    index = _index
+    return index if index is not None and index.watched else None
+
+
+def index_generation() -> int | None:
+    """Generation of the open task index, or None if none has been opened yet."""
+    index = _index
+    return index.generation if index is not None else None
@@ -1,21 +1,59 @@
 """Task management service for adding, searching, and completing tasks."""
 
+import hashlib
+import heapq
 import re
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import TYPE_CHECKING
 from zoneinfo import ZoneInfo
 
 from src.config import settings
 
+if TYPE_CHECKING:
+    from src.services.task_query import TaskQuery
+
+# Open (unchecked) task lines carrying one of the managed tags
+TASK_PATTERN = re.compile(r"^- \[ \] #to/(do|follow-up)\b.*", re.MULTILINE)
+
+# Every managed tag contains this; files without it cannot hold a task
+_TASK_MARKER = b"#to/"
+
+# Line prefixes that mark a task in bulk captures: "task:", "tasks:", "- [ ]", "-"
+_TASK_PREFIX = re.compile(r"^(?:tasks?:|- \[.\]|-)\s*", re.IGNORECASE)
+
+# Obsidian Tasks date fields (due, scheduled, start, created, done), ignored for duplicates
+_TASK_DATES = re.compile(r"[📅⏳🛫➕✅]\s*\d{4}-\d{2}-\d{2}")
+
+# Obsidian Tasks due date marker
+_DUE_DATE = re.compile(r"📅\s*(\d{4}-\d{2}-\d{2})")
+
+# /task_list orderings: newest files first, earliest due date first, overdue first
+TASK_SORT_MODES = ("recent", "due", "overdue")
+
 
 @dataclass
 class TaskLocation:
-    """Tracks where a task lives in the vault for completion."""
+    """Tracks where a task lives in the vault for completion.
+
+    `byte_offset` and `line_hash` pin the exact bytes of the line at scan
+    time; completion verifies them and patches only that span.
+    """
 
     file_path: Path
     line_number: int
     task_text: str
+    byte_offset: int | None = None
+    line_hash: str | None = None
+
+
+def _line_hash(raw_line: bytes) -> str:
+    """Short content hash of a line's bytes (without its line ending)."""
+    return hashlib.blake2b(raw_line, digest_size=8).hexdigest()
 
 
 def parse_date_arg(arg: str) -> str | None:
@@ -110,6 +148,9 @@ def add_task(
     """
     Append a task to the task inbox file.
 
+    The inbox is opened in append mode and never rewritten; concurrent adds
+    are serialized by a per-file lock.
+
     Args:
         task_text: Raw task text
         follow_up: If True, use #to/follow-up tag
@@ -118,41 +159,196 @@ def add_task(
     Returns:
         Path to the task inbox file
     """
+    from src.services.undo_journal import record_undo, revert_action
+    from src.services.vault_writer import append_bytes
+
     normalized = _normalize_task(task_text, follow_up=follow_up, due_date=due_date)
     inbox_path = settings.task_inbox_path
 
     # Ensure parent directory exists
     inbox_path.parent.mkdir(parents=True, exist_ok=True)
 
-    if inbox_path.exists():
-        existing = inbox_path.read_text(encoding="utf-8")
-        # Ensure newline before appending
-        if existing and not existing.endswith("\n"):
-            existing += "\n"
-        new_content = existing + normalized + "\n"
-    else:
-        new_content = normalized + "\n"
+    # Append in place: constant cost however large the inbox grows
+    data = f"{normalized}\n".encode()
+    offset = append_bytes(inbox_path, data)
+    record_undo([revert_action(inbox_path, offset, data, label=f"task {_task_label(normalized)}")])
 
-    inbox_path.write_text(new_content, encoding="utf-8")
+    if index := _duplicate_index():
+        index.remember_added(inbox_path, [normalized])
+    _refresh_index([inbox_path])
     return inbox_path
 
 
+def task_fingerprint(task_text: str) -> str:
+    """
+    Identity of a task for duplicate detection.
+
+    The text is normalized like `_normalize_task` output, then the checkbox,
+    `#to/...` tag and all dates are dropped and case and spacing folded, so a
+    re-sent task matches even with another due date or tag.
+    """
+    text = _TASK_PREFIX.sub("", task_text.strip())
+    text = _TASK_DATES.sub(" ", re.sub(r"#to/(do|follow-up)\b", " ", text))
+    return hashlib.blake2b(" ".join(text.lower().split()).encode(), digest_size=8).hexdigest()
+
+
+def _duplicate_index():
+    """Task index used for duplicate checks, or None when checks are off."""
+    if settings.task_duplicates not in ("warn", "skip") or not settings.task_index_enabled:
+        return None
+
+    from src.services.task_index import get_task_index
+
+    return get_task_index(settings.vault_path)
+
+
+def _refresh_index(paths: Iterable[Path]) -> None:
+    """
+    Re-index files the bot just wrote.
+
+    A watched index is not synced before searches, and a polling watcher
+    would only see the write on its next pass.
+    """
+    from src.services.task_index import watched_index
+
+    if index := watched_index():
+        index.refresh(paths)
+
+
+def find_duplicate_task(task_text: str) -> TaskLocation | None:
+    """
+    Return an open task with the same fingerprint as `task_text`, if any.
+
+    An O(1) lookup in the task index (kept current by the vault watcher and
+    by the bot's own adds); the vault is not scanned.
+    """
+    index = _duplicate_index()
+    return index.find_duplicate(task_fingerprint(task_text)) if index else None
+
+
+def add_task_checked(task_text: str, **flags) -> tuple[Path | None, TaskLocation | None]:
+    """
+    Add a task unless TASK_DUPLICATES=skip and it is already open.
+
+    Args:
+        task_text: Raw task text
+        **flags: follow_up / due_date, passed to add_task
+
+    Returns:
+        (inbox path, or None if skipped; the open duplicate, if any)
+    """
+    duplicate = find_duplicate_task(task_text)
+    if duplicate and settings.task_duplicates == "skip":
+        return None, duplicate
+    return add_task(task_text, **flags), duplicate
+
+
+def parse_task_flags(line: str) -> tuple[str, bool, str | None]:
+    """
+    Split flags off one task line.
+
+    Recognizes `--follow-up` and due dates (`--today`, `--tomorrow`,
+    `--yesterday`, `--YYYY-MM-DD`, any dash variant). Only dashed words count
+    as flags, so "Call mom today" keeps its text.
+
+    Returns:
+        (task text, follow_up, due_date)
+    """
+    follow_up = False
+    due_date = None
+    words = []
+    for word in line.split():
+        if word.lstrip("-–—") == "follow-up":
+            follow_up = True
+        elif word[:1] in "-–—" and (parsed_date := parse_date_arg(word)):
+            due_date = parsed_date
+        else:
+            words.append(word)
+    return " ".join(words), follow_up, due_date
+
+
+def split_bulk_tasks(text: str) -> list[str] | None:
+    """
+    Return the task lines of a bulk task message, or None if it is not one.
+
+    A message is a bulk capture when it spans several lines and either starts
+    with `task:` / `tasks:` (every following line is a task) or consists only
+    of `- [ ]` checkbox lines. Plain bullet lists stay ordinary notes.
+    """
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    if len(lines) < 2:
+        return None
+    if lines[0].lower().startswith(("task:", "tasks:")):
+        return lines
+    if all(line.startswith("- [ ]") for line in lines):
+        return lines
+    return None
+
+
+def add_tasks(lines: Iterable[str]) -> tuple[Path, list[str], list[str]]:
+    """
+    Append several tasks to the task inbox in a single write.
+
+    Each line is parsed on its own: `task:` / `- ` / `- [ ]` prefixes are
+    dropped and its `--follow-up` / due date flags apply to that line only.
+    Lines left empty (like a bare `tasks:` header) are skipped. Tasks already
+    open in the vault, or repeated in the same message, are reported as
+    duplicates and left out when TASK_DUPLICATES=skip.
+
+    Returns:
+        (path to the task inbox file, formatted tasks that were added, duplicates)
+    """
+    from src.services.undo_journal import record_undo, revert_action
+    from src.services.vault_writer import append_bytes
+
+    index = _duplicate_index()
+    tasks: list[str] = []
+    duplicates: list[str] = []
+    seen: set[str] = set()
+    for line in lines:
+        text, follow_up, due_date = parse_task_flags(_TASK_PREFIX.sub("", line.strip()))
+        if not text:
+            continue
+        task = _normalize_task(text, follow_up=follow_up, due_date=due_date)
+        if index:
+            fingerprint = task_fingerprint(task)
+            if fingerprint in seen or index.find_duplicate(fingerprint):
+                duplicates.append(task)
+                if settings.task_duplicates == "skip":
+                    continue
+            seen.add(fingerprint)
+        tasks.append(task)
+
+    inbox_path = settings.task_inbox_path
+    if tasks:
+        inbox_path.parent.mkdir(parents=True, exist_ok=True)
+        data = "".join(f"{task}\n" for task in tasks).encode()
+        offset = append_bytes(inbox_path, data)
+        label = f"task {_task_label(tasks[0])}" if len(tasks) == 1 else f"{len(tasks)} tasks"
+        record_undo([revert_action(inbox_path, offset, data, label=label)])
+        if index:
+            index.remember_added(inbox_path, tasks)
+        _refresh_index([inbox_path])
+    return inbox_path, tasks, duplicates
+
+
+def _task_label(task_text: str) -> str:
+    """Task text without checkbox and task tag, for replies."""
+    return re.sub(r"^- \[.\] #to/(do|follow-up)\s*", "", task_text)
+
+
 def _extract_due_date(task_text: str) -> str | None:
     """Extract due date from task text (📅 YYYY-MM-DD pattern)."""
-    match = re.search(r"📅\s*(\d{4}-\d{2}-\d{2})", task_text)
+    match = _DUE_DATE.search(task_text)
     return match.group(1) if match else None
 
 
 def _get_vault_md_files() -> list[Path]:
-    """Return all .md files in vault sorted by mtime descending."""
-    try:
-        return sorted(
-            settings.vault_path.rglob("*.md"),
-            key=lambda p: p.stat().st_mtime,
-            reverse=True,
-        )
-    except OSError:
-        return []
+    """Return all non-ignored .md files in vault sorted by mtime descending."""
+    from src.services.vault_walker import walk_vault
+
+    files = sorted(walk_vault(settings.vault_path), key=lambda f: f.mtime_ns, reverse=True)
+    return [f.path for f in files]
 
 
 def _scan_file_for_tasks(
@@ -160,17 +356,48 @@ def _scan_file_for_tasks(
     pattern: re.Pattern,
     due_before: str | None,
 ) -> list[TaskLocation]:
-    """Return matching TaskLocation objects from a single file."""
-    # Skip hidden directories (.obsidian, .git, etc.)
-    if any(part.startswith(".") for part in file_path.parts):
-        return []
+    """Return matching TaskLocation objects from a single file.
+
+    The raw bytes are searched for the `#to/` marker first, so the vast
+    majority of notes (no tasks) are rejected without decoding. Only lines
+    containing the marker are decoded and matched against `pattern`, and
+    line numbers are counted only up to those hits.
+    """
+    # A plain read, not mmap: a note truncated while mapped would SIGBUS the bot
     try:
-        lines = file_path.read_text(encoding="utf-8").splitlines()
-    except (OSError, UnicodeDecodeError):
+        data = file_path.read_bytes()
+    except OSError:
         return []
+    return _match_task_lines(file_path, data, pattern, due_before)
 
+
+def _match_task_lines(
+    file_path: Path,
+    data: bytes,
+    pattern: re.Pattern,
+    due_before: str | None,
+) -> list[TaskLocation]:
+    """Match task lines around each occurrence of the task marker in `data`."""
     results = []
-    for line_num, line in enumerate(lines, start=1):
+    line_number = 1
+    counted_to = 0
+    pos = data.find(_TASK_MARKER)
+
+    while pos != -1:
+        start = data.rfind(b"\n", 0, pos) + 1
+        end = data.find(b"\n", pos)
+        if end == -1:
+            end = len(data)
+
+        line_number += data[counted_to:start].count(b"\n")
+        counted_to = start
+        pos = data.find(_TASK_MARKER, end)
+
+        raw_line = data[start:end].removesuffix(b"\r")
+        try:
+            line = raw_line.decode("utf-8")
+        except UnicodeDecodeError:
+            continue
         if not pattern.match(line):
             continue
         # Apply due_before filter: skip tasks with due date after filter date
@@ -178,31 +405,288 @@ def _scan_file_for_tasks(
             task_due = _extract_due_date(line)
             if task_due and task_due > due_before:
                 continue
-        results.append(TaskLocation(file_path=file_path, line_number=line_num, task_text=line))
+        results.append(
+            TaskLocation(
+                file_path=file_path,
+                line_number=line_number,
+                task_text=line,
+                byte_offset=start,
+                line_hash=_line_hash(raw_line),
+            )
+        )
     return results
 
 
+def scan_files_for_tasks(
+    files: Iterable[Path],
+    due_before: str | None = None,
+    workers: int = 1,
+) -> Iterator[tuple[Path, list[TaskLocation]]]:
+    """
+    Scan files for open tasks, yielding (path, tasks) in the order given.
+
+    With workers > 1, files are read and matched on a thread pool while
+    results are still yielded in input order. At most 2 * workers files are
+    in flight; when the caller stops iterating, queued reads are cancelled.
+
+    Args:
+        files: Files to scan, in the order results should be yielded
+        due_before: Optional due date filter (see search_tasks)
+        workers: Number of reader threads (<= 1 scans sequentially)
+    """
+    if workers <= 1:
+        for file_path in files:
+            yield file_path, _scan_file_for_tasks(file_path, TASK_PATTERN, due_before)
+        return
+
+    pending = iter(files)
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="task-scan")
+    window: deque = deque()
+
+    def submit_next() -> None:
+        file_path = next(pending, None)
+        if file_path is not None:
+            future = pool.submit(_scan_file_for_tasks, file_path, TASK_PATTERN, due_before)
+            window.append((file_path, future))
+
+    try:
+        for _ in range(workers * 2):
+            submit_next()
+        while window:
+            file_path, future = window.popleft()
+            submit_next()
+            yield file_path, future.result()
+    finally:
+        # Early exit (limit reached): drop reads that have not started yet
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _today() -> str:
+    return datetime.now(ZoneInfo(settings.timezone)).strftime("%Y-%m-%d")
+
+
+def _rank_key(sort: str, today: str) -> Callable[[str | None, int, int], tuple]:
+    """Build a sort key over (due date, file mtime_ns, line number); smaller ranks first."""
+    if sort == "due":
+        # Earliest due date first, undated tasks last, newest file breaks ties
+        return lambda due, mtime_ns, line: (due is None, due or "", -mtime_ns, line)
+    if sort == "overdue":
+        # Overdue tasks first (most overdue on top), then everything else by recency
+        return lambda due, mtime_ns, line: (
+            (0, due, 0, line) if due and due < today else (1, "", -mtime_ns, line)
+        )
+    return lambda due, mtime_ns, line: (-mtime_ns, line)
+
+
+def rank_tasks(
+    candidates: Iterable[tuple[TaskLocation, int]],
+    limit: int,
+    sort: str,
+    due_before: str | None = None,
+) -> list[TaskLocation]:
+    """
+    Pick the top `limit` tasks in a single streaming pass.
+
+    A bounded heap of size `limit` keeps the cost at O(N log K) without
+    materialising or sorting every task in the vault.
+
+    Args:
+        candidates: Stream of (task, mtime_ns of the file holding it)
+        limit: Number of tasks to return (K)
+        sort: One of TASK_SORT_MODES
+        due_before: Optional due date filter (see search_tasks)
+    """
+    key = _rank_key(sort, _today())
+    # Newest-first ranking without a due filter never looks at due dates
+    needs_due = sort != "recent" or due_before
+
+    def keyed() -> Iterator[tuple[tuple, TaskLocation]]:
+        for task, mtime_ns in candidates:
+            due = _extract_due_date(task.task_text) if needs_due else None
+            if due_before and due and due > due_before:
+                continue
+            yield key(due, mtime_ns, task.line_number), task
+
+    return [task for _, task in heapq.nsmallest(limit, keyed(), key=lambda item: item[0])]
+
+
+def _scan_vault(limit: int, due_before: str | None, sort: str = "recent") -> list[TaskLocation]:
+    """Scan vault files directly; newest-first with early exit, or ranked over the vault."""
+    workers = settings.task_scan_workers
+
+    if sort != "recent":
+        from src.services.vault_walker import walk_vault
+
+        mtimes = {f.path: f.mtime_ns for f in walk_vault(settings.vault_path)}
+        scanned = scan_files_for_tasks(mtimes, workers=workers)
+        candidates = ((task, mtimes[path]) for path, tasks in scanned for task in tasks)
+        return rank_tasks(candidates, limit, sort, due_before)
+
+    tasks: list[TaskLocation] = []
+    scanned = scan_files_for_tasks(_get_vault_md_files(), due_before, workers)
+    for _file_path, file_tasks in scanned:
+        tasks.extend(file_tasks)
+        if len(tasks) >= limit:
+            scanned.close()
+            return tasks[:limit]
+
+    return tasks
+
+
 def search_tasks(
     limit: int | None = None,
     due_before: str | None = None,
+    sort: str = "recent",
 ) -> list[TaskLocation]:
     """Search entire vault for unchecked #to/do or #to/follow-up tasks.
 
+    Results come from the persistent task index. While the vault watcher is
+    running the index is already current and no disk access happens here;
+    otherwise files changed since the last call are re-scanned first.
+    Set TASK_INDEX_ENABLED=false to scan the vault directly instead.
+
     Args:
         limit: Maximum tasks to return (uses settings.task_list_limit if None)
         due_before: Only return tasks due on or before this date (YYYY-MM-DD).
                     Tasks without a due date are always included.
+        sort: "recent" (newest files first), "due" (earliest due date first)
+              or "overdue" (overdue tasks first, then by recency)
     """
     limit = limit or settings.task_list_limit
-    pattern = re.compile(r"^- \[ \] #to/(do|follow-up)\b.*", re.MULTILINE)
-    tasks: list[TaskLocation] = []
 
-    for file_path in _get_vault_md_files():
-        tasks.extend(_scan_file_for_tasks(file_path, pattern, due_before))
-        if len(tasks) >= limit:
-            return tasks[:limit]
+    if not settings.task_index_enabled:
+        return _scan_vault(limit, due_before, sort)
 
-    return tasks
+    from src.services.task_index import get_task_index
+
+    index = get_task_index(settings.vault_path)
+    if not index.watched:
+        index.sync()
+    return index.search(limit=limit, due_before=due_before, sort=sort)
+
+
+def _strip_eol(line: bytes) -> bytes:
+    return line.removesuffix(b"\n").removesuffix(b"\r")
+
+
+def _locate_task_lines(
+    file_path: Path, locations: list[TaskLocation]
+) -> list[tuple[int, bytes] | None]:
+    """
+    Find each task's line in `file_path` as (byte offset, line bytes without line ending).
+
+    The recorded byte offset is tried first; if lines above a task changed
+    length since the scan, its line number is used instead. Either way the
+    line must still hash to what was listed, otherwise the result is None.
+    """
+    expected = [loc.line_hash or _line_hash(loc.task_text.encode("utf-8")) for loc in locations]
+    found: list[tuple[int, bytes] | None] = [None] * len(locations)
+
+    with file_path.open("rb") as f:
+        for i, location in enumerate(locations):
+            offset = location.byte_offset
+            if offset is None or offset < 0:
+                continue
+            # Only accept offsets that still start a line
+            f.seek(max(offset - 1, 0))
+            if offset == 0 or f.read(1) == b"\n":
+                raw_line = _strip_eol(f.readline())
+                if _line_hash(raw_line) == expected[i]:
+                    found[i] = (offset, raw_line)
+
+        by_line = {loc.line_number: i for i, loc in enumerate(locations) if found[i] is None}
+        if by_line:
+            f.seek(0)
+            offset = 0
+            for line_number, line in enumerate(f, start=1):
+                i = by_line.pop(line_number, None)
+                if i is not None:
+                    raw_line = _strip_eol(line)
+                    if _line_hash(raw_line) == expected[i]:
+                        found[i] = (offset, raw_line)
+                    if not by_line:
+                        break
+                offset += len(line)
+    return found
+
+
+def _completed_line(raw_line: bytes, today: str) -> bytes | None:
+    """Turn an open task line into its checked form with a completion date."""
+    try:
+        current_line = raw_line.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+
+    # Replace unchecked with checked, then add completion date
+    new_line = current_line.replace("- [ ]", "- [x]", 1)
+    return f"{new_line.rstrip()} ✅ {today}".encode()
+
+
+def complete_tasks(locations: list[TaskLocation]) -> list[bool]:
+    """
+    Mark several tasks as complete, with one read-verify-write per file.
+
+    Only the task lines' bytes are replaced; the rest of each file, including
+    its line endings, is copied across verbatim and swapped in atomically.
+
+    Args:
+        locations: Tasks to complete, from search_tasks
+
+    Returns:
+        One flag per location: True if completed, False if it changed/was not found
+    """
+    from src.services.undo_journal import record_undo, revert_action
+    from src.services.vault_writer import replace_spans
+
+    tz = ZoneInfo(settings.timezone)
+    today = datetime.now(tz).strftime("%Y-%m-%d")
+    results = [False] * len(locations)
+    undo_actions = []
+
+    by_file: dict[Path, list[int]] = {}
+    for i, location in enumerate(locations):
+        by_file.setdefault(location.file_path, []).append(i)
+
+    for file_path, indices in by_file.items():
+        try:
+            found = _locate_task_lines(file_path, [locations[i] for i in indices])
+        except OSError:
+            continue
+
+        # Verify lines match what we expect (handles concurrent modifications)
+        spans: list[tuple[int, bytes, bytes]] = []
+        span_owners: list[int] = []
+        for i, hit in zip(indices, found, strict=True):
+            if hit is None:
+                continue
+            offset, raw_line = hit
+            new_line = _completed_line(raw_line, today)
+            if new_line is not None:
+                spans.append((offset, raw_line, new_line))
+                span_owners.append(i)
+        if not spans:
+            continue
+
+        try:
+            applied = replace_spans(file_path, spans)
+        except OSError:
+            continue
+        for i, ok in zip(span_owners, applied, strict=True):
+            results[i] = ok
+
+        # Undo puts the open lines back, at offsets shifted by earlier longer lines
+        shift = 0
+        for (offset, old, new), ok in sorted(zip(spans, applied, strict=True)):
+            if ok:
+                label = _task_label(old.decode("utf-8").strip())
+                undo_actions.append(
+                    revert_action(file_path, offset + shift, new, old, label=label, verb="Reopened")
+                )
+                shift += len(new) - len(old)
+
+    record_undo(undo_actions)
+    _refresh_index({locations[i].file_path for i, ok in enumerate(results) if ok})
+    return results
 
 
 def complete_task(location: TaskLocation) -> bool:
@@ -210,49 +694,96 @@ def complete_task(location: TaskLocation) -> bool:
     Mark a task as complete by changing [ ] to [x] and adding completion date.
 
     Args:
-        location: TaskLocation with file path and line number
+        location: TaskLocation with file path, line number and byte offset
 
     Returns:
         True if task was completed, False if task changed/not found
     """
-    try:
-        lines = location.file_path.read_text(encoding="utf-8").splitlines()
-    except OSError:
-        return False
+    return complete_tasks([location])[0]
 
-    # Line numbers are 1-indexed
-    line_idx = location.line_number - 1
 
-    if line_idx < 0 or line_idx >= len(lines):
-        return False
+def find_tasks(
+    query: "TaskQuery",
+    limit: int | None = None,
+    sort: str = "recent",
+) -> list[TaskLocation]:
+    """Find open tasks matching a /task_find query (see task_query.parse_task_query).
 
-    current_line = lines[line_idx]
+    Answered from the task index's inverted index; with TASK_INDEX_ENABLED=false
+    the vault is scanned and every task is matched directly.
 
-    # Verify line matches what we expect (handles concurrent modifications)
-    if current_line != location.task_text:
-        return False
+    Args:
+        query: Parsed query
+        limit: Maximum tasks to return (uses settings.task_list_limit if None)
+        sort: One of TASK_SORT_MODES
+    """
+    limit = limit or settings.task_list_limit
 
-    # Replace unchecked with checked
-    new_line = current_line.replace("- [ ]", "- [x]", 1)
+    if not settings.task_index_enabled:
+        from src.services.task_query import task_terms
+        from src.services.vault_walker import walk_vault
+
+        vault_path = settings.vault_path
+        mtimes = {f.path: f.mtime_ns for f in walk_vault(vault_path)}
+        scanned = scan_files_for_tasks(mtimes, workers=settings.task_scan_workers)
+        candidates = (
+            (task, mtimes[path])
+            for path, tasks in scanned
+            for task in tasks
+            if query.matches_terms(task_terms(task, path.relative_to(vault_path).as_posix()))
+            and query.matches_due(_extract_due_date(task.task_text))
+        )
+        return rank_tasks(candidates, limit, sort)
 
-    # Add completion date
-    tz = ZoneInfo(settings.timezone)
-    today = datetime.now(tz).strftime("%Y-%m-%d")
-    new_line = f"{new_line.rstrip()} ✅ {today}"
+    from src.services.task_index import get_task_index
 
-    lines[line_idx] = new_line
+    index = get_task_index(settings.vault_path)
+    if not index.watched:
+        index.sync()
+    return index.find(query, limit=limit, sort=sort)
 
-    # Write back
-    location.file_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
-    return True
 
+def task_list_generation() -> int | None:
+    """
+    Token that changes whenever the task index picks up a vault change.
 
-def format_task_list(tasks: list[TaskLocation]) -> str:
+    Returns None when no index is in use; cached task lists then stay valid
+    until the next /task_list.
+    """
+    if not settings.task_index_enabled:
+        return None
+
+    from src.services.task_index import index_generation
+
+    return index_generation()
+
+
+def format_added_reply(added: int, duplicates: list[str]) -> str:
+    """Reply for a bulk task capture, mentioning duplicates per TASK_DUPLICATES."""
+    reply = f"✓ {added} tasks added"
+    if duplicates and settings.task_duplicates == "skip":
+        reply += f", {len(duplicates)} already open skipped"
+    elif duplicates:
+        reply += f" ({len(duplicates)} already open)"
+    return reply
+
+
+def format_duplicate_reply(task_path: Path | None, duplicate: TaskLocation | None) -> str:
+    """Reply for a single task capture (see add_task_checked)."""
+    if duplicate is None:
+        return "✓ Task added"
+    desc = re.sub(r"^- \[ \] #to/(do|follow-up)\s*", "", duplicate.task_text)
+    if task_path is None:
+        return f"Already open in {duplicate.file_path.name}: {desc}"
+    return f"✓ Task added (already open in {duplicate.file_path.name})"
+
+
+def format_task_list(tasks: list[TaskLocation | None]) -> str:
     """
     Format tasks for Telegram display as numbered list with task type prefix.
 
     Args:
-        tasks: List of TaskLocation objects
+        tasks: List of TaskLocation objects; None marks a task completed since listing
 
     Returns:
         Numbered list like "1. DO: Buy milk 📅 2026-02-10\n2. FOLLOW-UP: Call John"
@@ -262,6 +793,10 @@ def format_task_list(tasks: list[TaskLocation]) -> str:
 
     lines = []
     for i, task in enumerate(tasks, start=1):
+        if task is None:
+            lines.append(f"{i}. ✓ done")
+            continue
+
         # Determine task type prefix
         if "#to/follow-up" in task.task_text:
             prefix = "FOLLOW-UP:"
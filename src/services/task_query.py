@@ -0,0 +1,131 @@
+"""Query language for /task_find and the index terms it matches against."""
+
+import re
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import PurePosixPath
+
+from src.services.task_manager import TaskLocation, _today, parse_date_arg
+
+_TAG = re.compile(r"#([\w/-]+)")
+_WORD = re.compile(r"\w+")
+_CHECKBOX = re.compile(r"^- \[.\]\s*")
+
+# Bare query words that select follow-up tasks instead of matching text
+_FOLLOWUP_WORDS = {"followup", "follow-up"}
+
+
+class TaskQueryError(ValueError):
+    """Raised for query parts that cannot be understood (e.g. a bad due: range)."""
+
+
+def task_terms(task: TaskLocation, rel_path: str) -> set[str]:
+    """
+    Index terms for a task.
+
+    - `w:<word>`   each lowercased word of the task text (tags excluded)
+    - `t:<tag>`    each tag and its parent tags (`#to/do` gives `t:to` and `t:to/do`)
+    - `p:<folder>` each folder containing the note, relative to the vault root
+    """
+    text = _CHECKBOX.sub("", task.task_text).lower()
+    terms = {f"w:{word}" for word in _WORD.findall(_TAG.sub(" ", text))}
+    for tag in _TAG.findall(text):
+        parts = tag.strip("/").split("/")
+        terms.update(f"t:{'/'.join(parts[: i + 1])}" for i in range(len(parts)))
+    folders = PurePosixPath(rel_path.lower()).parent.parts
+    terms.update(f"p:{'/'.join(folders[: i + 1])}" for i in range(len(folders)))
+    return terms
+
+
+@dataclass
+class TaskQuery:
+    """
+    A parsed /task_find query.
+
+    Every part must match (AND). `terms` are looked up in the inverted
+    index; the due range is checked on the remaining candidates.
+    """
+
+    terms: list[str] = field(default_factory=list)
+    due_from: str | None = None
+    due_to: str | None = None
+    # True: only tasks with a due date in range; False: only tasks without one
+    has_due: bool | None = None
+
+    def matches_terms(self, terms: set[str]) -> bool:
+        return all(term in terms for term in self.terms)
+
+    def matches_due(self, due: str | None) -> bool:
+        if self.has_due is None:
+            return True
+        if not self.has_due:
+            return due is None
+        if due is None:
+            return False
+        return (self.due_from is None or due >= self.due_from) and (
+            self.due_to is None or due <= self.due_to
+        )
+
+
+def _parse_day(value: str) -> str:
+    day = parse_date_arg(value)
+    if day is None:
+        raise TaskQueryError(f"Unknown date: {value}")
+    return day
+
+
+def _parse_due(spec: str, query: TaskQuery) -> None:
+    """Fill the due range from a `due:` value."""
+    today = _today()
+    if spec == "none":
+        query.has_due = False
+        return
+
+    query.has_due = True
+    if spec == "overdue":
+        query.due_to = (date.fromisoformat(today) - timedelta(days=1)).isoformat()
+    elif spec == "week":
+        query.due_from = today
+        query.due_to = (date.fromisoformat(today) + timedelta(days=6)).isoformat()
+    elif ".." in spec:
+        start, _, end = spec.partition("..")
+        query.due_from = _parse_day(start) if start else None
+        query.due_to = _parse_day(end) if end else None
+    else:
+        query.due_from = query.due_to = _parse_day(spec)
+
+
+def parse_task_query(text: str) -> TaskQuery:
+    """
+    Parse a /task_find query.
+
+    Syntax (all parts combined with AND, case-insensitive):
+        milk              task text contains the word "milk"
+        #home             task has the tag #home (or a child tag like #home/garden)
+        path:Projects/A   note lives in that folder (or below it)
+        due:today         due on a day: today, tomorrow, yesterday or YYYY-MM-DD
+        due:A..B          due in a range; either end may be left open
+        due:overdue       due before today
+        due:week          due within the next 7 days
+        due:none          no due date
+        followup          only #to/follow-up tasks
+
+    Raises:
+        TaskQueryError: If a part cannot be parsed
+    """
+    query = TaskQuery()
+    for token in text.split():
+        lowered = token.lower()
+        if lowered in _FOLLOWUP_WORDS:
+            query.terms.append("t:to/follow-up")
+        elif lowered.startswith("#") and len(lowered) > 1:
+            query.terms.append(f"t:{lowered[1:].strip('/')}")
+        elif lowered.startswith("path:"):
+            folder = lowered[5:].strip("/")
+            if folder:
+                query.terms.append(f"p:{folder}")
+        elif lowered.startswith("due:"):
+            _parse_due(lowered[4:], query)
+        else:
+            query.terms.extend(f"w:{word}" for word in _WORD.findall(lowered))
+    return query
@@ -0,0 +1,205 @@
+"""
+Persistent, bounded journal of vault writes for /undo.
+
+Each undo step is the list of actions that reverses one capture, task
+addition or /done. Steps live in SQLite under DATA_DIR, so /undo keeps
+working after a restart; only the newest UNDO_DEPTH steps are kept. The
+bot serves a single user, so there is one journal.
+
+Actions are JSON objects:
+    {"delete": path}
+        a file the bot created (note, attachment)
+    {"revert": path, "offset": n, "written": text, "original": text,
+     "verb": "Deleted" | "Reopened", "label": text}
+        bytes the bot wrote into an existing file (daily section, task
+        lines, completed task); reverting never scans the file unless it
+        was edited above the span since
+"""
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import structlog
+
+from src.config import settings
+from src.services.vault_writer import remove_file, revert_span
+
+if TYPE_CHECKING:
+    from src.services.daily_notes import DailySection
+
+log = structlog.get_logger()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS steps (
+    seq INTEGER PRIMARY KEY,
+    actions TEXT NOT NULL
+);
+"""
+
+
+def _text(data: bytes) -> str:
+    # Vault bytes may not be valid UTF-8; surrogateescape round-trips them through JSON
+    return data.decode("utf-8", "surrogateescape")
+
+
+def _bytes(text: str) -> bytes:
+    return text.encode("utf-8", "surrogateescape")
+
+
+def delete_action(path: Path) -> dict:
+    """Undo action for a file the bot created."""
+    return {"delete": str(path)}
+
+
+def revert_action(
+    path: Path,
+    offset: int,
+    written: bytes,
+    original: bytes = b"",
+    *,
+    label: str,
+    verb: str = "Deleted",
+) -> dict:
+    """Undo action for `written` bytes put at `offset` of `path` in place of `original`."""
+    return {
+        "revert": str(path),
+        "offset": offset,
+        "written": _text(written),
+        "original": _text(original),
+        "verb": verb,
+        "label": label,
+    }
+
+
+def _undo_action(action: dict) -> tuple[str, str]:
+    """Reverse one action. Returns (verb, item), the verb saying if it was already undone."""
+    if "delete" in action:
+        path = Path(action["delete"])
+        if remove_file(path):
+            log.info("undo_file_deleted", path=str(path))
+            return "Deleted", path.name
+        return "Already removed", path.name
+
+    path = Path(action["revert"])
+    written, original = _bytes(action["written"]), _bytes(action["original"])
+    if revert_span(path, action["offset"], written, original):
+        log.info("undo_span_reverted", path=str(path), label=action["label"])
+        return action["verb"], action["label"]
+    # Undone by hand, or edited since: either way the bytes are no longer there
+    return "Already reverted or changed", action["label"]
+
+
+def undo_step(actions: list[dict]) -> dict[str, list[str]]:
+    """
+    Reverse one step, newest action first.
+
+    Returns:
+        Items in recorded order, grouped by verb: "Deleted", "Reopened",
+        or "Already removed" (file) / "Already reverted or changed" (span)
+        for those there was nothing left to undo
+    """
+    results = [_undo_action(action) for action in reversed(actions)]
+    done: dict[str, list[str]] = {}
+    for verb, item in reversed(results):
+        done.setdefault(verb, []).append(item)
+    return done
+
+
+class UndoJournal:
+    """Newest-last stack of undo steps, bounded to `depth` and stored in SQLite."""
+
+    def __init__(self, db_path: Path, depth: int) -> None:
+        self.db_path = db_path
+        self.depth = depth
+        self._lock = threading.Lock()
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._seq = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM steps").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def record(self, actions: list[dict]) -> None:
+        """Push one step; the oldest step drops out once `depth` are stored."""
+        if not actions:
+            return
+        with self._lock, self._conn:
+            self._seq += 1
+            self._conn.execute(
+                "INSERT OR REPLACE INTO steps VALUES (?, ?)", (self._seq, json.dumps(actions))
+            )
+            self._conn.execute("DELETE FROM steps WHERE seq <= ?", (self._seq - self.depth,))
+
+    def pop(self) -> list[dict] | None:
+        """Remove and return the newest step, or None if the journal is empty."""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT seq, actions FROM steps ORDER BY seq DESC LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("DELETE FROM steps WHERE seq = ?", (row[0],))
+            self._seq = row[0] - 1
+        return json.loads(row[1])
+
+
+_journal: UndoJournal | None = None
+_journal_lock = threading.Lock()
+
+
+def get_undo_journal() -> UndoJournal:
+    """Return the shared undo journal, opening it on first use."""
+    global _journal
+    db_path = settings.undo_journal_path
+    with _journal_lock:
+        if _journal is None or _journal.db_path != db_path:
+            if _journal is not None:
+                _journal.close()
+            _journal = UndoJournal(db_path, settings.undo_depth)
+        return _journal
+
+
+def record_undo(actions: list[dict]) -> None:
+    """Record one undoable step in the shared journal."""
+    get_undo_journal().record(actions)
+
+
+def record_capture(
+    note_path: Path | None, attachments: list[Path], section: "DailySection | None" = None
+) -> None:
+    """Record a capture: its note (or daily section) and its attachments."""
+    actions = []
+    if section is not None:
+        actions.append(
+            revert_action(
+                section.path, section.offset, section.data, label=f"section {section.time}"
+            )
+        )
+    elif note_path is not None:
+        actions.append(delete_action(note_path))
+    actions.extend(delete_action(path) for path in attachments)
+    record_undo(actions)
+
+
+def undo_last(steps: int = 1) -> list[dict[str, list[str]]]:
+    """
+    Undo the newest `steps` steps, newest first.
+
+    Returns:
+        One entry per step undone (see undo_step); shorter than `steps`
+        if the journal ran out
+    """
+    journal = get_undo_journal()
+    results = []
+    for _ in range(steps):
+        actions = journal.pop()
+        if actions is None:
+            break
+        results.append(undo_step(actions))
+    return results
@@ -0,0 +1,162 @@
+"""Vault traversal that prunes hidden and excluded folders while descending."""
+
+import json
+import os
+import re
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from pathlib import Path
+
+import structlog
+
+from src.config import settings
+
+log = structlog.get_logger()
+
+
+@dataclass(frozen=True)
+class VaultFile:
+    """A markdown file found in the vault, with the stat data used for indexing."""
+
+    path: Path
+    mtime_ns: int
+    size: int
+
+
+class IgnoreRules:
+    """
+    Decide which vault paths are skipped.
+
+    Hidden entries (`.obsidian`, `.git`, `.trash`, ...) are always ignored.
+    Patterns follow gitignore conventions:
+        - `node_modules`  matches that name at any depth
+        - `/archive`      (leading slash) or `archive/old` matches relative to the vault root
+        - `/^Daily/\\d+/`  (wrapped in slashes) is a regex, as in Obsidian's excluded files
+    A matched folder is pruned together with everything below it.
+    """
+
+    def __init__(self, patterns: Sequence[str] = ()) -> None:
+        self.name_globs: list[str] = []
+        self.path_globs: list[str] = []
+        self.regexes: list[re.Pattern] = []
+        for pattern in patterns:
+            pattern = pattern.strip()
+            if len(pattern) > 2 and pattern.startswith("/") and pattern.endswith("/"):
+                try:
+                    self.regexes.append(re.compile(pattern[1:-1]))
+                except re.error:
+                    log.warning("vault_ignore_invalid_regex", pattern=pattern)
+                continue
+            pattern = pattern.rstrip("/")
+            if not pattern:
+                continue
+            if "/" in pattern:
+                self.path_globs.append(pattern.lstrip("/"))
+            else:
+                self.name_globs.append(pattern)
+
+    def is_ignored(self, rel_path: str, name: str) -> bool:
+        """Check a single entry given its vault-relative POSIX path and its name."""
+        if name.startswith("."):
+            return True
+        if any(fnmatchcase(name, glob) for glob in self.name_globs):
+            return True
+        if any(fnmatchcase(rel_path, glob) for glob in self.path_globs):
+            return True
+        return any(regex.search(rel_path) for regex in self.regexes)
+
+    def is_ignored_path(self, vault_path: Path, path: Path) -> bool:
+        """Check `path` and each of its parent folders below `vault_path`."""
+        try:
+            parts = path.relative_to(vault_path).parts
+        except ValueError:
+            return True
+        return any(self.is_ignored("/".join(parts[: i + 1]), part) for i, part in enumerate(parts))
+
+
+def _obsidian_excludes(vault_path: Path) -> list[str]:
+    """Read Obsidian's "Excluded files" (userIgnoreFilters) as root-anchored patterns."""
+    try:
+        config = json.loads((vault_path / ".obsidian" / "app.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return []
+    if not isinstance(config, dict):
+        return []
+    filters = config.get("userIgnoreFilters") or []
+    # Obsidian filters are path prefixes ("Templates/") or regexes ("/^tmp/")
+    return [
+        f if f.startswith("/") else "/" + f.rstrip("/")
+        for f in filters
+        if isinstance(f, str) and f.strip("/")
+    ]
+
+
+def load_ignore_rules(vault_path: Path) -> IgnoreRules:
+    """Build ignore rules from VAULT_IGNORE_GLOBS and, optionally, Obsidian's excludes."""
+    patterns = list(settings.vault_ignore_globs)
+    if settings.vault_use_obsidian_excludes:
+        patterns.extend(_obsidian_excludes(vault_path))
+    return IgnoreRules(patterns)
+
+
+def walk_vault(
+    vault_path: Path,
+    ignore: IgnoreRules | None = None,
+    start: Path | None = None,
+    suffix: str = ".md",
+) -> Iterator[VaultFile]:
+    """
+    Yield every non-ignored file ending in `suffix` below `start` (default: vault root).
+
+    Ignored folders are pruned at descent time and stat results come straight
+    from the `os.scandir` entries. Symlinked folders are not followed.
+    Unreadable folders (including a missing vault) are skipped silently.
+    """
+    ignore = ignore or load_ignore_rules(vault_path)
+    root = start or vault_path
+    try:
+        root_rel = root.relative_to(vault_path).as_posix()
+    except ValueError:
+        return
+    stack = [(root, "" if root_rel == "." else root_rel)]
+
+    while stack:
+        directory, rel_dir = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                    if ignore.is_ignored(rel, entry.name):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append((Path(entry.path), rel))
+                        elif entry.name.endswith(suffix) and entry.is_file():
+                            st = entry.stat()
+                            yield VaultFile(Path(entry.path), st.st_mtime_ns, st.st_size)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+
+def walk_vault_dirs(
+    vault_path: Path,
+    ignore: IgnoreRules | None = None,
+    start: Path | None = None,
+) -> Iterator[Path]:
+    """Yield `start` (default: vault root) and every non-ignored folder below it."""
+    ignore = ignore or load_ignore_rules(vault_path)
+    root = start or vault_path
+    yield root
+    for dirpath, dirnames, _filenames in os.walk(root):
+        rel_dir = Path(dirpath).relative_to(vault_path).as_posix()
+        kept = []
+        for name in dirnames:
+            rel = name if rel_dir == "." else f"{rel_dir}/{name}"
+            if not ignore.is_ignored(rel, name):
+                kept.append(name)
+        dirnames[:] = kept
+        for name in kept:
+            yield Path(dirpath) / name
@@ -0,0 +1,245 @@
+"""Background watcher that keeps the task index in sync with the vault."""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+
+import structlog
+
+from src.config import settings
+from src.services.task_index import TaskIndex, get_task_index
+from src.services.vault_walker import walk_vault, walk_vault_dirs
+
+log = structlog.get_logger()
+
+# inotify(7) event bits
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+
+_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_ONLYDIR
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Wait this long after the last event before re-indexing dirty files,
+# but never hold a dirty file back for longer than _MAX_DELAY_SECONDS
+_DEBOUNCE_SECONDS = 0.5
+_MAX_DELAY_SECONDS = 5.0
+
+
+class InotifyUnavailableError(OSError):
+    """Raised when inotify cannot be used (non-Linux, no libc, watch limit hit)."""
+
+
+class _Inotify:
+    """Minimal ctypes binding for recursive inotify watches on a directory tree."""
+
+    def __init__(self) -> None:
+        if not sys.platform.startswith("linux"):
+            raise InotifyUnavailableError("inotify requires Linux")
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            raise InotifyUnavailableError("libc not found")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise InotifyUnavailableError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs: dict[int, Path] = {}
+
+    def add_watch(self, directory: Path) -> None:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC:
+                raise InotifyUnavailableError(err, "inotify watch limit reached")
+            # Directory vanished before we could watch it; its events are moot
+            return
+        self.dirs[wd] = directory
+
+    def remove_tree(self, directory: Path) -> None:
+        """Forget watches on `directory` and everything below it."""
+        for wd, path in list(self.dirs.items()):
+            if path.is_relative_to(directory):
+                self._libc.inotify_rm_watch(self.fd, wd)
+                self.dirs.pop(wd, None)
+
+    def read(self, timeout: float) -> list[tuple[int, int, str]]:
+        """Return pending (wd, mask, name) events, waiting up to `timeout` seconds."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class VaultWatcher:
+    """
+    Feed vault create/modify/delete/move events into a TaskIndex.
+
+    Uses inotify on Linux and falls back to periodic reconciliation via
+    `TaskIndex.sync()` elsewhere, or once the inotify watch limit is hit
+    (at startup or when a new folder appears). Event queue overflows and restarts are
+    handled by a full `sync()`, which only re-scans files that changed.
+    """
+
+    def __init__(self, index: TaskIndex, mode: str = "auto", poll_seconds: float = 30.0) -> None:
+        self.index = index
+        self.mode = mode
+        self.poll_seconds = poll_seconds
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._inotify: _Inotify | None = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="vault-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.index.watched = False
+
+    def _run(self) -> None:
+        if self.mode in ("auto", "inotify"):
+            try:
+                self._inotify = _Inotify()
+                # Watch first, then reconcile, so nothing changes unseen in between
+                self._watch_tree(self.index.vault_path)
+            except InotifyUnavailableError as e:
+                log.warning("vault_watcher_inotify_unavailable", error=str(e))
+                self._close_inotify()
+
+        try:
+            self.index.sync()
+            self.index.watched = True
+            log.info("vault_watcher_started", backend="inotify" if self._inotify else "poll")
+            if self._inotify:
+                try:
+                    self._run_inotify()
+                except InotifyUnavailableError as e:
+                    # A new folder hit the watch limit: reconcile by polling from here on
+                    log.warning("vault_watcher_inotify_unavailable", error=str(e))
+                    self._close_inotify()
+                    self.index.sync()
+                    self._run_polling()
+            else:
+                self._run_polling()
+        except Exception as e:
+            log.error("vault_watcher_failed", error=str(e))
+        finally:
+            self.index.watched = False
+            self._close_inotify()
+
+    def _run_polling(self) -> None:
+        while not self._stop.wait(self.poll_seconds):
+            self.index.sync()
+
+    def _run_inotify(self) -> None:
+        dirty: set[Path] = set()
+        last_event = first_dirty = 0.0
+        while not self._stop.is_set():
+            events = self._inotify.read(timeout=_DEBOUNCE_SECONDS)
+            for wd, mask, name in events:
+                if mask & _IN_Q_OVERFLOW:
+                    log.warning("vault_watcher_overflow")
+                    dirty.clear()
+                    self._rewatch()
+                    break
+                self._handle_event(wd, mask, name, dirty)
+            now = time.monotonic()
+            if events:
+                last_event = now
+            if not dirty:
+                first_dirty = now
+            elif now - last_event >= _DEBOUNCE_SECONDS or now - first_dirty >= _MAX_DELAY_SECONDS:
+                self.index.refresh(dirty)
+                dirty.clear()
+
+    def _handle_event(self, wd: int, mask: int, name: str, dirty: set[Path]) -> None:
+        if mask & _IN_IGNORED:
+            self._inotify.dirs.pop(wd, None)
+            return
+        directory = self._inotify.dirs.get(wd)
+        if directory is None or not name:
+            return
+        path = directory / name
+        if self.index.ignore.is_ignored_path(self.index.vault_path, path):
+            return
+
+        if not mask & _IN_ISDIR:
+            dirty.add(path)
+        elif mask & (_IN_CREATE | _IN_MOVED_TO):
+            # New or moved-in folder: watch it and index whatever it already holds
+            self._watch_tree(path)
+            vault_files = walk_vault(self.index.vault_path, self.index.ignore, start=path)
+            dirty.update(f.path for f in vault_files)
+        elif mask & (_IN_DELETE | _IN_MOVED_FROM):
+            self._inotify.remove_tree(path)
+            self.index.remove_tree(path)
+
+    def _watch_tree(self, root: Path) -> None:
+        for directory in walk_vault_dirs(self.index.vault_path, self.index.ignore, start=root):
+            self._inotify.add_watch(directory)
+
+    def _rewatch(self) -> None:
+        """Recover from a queue overflow: re-add watches and reconcile everything."""
+        self._inotify.remove_tree(self.index.vault_path)
+        self._watch_tree(self.index.vault_path)
+        self.index.sync()
+
+    def _close_inotify(self) -> None:
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+
+def start_vault_watcher() -> VaultWatcher | None:
+    """Start watching the configured vault, unless disabled in settings."""
+    if not settings.task_index_enabled or settings.vault_watcher == "off":
+        return None
+    watcher = VaultWatcher(
+        get_task_index(settings.vault_path),
+        mode=settings.vault_watcher,
+        poll_seconds=settings.vault_poll_seconds,
+    )
+    watcher.start()
+    return watcher
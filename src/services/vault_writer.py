@@ -0,0 +1,444 @@
+"""
+Crash-safe, byte-exact writes to vault files.
+
+Every write to the vault goes through this module. Writes to one file are
+serialized by a per-file lock (so two captures never interleave or lose an
+update), while writes to different files run in parallel on the I/O pool.
+New notes and rewrites land in a temp file that is renamed (or linked)
+into place, so a crash never leaves a half-written one. Appends are
+written in place with O_APPEND: a crash can cut one short (the text
+before it is untouched), which undo copes with as with any later edit.
+
+How much a write waits for the disk is set by VAULT_DURABILITY:
+    fsync  data is flushed before the rename and the folder after it;
+           a write that returned survives a crash (default)
+    group  a rewrite of an existing file is flushed before its rename
+           (else a crash could leave the note empty); everything else
+           waits for a background thread that flushes written files and
+           folders once per VAULT_GROUP_COMMIT_MS, so a crash loses at
+           most that window of new notes and appends
+    none   never flush; the OS writes back when it likes
+"""
+
+import os
+import tempfile
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import BinaryIO
+
+import structlog
+
+from src.config import settings
+
+log = structlog.get_logger()
+
+# Copy buffer for streaming the untouched parts of a file
+_CHUNK_SIZE = 1024 * 1024
+
+# A lock lives only while someone holds it, so the registry stays small
+_file_locks: weakref.WeakValueDictionary[Path, threading.RLock] = weakref.WeakValueDictionary()
+_file_locks_guard = threading.Lock()
+
+# create_unique: next suffix to try per requested name, newest names last
+_next_suffix: dict[Path, int] = {}
+_suffix_guard = threading.Lock()
+_MAX_SUFFIX_NAMES = 256
+
+
+def _fsync_path(path: Path) -> None:
+    """fsync a file or folder by path; gone is fine (deleted since)."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class _GroupCommitter:
+    """Flushes files written in `group` mode, and their folders, once per interval."""
+
+    def __init__(self) -> None:
+        self._dirty: set[Path] = set()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def add(self, path: Path) -> None:
+        with self._lock:
+            self._dirty.add(path)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="vault-group-commit", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(settings.vault_group_commit_ms / 1000)
+            self.flush()
+            with self._lock:
+                if not self._dirty:
+                    # Idle: the next write starts a new thread
+                    self._thread = None
+                    return
+
+    def flush(self) -> None:
+        """Flush everything written so far."""
+        with self._lock:
+            paths, self._dirty = self._dirty, set()
+        if not paths:
+            return
+        for path in paths:
+            _fsync_path(path)
+        for folder in {path.parent for path in paths}:
+            _fsync_path(folder)
+        log.debug("vault_group_commit", files=len(paths))
+
+
+_group_committer = _GroupCommitter()
+
+
+def _sync_data(fd: int, replacing: bool = False) -> None:
+    """
+    Call before new content becomes visible under its real name.
+
+    Args:
+        replacing: True if it is renamed over an existing file, which
+            group mode must not leave to the background flush
+    """
+    mode = settings.vault_durability
+    if mode == "fsync" or (replacing and mode == "group"):
+        os.fsync(fd)
+
+
+def _sync_done(path: Path, new_entry: bool) -> None:
+    """
+    Call after `path` was written.
+
+    Args:
+        new_entry: True if the folder changed too (rename, link, create, delete)
+    """
+    mode = settings.vault_durability
+    if mode == "fsync":
+        if new_entry:
+            _fsync_path(path.parent)
+    elif mode == "group":
+        _group_committer.add(path)
+
+
+def flush_pending() -> None:
+    """Flush writes still waiting for a group commit (on shutdown)."""
+    _group_committer.flush()
+
+
+def file_lock(path: Path) -> threading.RLock:
+    """
+    Return the lock that serializes this process's writes to `path`.
+
+    The lock is reentrant: hold it around a read-modify-write that calls
+    the helpers below, which take it again. Keep the returned lock (as a
+    `with` block does) for as long as it must stay the same lock.
+    """
+    key = Path(os.path.abspath(path))
+    with _file_locks_guard:
+        lock = _file_locks.get(key)
+        if lock is None:
+            lock = _file_locks[key] = threading.RLock()
+    return lock
+
+
+def _copy_bytes(src: BinaryIO, dst: BinaryIO, count: int | None = None) -> None:
+    """Copy `count` bytes (or everything left) from `src` to `dst` in chunks."""
+    while count is None or count > 0:
+        chunk = src.read(_CHUNK_SIZE if count is None else min(_CHUNK_SIZE, count))
+        if not chunk:
+            return
+        dst.write(chunk)
+        if count is not None:
+            count -= len(chunk)
+
+
+def _temp_file(path: Path) -> tuple[BinaryIO, Path]:
+    """Open a hidden temp file next to `path`, so the final rename stays on one filesystem."""
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    return os.fdopen(fd, "wb"), Path(tmp_name)
+
+
+def _commit(tmp: BinaryIO, tmp_path: Path, path: Path) -> None:
+    """Flush `tmp` to disk and atomically move it over `path`, keeping its permissions."""
+    try:
+        tmp.flush()
+        try:
+            mode = os.stat(path).st_mode
+        except FileNotFoundError:
+            mode = None
+        _sync_data(tmp.fileno(), replacing=mode is not None)
+        tmp.close()
+        if mode is not None:
+            os.chmod(tmp_path, mode & 0o7777)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp.close()
+        tmp_path.unlink(missing_ok=True)
+        raise
+    _sync_done(path, new_entry=True)
+
+
+def append_bytes(path: Path, data: bytes) -> int:
+    """
+    Append `data` to `path` (created if missing) without reading the file.
+
+    Only the last byte is inspected: if the file does not end with a newline,
+    one is written first so the appended text starts on its own line. The
+    cost is independent of file size, and a concurrent edit made by another
+    program is never overwritten.
+
+    Returns:
+        Byte offset at which `data` starts in the file
+    """
+    with file_lock(path):
+        fd = os.open(path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            size = os.fstat(fd).st_size
+            if size and os.pread(fd, 1, size - 1) != b"\n":
+                data = b"\n" + data
+                size += 1
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view) :]
+            _sync_data(fd)
+        finally:
+            os.close(fd)
+        _sync_done(path, new_entry=size == 0)
+    return size
+
+
+def _write_temp(path: Path, data: bytes) -> Path:
+    """Write `data` to a durable temp file next to `path`, ready to be linked into place."""
+    tmp, tmp_path = _temp_file(path)
+    try:
+        with tmp:
+            tmp.write(data)
+            tmp.flush()
+            _sync_data(tmp.fileno())
+        os.chmod(tmp_path, 0o644)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return tmp_path
+
+
+def _claim(tmp_path: Path, path: Path) -> bool:
+    """Give the finished temp file the name `path` unless that name exists. One syscall."""
+    try:
+        os.link(tmp_path, path)
+    except FileExistsError:
+        return False
+    except OSError:
+        # Filesystem without hard links: fall back to an exclusive create
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "wb") as out, tmp_path.open("rb") as src:
+            _copy_bytes(src, out)
+            out.flush()
+            _sync_data(out.fileno())
+    _sync_done(path, new_entry=True)
+    return True
+
+
+def _claim_unique(tmp_path: Path, path: Path) -> Path:
+    """Claim `path` for the finished temp file, or the next free `stem-N` (see create_unique)."""
+    key = Path(os.path.abspath(path))
+    while True:
+        with _suffix_guard:
+            n = _next_suffix.pop(key, 1)
+            _next_suffix[key] = n + 1
+            if len(_next_suffix) > _MAX_SUFFIX_NAMES:
+                # Names embed the time, so the oldest entries are done with
+                del _next_suffix[next(iter(_next_suffix))]
+        candidate = path if n == 1 else path.with_name(f"{path.stem}-{n}{path.suffix}")
+        if _claim(tmp_path, candidate):
+            return candidate
+
+
+def create_exclusive(path: Path, data: bytes) -> bool:
+    """
+    Create `path` with `data` only if it does not exist yet.
+
+    The content is written to a temp file first and hard-linked into place,
+    so other readers never see a half-written file, and two writers racing
+    to create the same file cannot both win.
+
+    Returns:
+        True if the file was created, False if it already existed
+    """
+    with file_lock(path):
+        tmp_path = _write_temp(path, data)
+        try:
+            return _claim(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+
+def create_unique(path: Path, data: bytes) -> Path:
+    """
+    Create a new file with `data` at `path`, or at `stem-2`, `stem-3`... if taken.
+
+    Suffixes come from an in-memory counter per name, so a burst of files
+    wanting the same name (captures in the same minute) each get the next
+    free suffix straight away. Every attempt is a single exclusive create;
+    names are never probed with stat, and a name taken by someone else
+    (e.g. before a restart) just moves on to the next suffix.
+
+    Returns:
+        The path actually created
+    """
+    tmp_path = _write_temp(path, data)
+    try:
+        return _claim_unique(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+class StagedFile:
+    """
+    A new file written chunk by chunk, named only once it is complete.
+
+    The chunks go to a hidden temp file beside `path`; create_unique()
+    then claims `path` (or `stem-2`...) exactly like create_unique(), so a
+    large download never sits in memory and never shows up half-written.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._file, self._tmp_path = _temp_file(path)
+
+    def write(self, chunk: bytes) -> None:
+        self._file.write(chunk)
+
+    def create_unique(self) -> Path:
+        """Finish the file and give it its name. Returns the path actually created."""
+        try:
+            self._file.flush()
+            _sync_data(self._file.fileno())
+            self._file.close()
+            os.chmod(self._tmp_path, 0o644)
+            return _claim_unique(self._tmp_path, self.path)
+        finally:
+            self.discard()
+
+    def discard(self) -> None:
+        """Drop the temp file (after create_unique, or to abandon the file)."""
+        self._file.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+
+def revert_span(path: Path, offset: int, written: bytes, original: bytes = b"") -> bool:
+    """
+    Put `original` back where the bot wrote `written` into `path`.
+
+    `written` is looked for at `offset`, or (if the file was edited above
+    it since) at its last occurrence. Removing a span still at `offset`
+    at the very end of the file is a plain truncate, so undoing the latest
+    append costs the same however large the file is. Anything else is
+    spliced atomically, which rewrites the file; finding a span that moved
+    also reads the whole file to search it, so only the truncate is O(1).
+
+    Returns:
+        True if the file was reverted, False if `written` is no longer in it
+    """
+    with file_lock(path):
+        try:
+            f = path.open("r+b")
+        except FileNotFoundError:
+            return False
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            f.seek(offset)
+            if f.read(len(written)) == written:
+                if not original and offset + len(written) == size:
+                    f.truncate(offset)
+                    _sync_data(f.fileno())
+                    _sync_done(path, new_entry=False)
+                    return True
+            else:
+                f.seek(0)
+                offset = f.read().rfind(written)
+                if offset < 0:
+                    return False
+        return replace_span(path, offset, written, original)
+
+
+def remove_file(path: Path) -> bool:
+    """Delete `path` once no write to it is in flight. Returns False if it was already gone."""
+    with file_lock(path):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            return False
+        _sync_done(path, new_entry=True)
+        return True
+
+
+def replace_spans(path: Path, spans: list[tuple[int, bytes, bytes]]) -> list[bool]:
+    """
+    Atomically apply several (offset, expected, replacement) edits to `path`.
+
+    Each span is verified against the file first; spans whose bytes no
+    longer match (or that overlap an earlier span) are skipped. The file is
+    read once and written once, and bytes outside the spans are streamed
+    across unchanged, so line endings and the trailing newline survive exactly.
+
+    Returns:
+        One flag per span, True if it was applied
+    """
+    applied = [False] * len(spans)
+    with file_lock(path), path.open("rb") as src:
+        accepted: list[tuple[int, bytes, bytes]] = []
+        end_of_last = 0
+        for i in sorted(range(len(spans)), key=lambda i: spans[i][0]):
+            offset, expected, replacement = spans[i]
+            if offset < end_of_last:
+                continue
+            src.seek(offset)
+            if src.read(len(expected)) != expected:
+                continue
+            accepted.append(spans[i])
+            applied[i] = True
+            end_of_last = offset + len(expected)
+
+        if not accepted:
+            return applied
+
+        tmp, tmp_path = _temp_file(path)
+        try:
+            src.seek(0)
+            position = 0
+            for offset, expected, replacement in accepted:
+                _copy_bytes(src, tmp, offset - position)
+                tmp.write(replacement)
+                position = offset + len(expected)
+                src.seek(position)
+            _copy_bytes(src, tmp)
+        except BaseException:
+            tmp.close()
+            tmp_path.unlink(missing_ok=True)
+            raise
+        _commit(tmp, tmp_path, path)
+    return applied
+
+
+def replace_span(path: Path, offset: int, expected: bytes, replacement: bytes) -> bool:
+    """
+    Atomically replace `expected` at byte `offset` of `path` with `replacement`.
+
+    Returns:
+        True if the file was updated, False if `expected` is no longer at `offset`
+    """
+    return replace_spans(path, [(offset, expected, replacement)])[0]
@@ -25,3 +25,13 @@ def temp_vault(tmp_path):
     attachments = tmp_path / "+" / "attachments"
     attachments.mkdir()
     return tmp_path
+
+
+@pytest.fixture(autouse=True)
+def isolated_data_dir(tmp_path, monkeypatch):
+    """Keep persistent bot state (task index, journals) inside the test's tmp dir."""
+    from src.config import settings
+
+    data_dir = tmp_path / ".bot-data"
+    monkeypatch.setattr(settings, "data_dir", data_dir)
+    return data_dir
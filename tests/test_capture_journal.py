@@ -0,0 +1,254 @@
+"""Tests for the write-ahead capture journal and its worker."""
+
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+CAPTURED_AT = datetime(2026, 1, 25, 9, 30, tzinfo=UTC)
+
+
+@pytest.fixture
+def journal_vault(temp_vault, monkeypatch):
+    """Vault with CAPTURE_JOURNAL on."""
+    from src.config import settings
+
+    monkeypatch.setattr(settings, "vault_path", temp_vault)
+    monkeypatch.setattr(settings, "capture_journal", True)
+    return temp_vault
+
+
+def _make_bot(tmp_path):
+    """Bot whose files are served from disk, as by a local Bot API server."""
+    bot = MagicMock()
+    source = tmp_path / "telegram-file"
+    source.write_bytes(b"fake-data")
+    bot.get_file = AsyncMock(return_value=MagicMock(file_path=str(source)))
+    bot.send_message = AsyncMock()
+    return bot
+
+
+def _make_update(**fields):
+    update = MagicMock()
+    msg = update.message
+    msg.reply_text = AsyncMock()
+    msg.chat_id, msg.message_id, msg.date = 42, 7, CAPTURED_AT
+    msg.caption = msg.media_group_id = None
+    for name in ("text", "voice", "photo", "document", "video", "video_note"):
+        setattr(msg, name, fields.get(name))
+    return update
+
+
+def _make_context():
+    ctx = MagicMock()
+    ctx.user_data = {}
+    return ctx
+
+
+def test_journal_retries_and_survives_reopen(isolated_data_dir):
+    """Entries stay until removed; failed ones are postponed with growing delays."""
+    from src.services.capture_journal import CaptureJournal
+
+    journal = CaptureJournal(isolated_data_dir / "captures.sqlite3")
+    first = journal.append({"content": "a"})
+    second = journal.append({"content": "b"})
+    assert journal.retry_later(first, 300) == (1, 2.0)
+    assert journal.retry_later(first, 300) == (2, 4.0)
+    assert [seq for seq, _ in journal.due()] == [second]
+    journal.close()
+
+    reopened = CaptureJournal(isolated_data_dir / "captures.sqlite3")
+    reopened.retry_all_now()
+    assert [entry for _, entry in reopened.due()] == [{"content": "a"}, {"content": "b"}]
+    reopened.remove([first, second])
+    assert len(reopened) == 0 and reopened.next_try() is None
+
+
+async def test_capture_is_acknowledged_before_vault_write(journal_vault, tmp_path):
+    """The handler only journals and replies; the worker writes the note later."""
+    from src.handlers.capture_worker import (
+        drain_captures,
+        start_capture_worker,
+        stop_capture_worker,
+    )
+    from src.handlers.photo import handle_photo
+    from src.services.capture_journal import get_capture_journal
+    from src.services.undo_journal import get_undo_journal
+
+    update = _make_update(photo=[MagicMock(file_id="p1")])
+    update.message.caption = "Whiteboard"
+    with patch("src.handlers.photo.download_attachment") as mock_download:
+        await handle_photo(update, _make_context())
+    mock_download.assert_not_called()
+    update.message.reply_text.assert_called_once_with("✓ Captured")
+    assert len(get_capture_journal()) == 1
+
+    start_capture_worker(_make_bot(tmp_path))
+    try:
+        assert await drain_captures(5) is True
+    finally:
+        await stop_capture_worker()
+
+    (note,) = (journal_vault / "+").glob("*.md")
+    (attachment,) = (journal_vault / "+" / "attachments").iterdir()
+    assert note.name == "2026-01-25 0930.md"  # Capture time, not write time
+    assert attachment.read_bytes() == b"fake-data"
+    assert note.read_text().endswith(f"Whiteboard\n\n![[+/attachments/{attachment.name}]]\n")
+    assert get_undo_journal().pop() == [{"delete": str(note)}, {"delete": str(attachment)}]
+
+
+async def test_failed_capture_is_kept_and_replayed(journal_vault, tmp_path):
+    """A vault failure leaves the capture journaled; the next start writes it once.
+
+    While it waits for its retry, draining (as /undo does) does not wait for it.
+    """
+    from src.handlers.capture_worker import (
+        drain_captures,
+        start_capture_worker,
+        stop_capture_worker,
+    )
+    from src.handlers.text import handle_text
+    from src.services.capture_journal import get_capture_journal
+
+    await handle_text(_make_update(text="Idea"), _make_context())
+
+    with patch("src.handlers.capture_worker.create_note", side_effect=OSError("unmounted")):
+        start_capture_worker(_make_bot(tmp_path))
+        assert await drain_captures(5) is True
+        await stop_capture_worker()
+    assert len(get_capture_journal()) == 1
+
+    start_capture_worker(_make_bot(tmp_path))
+    try:
+        assert await drain_captures(5) is True
+    finally:
+        await stop_capture_worker()
+    (note,) = (journal_vault / "+").glob("*.md")
+    assert note.read_text().endswith("Idea\n")
+
+
+async def test_voice_transcribed_once_and_no_speech_dropped(journal_vault, tmp_path):
+    """A transcription is checkpointed; a silent voice message is reported and dropped."""
+    from src.handlers.capture_worker import (
+        drain_captures,
+        start_capture_worker,
+        stop_capture_worker,
+    )
+    from src.handlers.voice import handle_voice
+    from src.services.capture_journal import get_capture_journal
+
+    for file_id in ("speech", "silence"):
+        update = _make_update(voice=MagicMock(file_id=file_id, duration=3))
+        await handle_voice(update, _make_context())
+        update.message.reply_text.assert_called_once_with("✓ Captured (3s)")
+
+    bot = _make_bot(tmp_path)
+    transcripts = {"speech": "Call the bank", "silence": ""}
+    bot.get_file = AsyncMock(
+        side_effect=lambda file_id: MagicMock(
+            download_as_bytearray=AsyncMock(return_value=bytearray(file_id.encode()))
+        )
+    )
+    with patch(
+        "src.services.transcription.transcribe_voice",
+        new_callable=AsyncMock,
+        side_effect=lambda data: transcripts[data.decode()],
+    ) as mock_transcribe:
+        start_capture_worker(bot)
+        try:
+            assert await drain_captures(5) is True
+        finally:
+            await stop_capture_worker()
+
+    assert mock_transcribe.call_count == 2
+    (note,) = (journal_vault / "+").glob("*.md")
+    assert note.read_text().endswith("Call the bank\n")
+    assert bot.send_message.call_args.args == (42, "❌ No speech detected")
+    assert len(get_capture_journal()) == 0
+
+
+async def test_refused_file_dropped_and_worker_survives_errors(journal_vault, tmp_path):
+    """A file Telegram refuses is dropped with a reply; a journal error doesn't kill the worker."""
+    from telegram.error import BadRequest
+
+    from src.handlers import capture_worker
+    from src.handlers.capture_worker import (
+        drain_captures,
+        start_capture_worker,
+        stop_capture_worker,
+    )
+    from src.handlers.photo import handle_photo
+    from src.handlers.text import handle_text
+    from src.services.capture_journal import get_capture_journal
+
+    await handle_photo(_make_update(photo=[MagicMock(file_id="huge")]), _make_context())
+    bot = _make_bot(tmp_path)
+    bot.get_file = AsyncMock(side_effect=BadRequest("File is too big"))
+    journal = get_capture_journal()
+    real_due, calls = journal.due, []
+
+    def flaky_due():
+        calls.append(1)
+        if len(calls) == 1:
+            raise OSError("database is locked")
+        return real_due()
+
+    with (
+        patch.object(capture_worker, "_ERROR_DELAY", 0.01),
+        patch.object(journal, "due", side_effect=flaky_due),
+    ):
+        start_capture_worker(bot)
+        try:
+            assert await drain_captures(5) is True
+        finally:
+            await stop_capture_worker()
+    assert bot.send_message.call_args.args == (
+        42,
+        "❌ Could not download the file: File is too big",
+    )
+    assert len(journal) == 0
+
+    await handle_text(_make_update(text="Still running"), _make_context())
+    start_capture_worker(_make_bot(tmp_path))
+    try:
+        assert await drain_captures(5) is True
+    finally:
+        await stop_capture_worker()
+    (note,) = (journal_vault / "+").glob("*.md")
+    assert note.read_text().endswith("Still running\n")
+
+
+async def test_album_is_journaled_as_one_capture(journal_vault, monkeypatch, tmp_path):
+    """An album is one journal entry, one reply and one note."""
+    import asyncio
+
+    from src.handlers import media_group
+    from src.handlers.capture_worker import (
+        drain_captures,
+        start_capture_worker,
+        stop_capture_worker,
+    )
+    from src.handlers.photo import handle_photo
+    from src.services.capture_journal import get_capture_journal
+
+    monkeypatch.setattr(media_group, "_ALBUM_WAIT_SECONDS", 0.01)
+    updates = []
+    for i in range(2):
+        update = _make_update(photo=[MagicMock(file_id=f"p{i}")])
+        update.message.media_group_id = "album-1"
+        update.message.message_id = 7 + i
+        await handle_photo(update, _make_context())
+        updates.append(update)
+    await asyncio.sleep(0.1)
+
+    updates[0].message.reply_text.assert_called_once_with("✓ Captured 2 files")
+    assert len(get_capture_journal()) == 1
+
+    start_capture_worker(_make_bot(tmp_path))
+    try:
+        assert await drain_captures(5) is True
+    finally:
+        await stop_capture_worker()
+    (note,) = (journal_vault / "+").glob("*.md")
+    assert note.read_text().count("![[+/attachments/tg-") == 2
+    assert len(list((journal_vault / "+" / "attachments").iterdir())) == 2
@@ -2,82 +2,108 @@
 
 from unittest.mock import AsyncMock, MagicMock
 
+import pytest
+
+
+def _undo_update(args=None):
+    update = MagicMock()
+    update.message = MagicMock()
+    update.message.reply_text = AsyncMock()
+    context = MagicMock()
+    context.args = args or []
+    return update, context
+
 
 async def test_handle_undo_with_capture(temp_vault):
     """Test /undo deletes the last captured note."""
     from src.handlers.commands import handle_undo
+    from src.services.undo_journal import record_capture
 
     # Create a test note file
     note_path = temp_vault / "+" / "test-note.md"
     note_path.write_text("Test content")
-    assert note_path.exists()
-
-    # Mock update and context
-    update = MagicMock()
-    update.message = MagicMock()
-    update.message.reply_text = AsyncMock()
-
-    context = MagicMock()
-    context.user_data = {
-        "last_capture": {
-            "note_path": note_path,
-            "attachments": [],
-        }
-    }
+    record_capture(note_path, [])
 
+    update, context = _undo_update()
     await handle_undo(update, context)
 
     assert not note_path.exists()
-    assert context.user_data["last_capture"] is None
-    update.message.reply_text.assert_called_once()
-    assert "test-note.md" in update.message.reply_text.call_args[0][0]
+    update.message.reply_text.assert_called_once_with("Deleted: test-note.md")
+
+    # Single step: a second /undo has nothing left
+    update, context = _undo_update()
+    await handle_undo(update, context)
+    update.message.reply_text.assert_called_once_with("Nothing to undo")
 
 
 async def test_handle_undo_with_attachment(temp_vault):
     """Test /undo deletes note and attachments."""
     from src.handlers.commands import handle_undo
+    from src.services.undo_journal import record_capture
 
     # Create test files
     note_path = temp_vault / "+" / "test-note.md"
     note_path.write_text("Test content")
     attachment_path = temp_vault / "+" / "attachments" / "test.jpg"
     attachment_path.write_bytes(b"fake image")
+    record_capture(note_path, [attachment_path])
 
-    update = MagicMock()
-    update.message = MagicMock()
-    update.message.reply_text = AsyncMock()
-
-    context = MagicMock()
-    context.user_data = {
-        "last_capture": {
-            "note_path": note_path,
-            "attachments": [attachment_path],
-        }
-    }
-
+    update, context = _undo_update()
     await handle_undo(update, context)
 
     assert not note_path.exists()
     assert not attachment_path.exists()
-    reply = update.message.reply_text.call_args[0][0]
-    assert "test-note.md" in reply
-    assert "test.jpg" in reply
+    update.message.reply_text.assert_called_once_with("Deleted: test-note.md, test.jpg")
 
 
 async def test_handle_undo_nothing_to_undo():
     """Test /undo with no previous capture."""
     from src.handlers.commands import handle_undo
 
-    update = MagicMock()
-    update.message = MagicMock()
-    update.message.reply_text = AsyncMock()
+    update, context = _undo_update()
+    await handle_undo(update, context)
 
-    context = MagicMock()
-    context.user_data = {}
+    update.message.reply_text.assert_called_once_with("Nothing to undo")
+
+
+async def test_handle_undo_several_steps_across_restart(temp_vault):
+    """/undo N reverses the last N writes, newest first, from the on-disk journal."""
+    from src.handlers.commands import handle_undo
+    from src.services import undo_journal
+
+    notes = [temp_vault / "+" / f"note-{i}.md" for i in range(4)]
+    for note in notes:
+        note.write_text("x")
+        undo_journal.record_capture(note, [])
 
+    # Simulate a restart: the journal is reopened from disk
+    undo_journal.get_undo_journal().close()
+    undo_journal._journal = None
+
+    update, context = _undo_update(["3"])
     await handle_undo(update, context)
 
-    update.message.reply_text.assert_called_once_with("Nothing to undo")
+    update.message.reply_text.assert_called_once_with(
+        "Deleted: note-3.md\nDeleted: note-2.md\nDeleted: note-1.md"
+    )
+    assert [n.exists() for n in notes] == [True, False, False, False]
+
+    update, context = _undo_update(["5"])
+    await handle_undo(update, context)
+    update.message.reply_text.assert_called_once_with(
+        "Deleted: note-0.md\nNothing more to undo (1 of 5)"
+    )
+
+
+@pytest.mark.parametrize("arg", ["two", "0", "²"])
+async def test_handle_undo_invalid_arg(arg):
+    """Words, zero and digit-like characters int() rejects (superscripts) get usage."""
+    from src.handlers.commands import handle_undo
+
+    update, context = _undo_update([arg])
+    await handle_undo(update, context)
+
+    update.message.reply_text.assert_called_once_with("Usage: /undo [N]")
 
 
 async def test_handle_daily_toggle_on():
@@ -151,78 +177,51 @@ async def test_handle_daily_explicit_off():
 
 
 async def test_undo_removes_last_section_from_daily_note(temp_vault):
-    """Test /undo removes only the last ### HH:MM section from a daily note."""
+    """Test /undo removes only the section the last capture wrote to the daily note."""
     from src.handlers.commands import handle_undo
+    from src.services.daily_notes import DailySection
+    from src.services.undo_journal import record_capture
 
     daily_note = temp_vault / "calendar" / "days" / "2026-03-16.md"
     daily_note.parent.mkdir(parents=True, exist_ok=True)
     daily_note.write_text("### 09:15\n\nFirst capture\n\n### 14:30\n\nSecond capture\n")
+    section = b"\n### 14:30\n\nSecond capture\n"
+    record_capture(daily_note, [], DailySection(daily_note, "14:30", 25, section))
 
-    update = MagicMock()
-    update.message = MagicMock()
-    update.message.reply_text = AsyncMock()
-
-    context = MagicMock()
-    context.user_data = {
-        "last_capture": {
-            "note_path": daily_note,
-            "attachments": [],
-            "is_daily": True,
-            "section_time": "14:30",
-        }
-    }
-
+    update, context = _undo_update()
     await handle_undo(update, context)
 
-    remaining = daily_note.read_text()
-    assert "14:30" not in remaining
-    assert "First capture" in remaining
-    reply = update.message.reply_text.call_args[0][0]
-    assert "section 14:30" in reply
+    assert daily_note.read_text() == "### 09:15\n\nFirst capture\n"
+    update.message.reply_text.assert_called_once_with("Deleted: section 14:30")
 
 
 async def test_handle_undo_files_already_removed(temp_vault):
     """Test /undo when note file no longer exists."""
     from src.handlers.commands import handle_undo
+    from src.services.undo_journal import record_capture
 
-    missing_note = temp_vault / "+" / "gone.md"  # does not exist
-
-    update = MagicMock()
-    update.message = MagicMock()
-    update.message.reply_text = AsyncMock()
-
-    context = MagicMock()
-    context.user_data = {
-        "last_capture": {
-            "note_path": missing_note,
-            "attachments": [],
-            "is_daily": False,
-            "section_time": None,
-        }
-    }
+    record_capture(temp_vault / "+" / "gone.md", [])  # does not exist
 
+    update, context = _undo_update()
     await handle_undo(update, context)
 
-    update.message.reply_text.assert_called_once_with("Files already removed")
+    update.message.reply_text.assert_called_once_with("Already removed: gone.md")
 
 
-async def test_remove_last_daily_section_file_missing(tmp_path):
-    """_remove_last_daily_section returns False when file does not exist."""
-    from src.handlers.commands import _remove_last_daily_section
-
-    result = _remove_last_daily_section(tmp_path / "nonexistent.md", "10:00")
-    assert result is False
-
+async def test_handle_undo_section_already_reverted(temp_vault):
+    """A daily section edited away since is reported as such, not as removed files."""
+    from src.handlers.commands import handle_undo
+    from src.services.daily_notes import DailySection
+    from src.services.undo_journal import record_capture
 
-async def test_remove_last_daily_section_no_match(tmp_path):
-    """_remove_last_daily_section returns False when section not found."""
-    from src.handlers.commands import _remove_last_daily_section
+    daily_note = temp_vault / "daily.md"
+    daily_note.write_text("### 09:15\n\nFirst capture\n")
+    record_capture(daily_note, [], DailySection(daily_note, "14:30", 25, b"### 14:30\n\nGone\n"))
 
-    note = tmp_path / "daily.md"
-    note.write_text("### 09:00\n\nContent\n")
+    update, context = _undo_update()
+    await handle_undo(update, context)
 
-    result = _remove_last_daily_section(note, "14:00")
-    assert result is False
+    update.message.reply_text.assert_called_once_with("Already reverted or changed: section 14:30")
 
 
 async def test_handle_daily_invalid_arg():
@@ -341,6 +340,28 @@ async def test_handle_task_with_due_date(temp_vault):
     assert call_kwargs[1]["follow_up"] is False
 
 
+async def test_handle_task_multiline_body(temp_vault):
+    """Test /task with several lines adds them all in one call."""
+    from unittest.mock import patch
+
+    from src.handlers.commands import handle_task
+
+    update = MagicMock()
+    update.message.text = "/task Buy milk --today\nCall John --follow-up"
+    update.message.reply_text = AsyncMock()
+    context = MagicMock()
+    context.args = ["Buy", "milk", "--today", "Call", "John", "--follow-up"]
+
+    with patch(
+        "src.services.task_manager.add_tasks",
+        return_value=(temp_vault / "tasks.md", ["a", "b"], []),
+    ) as mock_add:
+        await handle_task(update, context)
+
+    mock_add.assert_called_once_with(["Buy milk --today", "Call John --follow-up"])
+    update.message.reply_text.assert_called_once_with("✓ 2 tasks added")
+
+
 # ─── handle_task_list ────────────────────────────────────────────────────────
 
 
@@ -410,6 +431,196 @@ async def test_handle_task_list_shows_tasks():
     assert context.user_data["last_task_list"] == [fake_task]
 
 
+async def test_handle_task_list_sort_flag():
+    """Test /task_list --due passes the sort order alongside the date filter."""
+    from unittest.mock import patch
+
+    from src.handlers.commands import handle_task_list
+
+    update = MagicMock()
+    update.message = MagicMock()
+    update.message.reply_text = AsyncMock()
+    context = MagicMock()
+    context.args = ["—due", "--2026-04-01"]
+
+    with patch("src.services.task_manager.search_tasks", return_value=[]) as mock_search:
+        await handle_task_list(update, context)
+
+    mock_search.assert_called_once_with(limit=200, due_before="2026-04-01", sort="due")
+
+
+def _page_query(page, user_id=123456789):
+    update = MagicMock()
+    update.callback_query.data = f"tasks:page:{page}"
+    update.callback_query.from_user.id = user_id
+    update.callback_query.answer = AsyncMock()
+    update.callback_query.edit_message_text = AsyncMock()
+    return update
+
+
+async def test_handle_task_list_paginates_cached_snapshot():
+    """Test /task_list pages through one cached search and /done targets the shown page."""
+    from pathlib import Path
+    from unittest.mock import patch
+
+    from src.handlers.commands import handle_done, handle_task_list, handle_task_list_page
+    from src.services.task_manager import TaskLocation
+
+    tasks = [TaskLocation(Path("/vault/t.md"), i, f"- [ ] #to/do Task {i}") for i in range(1, 26)]
+
+    update = MagicMock()
+    update.message.reply_text = AsyncMock()
+    context = MagicMock()
+    context.args = []
+    context.user_data = {}
+
+    with (
+        patch("src.services.task_manager.search_tasks", return_value=tasks) as mock_search,
+        patch("src.services.task_manager.task_list_generation", return_value=7),
+    ):
+        await handle_task_list(update, context)
+        page_update = _page_query(1)
+        await handle_task_list_page(page_update, context)
+
+    mock_search.assert_called_once()
+    first_text = update.message.reply_text.call_args[0][0]
+    assert first_text.startswith("1. DO: Task 1\n")
+    assert first_text.endswith("Page 1/3")
+    [[next_button]] = update.message.reply_text.call_args[1]["reply_markup"].inline_keyboard
+    assert next_button.callback_data == "tasks:page:1"
+
+    edited = page_update.callback_query.edit_message_text.call_args
+    assert edited[0][0].startswith("1. DO: Task 11\n")
+    assert edited[0][0].endswith("Page 2/3")
+    prev_button, next_button = edited[1]["reply_markup"].inline_keyboard[0]
+    assert (prev_button.callback_data, next_button.callback_data) == (
+        "tasks:page:0",
+        "tasks:page:2",
+    )
+
+    done_update = MagicMock()
+    done_update.message.reply_text = AsyncMock()
+    context.args = ["2"]
+    with patch("src.services.task_manager.complete_tasks", return_value=[True]) as mock_done:
+        await handle_done(done_update, context)
+
+    assert mock_done.call_args[0][0][0].task_text == "- [ ] #to/do Task 12"
+    assert context.user_data["task_list_snapshot"]["tasks"][11] is None
+
+
+async def test_handle_task_list_page_refreshes_after_vault_change():
+    """Test paging re-runs the search only when the task index changed."""
+    from pathlib import Path
+    from unittest.mock import patch
+
+    from src.handlers.commands import handle_task_list_page
+    from src.services.task_manager import TaskLocation
+
+    stale = [TaskLocation(Path("/vault/t.md"), 1, "- [ ] #to/do Old")] * 15
+    fresh = [TaskLocation(Path("/vault/t.md"), 1, "- [ ] #to/do New")] * 15
+    context = MagicMock()
+    context.user_data = {
+        "task_list_snapshot": {"tasks": stale, "due_before": None, "sort": "due", "generation": 1}
+    }
+    update = _page_query(1)
+
+    with (
+        patch("src.services.task_manager.search_tasks", return_value=fresh) as mock_search,
+        patch("src.services.task_manager.task_list_generation", return_value=2),
+    ):
+        await handle_task_list_page(update, context)
+
+    assert mock_search.call_args[1]["sort"] == "due"
+    assert "New" in update.callback_query.edit_message_text.call_args[0][0]
+    assert context.user_data["task_list_snapshot"]["generation"] == 2
+
+
+async def test_handle_done_after_page_flip_emptied_list():
+    """Test /done after a refreshed page found no tasks asks for a new /task_list."""
+    from pathlib import Path
+    from unittest.mock import patch
+
+    from src.handlers.commands import handle_done, handle_task_list_page
+    from src.services.task_manager import TaskLocation
+
+    stale = [TaskLocation(Path("/vault/t.md"), 1, "- [ ] #to/do Old")] * 15
+    context = MagicMock()
+    context.user_data = {
+        "task_list_snapshot": {"tasks": stale, "due_before": None, "sort": "due", "generation": 1}
+    }
+    with (
+        patch("src.services.task_manager.search_tasks", return_value=[]),
+        patch("src.services.task_manager.task_list_generation", return_value=2),
+    ):
+        await handle_task_list_page(_page_query(1), context)
+
+    update = MagicMock()
+    update.message.reply_text = AsyncMock()
+    context.args = ["1"]
+    await handle_done(update, context)
+
+    update.message.reply_text.assert_called_once_with("Run /task_list first")
+
+
+async def test_handle_task_list_page_expired_or_foreign_user():
+    """Test page buttons without a snapshot, or from another user, change nothing."""
+    from src.handlers.commands import handle_task_list_page
+
+    context = MagicMock()
+    context.user_data = {}
+
+    expired = _page_query(1)
+    await handle_task_list_page(expired, context)
+    expired.callback_query.answer.assert_called_once_with("List expired. Run /task_list again")
+
+    foreign = _page_query(1, user_id=42)
+    await handle_task_list_page(foreign, context)
+    foreign.callback_query.edit_message_text.assert_not_called()
+
+
+async def test_handle_task_find_runs_query():
+    """Test /task_find parses the query and lists the matches like /task_list."""
+    from pathlib import Path
+    from unittest.mock import patch
+
+    from src.handlers.commands import handle_task_find
+    from src.services.task_manager import TaskLocation
+
+    fake_task = TaskLocation(Path("/vault/tasks.md"), 1, "- [ ] #to/do Buy milk #home")
+    update = MagicMock()
+    update.message.reply_text = AsyncMock()
+    context = MagicMock()
+    context.args = ["milk", "#home", "--recent"]
+    context.user_data = {}
+
+    with patch("src.services.task_manager.find_tasks", return_value=[fake_task]) as mock_find:
+        await handle_task_find(update, context)
+
+    query = mock_find.call_args[0][0]
+    assert query.terms == ["w:milk", "t:home"]
+    assert mock_find.call_args[1]["sort"] == "recent"
+    update.message.reply_text.assert_called_once_with("1. DO: Buy milk #home")
+    assert context.user_data["last_task_list"] == [fake_task]
+    assert context.user_data["task_list_snapshot"]["query"] == "milk #home"
+
+
+async def test_handle_task_find_usage_and_bad_query():
+    """Test /task_find without a query or with a bad due: range explains the syntax."""
+    from src.handlers.commands import handle_task_find
+
+    update = MagicMock()
+    update.message.reply_text = AsyncMock()
+    context = MagicMock()
+
+    context.args = []
+    await handle_task_find(update, context)
+    assert update.message.reply_text.call_args[0][0].startswith("Usage: /task_find")
+
+    context.args = ["due:someday"]
+    await handle_task_find(update, context)
+    assert update.message.reply_text.call_args[0][0].startswith("Unknown date: someday")
+
+
 # ─── handle_done ─────────────────────────────────────────────────────────────
 
 
@@ -506,12 +717,13 @@ async def test_handle_done_success():
     context.args = ["1"]
     context.user_data = {"last_task_list": [fake_task]}
 
-    with patch("src.services.task_manager.complete_task", return_value=True):
+    with patch("src.services.task_manager.complete_tasks", return_value=[True]):
         await handle_done(update, context)
 
     reply = update.message.reply_text.call_args[0][0]
     assert "✓ Done" in reply
-    assert context.user_data["last_task_list"] is None
+    # The list is kept for further /done calls; the completed entry is retired
+    assert context.user_data["last_task_list"] == [None]
 
 
 async def test_handle_done_task_changed():
@@ -535,7 +747,7 @@ async def test_handle_done_task_changed():
     context.args = ["1"]
     context.user_data = {"last_task_list": [fake_task]}
 
-    with patch("src.services.task_manager.complete_task", return_value=False):
+    with patch("src.services.task_manager.complete_tasks", return_value=[False]):
         await handle_done(update, context)
 
     update.message.reply_text.assert_called_once_with(
@@ -543,6 +755,53 @@ async def test_handle_done_task_changed():
     )
 
 
+async def test_handle_done_batch_reports_each_task():
+    """Test /done 1 3-4 completes in one call and reports per-task outcomes."""
+    from pathlib import Path
+    from unittest.mock import patch
+
+    from src.handlers.commands import handle_done
+    from src.services.task_manager import TaskLocation
+
+    tasks = [
+        TaskLocation(Path("/vault/tasks.md"), i, f"- [ ] #to/do Task {i}") for i in range(1, 5)
+    ]
+    tasks[2] = None  # completed by an earlier /done
+
+    update = MagicMock()
+    update.message = MagicMock()
+    update.message.reply_text = AsyncMock()
+    context = MagicMock()
+    context.args = ["1", "3-4"]
+    context.user_data = {"last_task_list": tasks}
+
+    with patch("src.services.task_manager.complete_tasks", return_value=[True, False]) as mock:
+        await handle_done(update, context)
+
+    mock.assert_called_once()
+    assert [t.line_number for t in mock.call_args[0][0]] == [1, 4]
+    reply = update.message.reply_text.call_args[0][0]
+    assert reply.splitlines() == [
+        "✓ 1. Task 1",
+        "· 3. already done",
+        "✗ 4. changed or missing: Task 4",
+        "Run /task_list again to refresh",
+    ]
+    assert context.user_data["last_task_list"][0] is None
+    assert context.user_data["last_task_list"][3] is not None
+
+
+def test_parse_task_numbers():
+    """Numbers, ranges, commas and Telegram dashes are accepted; junk is not."""
+    from src.handlers.commands import _parse_task_numbers
+
+    assert _parse_task_numbers(["1", "3", "5-8"], 10) == [1, 3, 5, 6, 7, 8]
+    assert _parse_task_numbers(["2,4–5", "2"], 10) == [2, 4, 5]
+    assert _parse_task_numbers(["1", "x"], 10) is None
+    # Huge ranges stop just past the list, so the range check still rejects them
+    assert _parse_task_numbers(["9-100000000"], 10) == [9, 10, 11]
+
+
 # ─── message=None early returns ──────────────────────────────────────────────
 
 
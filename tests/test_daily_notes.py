@@ -18,10 +18,11 @@ def test_append_to_daily_creates_new_note(temp_vault):
         mock_settings.daily_note_format = "%Y-%m-%d"
         mock_dt.now.return_value = datetime(2026, 1, 25, 14, 30, 0)
 
-        path, section_time = append_to_daily(content="First entry")
+        section = append_to_daily(content="First entry")
+        path = section.path
 
         assert path.exists()
-        assert section_time == "14:30"
+        assert section.time == "14:30"
         content = path.read_text()
         assert "dateCreated: 2026-01-25" in content
         assert "k/daily" in content
@@ -57,10 +58,14 @@ Morning entry
         mock_settings.daily_note_format = "%Y-%m-%d"
         mock_dt.now.return_value = datetime(2026, 1, 25, 15, 45, 0)
 
-        path, section_time = append_to_daily(content="Afternoon entry")
+        with patch("src.services.daily_notes.create_exclusive") as mock_create:
+            section = append_to_daily(content="Afternoon entry")
+        path = section.path
 
+        # An existing note is appended to without staging a new one first
+        mock_create.assert_not_called()
         assert path == existing_path
-        assert section_time == "15:45"
+        assert section.time == "15:45"
         content = path.read_text()
         assert "## 10:00" in content
         assert "Morning entry" in content
@@ -82,12 +87,13 @@ def test_append_to_daily_with_attachment(temp_vault):
         mock_settings.daily_note_format = "%Y-%m-%d"
         mock_dt.now.return_value = datetime(2026, 1, 25, 16, 0, 0)
 
-        path, section_time = append_to_daily(
+        section = append_to_daily(
             content="Photo caption",
             attachment_path="+/attachments/photo.jpg",
         )
 
-        assert section_time == "16:00"
+        assert section.time == "16:00"
+        path = section.path
         content = path.read_text()
         assert "## 16:00" in content
         assert "Photo caption" in content
@@ -108,12 +114,92 @@ def test_append_to_daily_attachment_only(temp_vault):
         mock_settings.daily_note_format = "%Y-%m-%d"
         mock_dt.now.return_value = datetime(2026, 1, 25, 17, 30, 0)
 
-        path, section_time = append_to_daily(
+        section = append_to_daily(
             content="",
             attachment_path="+/attachments/doc.pdf",
         )
 
-        assert section_time == "17:30"
+        assert section.time == "17:30"
+        path = section.path
         content = path.read_text()
         assert "## 17:30" in content
         assert "![[+/attachments/doc.pdf]]" in content
+
+
+def test_append_to_daily_keeps_existing_bytes(temp_vault):
+    """Appending writes only the new section; the note's existing bytes are untouched."""
+    from src.services.daily_notes import append_to_daily
+
+    dailies = temp_vault / "Dailies"
+    dailies.mkdir()
+    existing = b"---\r\ndateCreated: 2026-01-25\r\n---\r\n\r\n### 10:00\r\nEdited in Obsidian"
+    (dailies / "2026-01-25.md").write_bytes(existing)
+
+    with (
+        patch("src.services.daily_notes.settings") as mock_settings,
+        patch("src.services.daily_notes.datetime") as mock_dt,
+    ):
+        mock_settings.daily_notes_path = dailies
+        mock_settings.timezone = "UTC"
+        mock_settings.daily_note_format = "%Y-%m-%d"
+        mock_dt.now.return_value = datetime(2026, 1, 25, 15, 45, 0)
+
+        section = append_to_daily(content="Afternoon entry")
+
+    data = section.path.read_bytes()
+    assert data.startswith(existing)
+    assert data.endswith(b"\n\n### 15:45\nAfternoon entry\n")
+    assert data.count(b"dateCreated") == 1
+
+
+def _append_at(dailies, hour, minute, content):
+    from src.services.daily_notes import append_to_daily
+
+    with (
+        patch("src.services.daily_notes.settings") as mock_settings,
+        patch("src.services.daily_notes.datetime") as mock_dt,
+    ):
+        mock_settings.daily_notes_path = dailies
+        mock_settings.timezone = "UTC"
+        mock_settings.daily_note_format = "%Y-%m-%d"
+        mock_dt.now.return_value = datetime(2026, 1, 25, hour, minute, 0)
+        return append_to_daily(content=content)
+
+
+def _undo(section):
+    from src.services.undo_journal import record_capture, undo_last
+
+    record_capture(section.path, [], section)
+    return undo_last() == [{"Deleted": [f"section {section.time}"]}]
+
+
+def test_undo_section_same_minute_removes_only_that_capture(temp_vault):
+    """Two captures in one minute: undo removes the latest one by offset."""
+    dailies = temp_vault / "Dailies"
+    first = _append_at(dailies, 9, 15, "First")
+    before = first.path.read_bytes()
+    second = _append_at(dailies, 9, 15, "Second")
+
+    assert _undo(second) is True
+    assert first.path.read_bytes() == before
+    assert _undo(second) is False
+
+
+def test_undo_section_survives_edits_elsewhere(temp_vault):
+    """An edit above the section moves it; an edit inside it protects it."""
+    dailies = temp_vault / "Dailies"
+    _append_at(dailies, 9, 0, "Morning")
+    noon = _append_at(dailies, 12, 0, "Noon")
+    evening = _append_at(dailies, 18, 0, "Evening")
+    path = noon.path
+
+    path.write_bytes(path.read_bytes().replace(b"Morning", b"Morning, edited in Obsidian"))
+    assert _undo(noon) is True
+    text = path.read_text()
+    assert "Noon" not in text
+    assert "Morning, edited in Obsidian" in text
+    assert text.endswith("### 18:00\nEvening\n")
+
+    path.write_bytes(path.read_bytes().replace(b"Evening", b"Evening (fixed typo)"))
+    assert _undo(evening) is False
+    assert "Evening (fixed typo)" in path.read_text()
@@ -0,0 +1,67 @@
+"""Tests for the vault I/O executor and loop lag monitor."""
+
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+async def test_run_blocking_uses_vault_io_thread():
+    """Blocking calls run on the dedicated vault-io pool, not the loop thread."""
+    from src.services.executor import run_blocking
+
+    name = await run_blocking(lambda: threading.current_thread().name)
+
+    assert name.startswith("vault-io")
+
+
+async def test_run_blocking_passes_args_and_kwargs():
+    from src.services.executor import run_blocking
+
+    assert await run_blocking(lambda a, b=0: a + b, 2, b=3) == 5
+
+
+async def test_loop_lag_monitor_detects_blocking():
+    """A synchronous sleep on the loop is reported as blocked time."""
+    from src.services.executor import LoopLagMonitor
+
+    monitor = LoopLagMonitor(interval=0.01, threshold=0.05)
+    monitor.start()
+    await asyncio.sleep(0.03)
+    time.sleep(0.15)  # block the loop on purpose
+    await asyncio.sleep(0.03)
+    await monitor.stop()
+
+    assert monitor.stats.blocked_count >= 1
+    assert monitor.stats.max_lag_seconds >= 0.1
+
+
+async def test_task_list_does_not_block_event_loop():
+    """A slow vault scan leaves the loop free for other work."""
+    from src.handlers.commands import handle_task_list
+
+    update = MagicMock()
+    update.message.reply_text = AsyncMock()
+    context = MagicMock()
+    context.args = []
+    context.user_data = {}
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    def slow_search(**kwargs):
+        time.sleep(0.2)
+        return []
+
+    ticker_task = asyncio.create_task(ticker())
+    with patch("src.services.task_manager.search_tasks", side_effect=slow_search):
+        await handle_task_list(update, context)
+    ticker_task.cancel()
+
+    assert ticks >= 5
+    update.message.reply_text.assert_called_once_with("No open tasks found")
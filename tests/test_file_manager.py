@@ -1,6 +1,8 @@
 """Tests for file_manager service."""
 
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
+
+import pytest
 
 
 def test_save_attachment(temp_vault):
@@ -20,3 +22,96 @@ def test_save_attachment(temp_vault):
         assert file_path.read_bytes() == test_data
         assert wikilink.startswith("+/attachments/tg-")
         assert wikilink.endswith(".jpg")
+
+
+def test_save_attachment_same_second_gets_new_name(temp_vault):
+    """A second attachment in the same second does not overwrite the first."""
+    from datetime import datetime
+
+    from src.services.file_manager import save_attachment
+
+    with (
+        patch("src.services.file_manager.settings") as mock_settings,
+        patch("src.services.file_manager.datetime") as mock_dt,
+    ):
+        mock_settings.attachments_path = temp_vault / "+" / "attachments"
+        mock_settings.attachments_folder = "+/attachments"
+        mock_settings.timezone = "UTC"
+        mock_dt.now.return_value = datetime(2026, 1, 24, 14, 30, 5)
+
+        first, _ = save_attachment(b"one", "jpg")
+        second, wikilink = save_attachment(b"two", "jpg")
+
+    assert first.read_bytes() == b"one"
+    assert second.read_bytes() == b"two"
+    assert wikilink == "+/attachments/tg-2026-01-24-143005-2.jpg"
+
+
+@pytest.fixture
+def attachments_vault(temp_vault, monkeypatch):
+    from src.config import settings
+
+    monkeypatch.setattr(settings, "vault_path", temp_vault)
+    return temp_vault / "+" / "attachments"
+
+
+async def test_save_attachment_stream_keeps_memory_flat(attachments_vault):
+    """A large attachment is written chunk by chunk, never held in memory."""
+    import tracemalloc
+
+    from src.services.file_manager import save_attachment_stream
+
+    chunk = b"v" * (256 * 1024)
+
+    async def chunks():
+        for _ in range(80):  # 20 MB
+            yield chunk
+
+    tracemalloc.start()
+    try:
+        file_path, wikilink = await save_attachment_stream(chunks(), "mp4", prefix="vid")
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert peak < 4 * 1024 * 1024
+    assert file_path.stat().st_size == 80 * len(chunk)
+    assert wikilink == f"+/attachments/{file_path.name}"
+    assert list(attachments_vault.iterdir()) == [file_path]
+
+
+async def test_save_attachment_stream_failure_leaves_nothing(attachments_vault):
+    """A download that breaks off leaves no partial file behind."""
+    from src.services.file_manager import save_attachment_stream
+
+    async def chunks():
+        yield b"first part"
+        raise ConnectionError("connection reset")
+
+    with pytest.raises(ConnectionError):
+        await save_attachment_stream(chunks(), "pdf", prefix="doc")
+    assert list(attachments_vault.iterdir()) == []
+
+
+async def test_download_attachment_streams_over_http(attachments_vault, monkeypatch):
+    """Telegram files are fetched with a streamed GET into the attachments folder."""
+    import httpx
+
+    from src.services import file_manager
+
+    def handler(request):
+        assert request.url == "https://api.telegram.org/file/bottoken/photos/file_1.jpg"
+        return httpx.Response(200, content=b"jpeg bytes")
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        file_manager.httpx,
+        "AsyncClient",
+        lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs),
+    )
+    file = MagicMock(file_path="https://api.telegram.org/file/bottoken/photos/file_1.jpg")
+
+    file_path, _ = await file_manager.download_attachment(file, "jpg")
+
+    assert file_path.read_bytes() == b"jpeg bytes"
+    assert file_path.name.startswith("tg-")
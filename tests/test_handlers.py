@@ -3,6 +3,8 @@
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
+from src.services.daily_notes import DailySection
+
 # ─── helpers ────────────────────────────────────────────────────────────────
 
 
@@ -19,6 +21,7 @@ def _make_update(text=None, voice=None, photo=None, document=None, video=None, v
     msg.video = video
     msg.video_note = video_note
     msg.caption = None
+    msg.media_group_id = None
     update.message = msg
     return update
 
@@ -33,6 +36,13 @@ def _make_context(daily_mode=False):
     return ctx
 
 
+def _last_undo_step():
+    """Actions /undo would reverse next (taken off the journal)."""
+    from src.services.undo_journal import get_undo_journal
+
+    return get_undo_journal().pop()
+
+
 FAKE_NOTE = Path("/tmp/test-vault/+/2026-01-01 1200.md")
 FAKE_ATTACH = Path("/tmp/test-vault/+/attachments/tg-abc.jpg")
 FAKE_WIKILINK = "+/attachments/tg-abc.jpg"
@@ -53,8 +63,7 @@ async def test_handle_text_basic(mock_create):
 
     mock_create.assert_called_once_with(content="Hello world")
     update.message.reply_text.assert_called_once_with("✓ Captured")
-    assert ctx.user_data["last_capture"]["note_path"] == FAKE_NOTE
-    assert ctx.user_data["last_capture"]["attachments"] == []
+    assert _last_undo_step() == [{"delete": str(FAKE_NOTE)}]
 
 
 @patch("src.services.task_manager.add_task", return_value=FAKE_NOTE)
@@ -71,7 +80,26 @@ async def test_handle_text_task_prefix(mock_add_task):
     update.message.reply_text.assert_called_once_with("✓ Task added")
 
 
-@patch("src.services.daily_notes.append_to_daily", return_value=(FAKE_NOTE, "12:00"))
+@patch("src.services.task_manager.add_tasks", return_value=(FAKE_NOTE, ["a", "b"], []))
+async def test_handle_text_bulk_tasks(mock_add_tasks):
+    """A 'tasks:' message with several lines → one bulk add."""
+    from src.handlers.text import handle_text
+
+    update = _make_update(text="tasks:\n- Buy milk --today\n- Call John --follow-up")
+    ctx = _make_context()
+
+    await handle_text(update, ctx)
+
+    mock_add_tasks.assert_called_once_with(
+        ["tasks:", "- Buy milk --today", "- Call John --follow-up"]
+    )
+    update.message.reply_text.assert_called_once_with("✓ 2 tasks added")
+
+
+@patch(
+    "src.services.daily_notes.append_to_daily",
+    return_value=DailySection(FAKE_NOTE, "12:00", 0, b""),
+)
 async def test_handle_text_daily_mode(mock_append):
     """daily_mode=True → appends to daily note."""
     from src.handlers.text import handle_text
@@ -82,8 +110,7 @@ async def test_handle_text_daily_mode(mock_append):
     await handle_text(update, ctx)
 
     mock_append.assert_called_once_with(content="Daily capture")
-    assert ctx.user_data["last_capture"]["is_daily"] is True
-    assert ctx.user_data["last_capture"]["section_time"] == "12:00"
+    assert _last_undo_step()[0]["label"] == "section 12:00"
 
 
 async def test_handle_text_no_message():
@@ -159,7 +186,11 @@ async def test_handle_voice_no_speech(mock_transcribe):
 
 
 @patch("src.handlers.photo.create_note", return_value=FAKE_NOTE)
-@patch("src.handlers.photo.save_attachment", return_value=(FAKE_ATTACH, FAKE_WIKILINK))
+@patch(
+    "src.handlers.photo.download_attachment",
+    new_callable=AsyncMock,
+    return_value=(FAKE_ATTACH, FAKE_WIKILINK),
+)
 async def test_handle_photo_basic(mock_save, mock_create):
     """Photo → saves attachment, creates note, replies ✓ Captured."""
     from src.handlers.photo import handle_photo
@@ -171,14 +202,18 @@ async def test_handle_photo_basic(mock_save, mock_create):
 
     await handle_photo(update, ctx)
 
-    mock_save.assert_called_once_with(b"fake-data", "jpg")
+    mock_save.assert_called_once_with(ctx.bot.get_file.return_value, "jpg")
     mock_create.assert_called_once_with(content="", attachment_path=FAKE_WIKILINK)
     update.message.reply_text.assert_called_once_with("✓ Captured")
-    assert ctx.user_data["last_capture"]["attachments"] == [FAKE_ATTACH]
+    assert _last_undo_step()[-1] == {"delete": str(FAKE_ATTACH)}
 
 
 @patch("src.handlers.photo.create_note", return_value=FAKE_NOTE)
-@patch("src.handlers.photo.save_attachment", return_value=(FAKE_ATTACH, FAKE_WIKILINK))
+@patch(
+    "src.handlers.photo.download_attachment",
+    new_callable=AsyncMock,
+    return_value=(FAKE_ATTACH, FAKE_WIKILINK),
+)
 async def test_handle_photo_with_caption(mock_save, mock_create):
     """Photo with caption → caption included in note."""
     from src.handlers.photo import handle_photo
@@ -198,7 +233,11 @@ async def test_handle_photo_with_caption(mock_save, mock_create):
 
 
 @patch("src.handlers.document.create_note", return_value=FAKE_NOTE)
-@patch("src.handlers.document.save_attachment", return_value=(FAKE_ATTACH, FAKE_WIKILINK))
+@patch(
+    "src.handlers.document.download_attachment",
+    new_callable=AsyncMock,
+    return_value=(FAKE_ATTACH, FAKE_WIKILINK),
+)
 async def test_handle_document_basic(mock_save, mock_create):
     """Document → saves attachment, creates note with filename."""
     from src.handlers.document import handle_document
@@ -211,14 +250,18 @@ async def test_handle_document_basic(mock_save, mock_create):
 
     await handle_document(update, ctx)
 
-    mock_save.assert_called_once_with(b"fake-data", "pdf", prefix="doc")
+    mock_save.assert_called_once_with(ctx.bot.get_file.return_value, "pdf", prefix="doc")
     call_content = mock_create.call_args[1]["content"]
     assert "report.pdf" in call_content
     update.message.reply_text.assert_called_once_with("✓ Captured")
 
 
 @patch("src.handlers.document.create_note", return_value=FAKE_NOTE)
-@patch("src.handlers.document.save_attachment", return_value=(FAKE_ATTACH, FAKE_WIKILINK))
+@patch(
+    "src.handlers.document.download_attachment",
+    new_callable=AsyncMock,
+    return_value=(FAKE_ATTACH, FAKE_WIKILINK),
+)
 async def test_handle_document_no_extension(mock_save, mock_create):
     """File without extension → uses 'bin' as extension."""
     from src.handlers.document import handle_document
@@ -231,11 +274,15 @@ async def test_handle_document_no_extension(mock_save, mock_create):
 
     await handle_document(update, ctx)
 
-    mock_save.assert_called_once_with(b"fake-data", "bin", prefix="doc")
+    mock_save.assert_called_once_with(ctx.bot.get_file.return_value, "bin", prefix="doc")
 
 
 @patch("src.handlers.document.create_note", return_value=FAKE_NOTE)
-@patch("src.handlers.document.save_attachment", return_value=(FAKE_ATTACH, FAKE_WIKILINK))
+@patch(
+    "src.handlers.document.download_attachment",
+    new_callable=AsyncMock,
+    return_value=(FAKE_ATTACH, FAKE_WIKILINK),
+)
 async def test_handle_document_with_caption(mock_save, mock_create):
     """Document with caption → caption prepended to note content."""
     from src.handlers.document import handle_document
@@ -258,7 +305,11 @@ async def test_handle_document_with_caption(mock_save, mock_create):
 
 
 @patch("src.handlers.video.create_note", return_value=FAKE_NOTE)
-@patch("src.handlers.video.save_attachment", return_value=(FAKE_ATTACH, FAKE_WIKILINK))
+@patch(
+    "src.handlers.video.download_attachment",
+    new_callable=AsyncMock,
+    return_value=(FAKE_ATTACH, FAKE_WIKILINK),
+)
 @patch("src.handlers.video.extract_audio_from_video", return_value=b"mp3-data")
 @patch("src.handlers.video.transcribe_mp3", new_callable=AsyncMock, return_value="Video transcript")
 async def test_handle_video_with_transcription(
@@ -282,7 +333,11 @@ async def test_handle_video_with_transcription(
 
 
 @patch("src.handlers.video.create_note", return_value=FAKE_NOTE)
-@patch("src.handlers.video.save_attachment", return_value=(FAKE_ATTACH, FAKE_WIKILINK))
+@patch(
+    "src.handlers.video.download_attachment",
+    new_callable=AsyncMock,
+    return_value=(FAKE_ATTACH, FAKE_WIKILINK),
+)
 @patch("src.handlers.video.extract_audio_from_video", side_effect=Exception("ffmpeg missing"))
 async def test_handle_video_transcription_fails_gracefully(mock_extract, mock_save, mock_create):
     """Video transcription failure → still creates note (non-fatal)."""
@@ -302,7 +357,11 @@ async def test_handle_video_transcription_fails_gracefully(mock_extract, mock_sa
 
 
 @patch("src.handlers.video.create_note", return_value=FAKE_NOTE)
-@patch("src.handlers.video.save_attachment", return_value=(FAKE_ATTACH, FAKE_WIKILINK))
+@patch(
+    "src.handlers.video.download_attachment",
+    new_callable=AsyncMock,
+    return_value=(FAKE_ATTACH, FAKE_WIKILINK),
+)
 @patch("src.handlers.video.extract_audio_from_video", return_value=b"mp3-data")
 @patch(
     "src.handlers.video.transcribe_mp3", new_callable=AsyncMock, return_value="Circle transcript"
@@ -371,10 +430,14 @@ async def test_handle_video_note_no_message():
 # ─── daily mode branches ──────────────────────────────────────────────────────
 
 
-@patch("src.handlers.photo.save_attachment", return_value=(FAKE_ATTACH, FAKE_WIKILINK))
+@patch(
+    "src.handlers.photo.download_attachment",
+    new_callable=AsyncMock,
+    return_value=(FAKE_ATTACH, FAKE_WIKILINK),
+)
 @patch(
     "src.services.daily_notes.append_to_daily",
-    return_value=(FAKE_NOTE, "14:30"),
+    return_value=DailySection(FAKE_NOTE, "14:30", 0, b""),
 )
 async def test_handle_photo_daily_mode(mock_append, mock_save):
     """Photo in daily mode → appends to daily note."""
@@ -388,13 +451,17 @@ async def test_handle_photo_daily_mode(mock_append, mock_save):
     await handle_photo(update, ctx)
 
     mock_append.assert_called_once()
-    assert ctx.user_data["last_capture"]["is_daily"] is True
+    assert _last_undo_step()[0]["revert"] == str(FAKE_NOTE)
 
 
-@patch("src.handlers.document.save_attachment", return_value=(FAKE_ATTACH, FAKE_WIKILINK))
+@patch(
+    "src.handlers.document.download_attachment",
+    new_callable=AsyncMock,
+    return_value=(FAKE_ATTACH, FAKE_WIKILINK),
+)
 @patch(
     "src.services.daily_notes.append_to_daily",
-    return_value=(FAKE_NOTE, "14:30"),
+    return_value=DailySection(FAKE_NOTE, "14:30", 0, b""),
 )
 async def test_handle_document_daily_mode(mock_append, mock_save):
     """Document in daily mode → appends to daily note."""
@@ -409,14 +476,14 @@ async def test_handle_document_daily_mode(mock_append, mock_save):
     await handle_document(update, ctx)
 
     mock_append.assert_called_once()
-    assert ctx.user_data["last_capture"]["is_daily"] is True
+    assert _last_undo_step()[0]["revert"] == str(FAKE_NOTE)
 
 
 @patch("src.handlers.voice.create_note", return_value=FAKE_NOTE)
 @patch("src.handlers.voice.transcribe_voice", new_callable=AsyncMock, return_value="Speech")
 @patch(
     "src.services.daily_notes.append_to_daily",
-    return_value=(FAKE_NOTE, "14:30"),
+    return_value=DailySection(FAKE_NOTE, "14:30", 0, b""),
 )
 async def test_handle_voice_daily_mode(mock_append, mock_transcribe, mock_create):
     """Voice in daily mode → appends transcription to daily note."""
@@ -431,16 +498,20 @@ async def test_handle_voice_daily_mode(mock_append, mock_transcribe, mock_create
     await handle_voice(update, ctx)
 
     mock_append.assert_called_once_with(content="Speech")
-    assert ctx.user_data["last_capture"]["is_daily"] is True
+    assert _last_undo_step()[0]["revert"] == str(FAKE_NOTE)
 
 
 @patch("src.handlers.video.create_note", return_value=FAKE_NOTE)
-@patch("src.handlers.video.save_attachment", return_value=(FAKE_ATTACH, FAKE_WIKILINK))
+@patch(
+    "src.handlers.video.download_attachment",
+    new_callable=AsyncMock,
+    return_value=(FAKE_ATTACH, FAKE_WIKILINK),
+)
 @patch("src.handlers.video.extract_audio_from_video", return_value=b"mp3")
 @patch("src.handlers.video.transcribe_mp3", new_callable=AsyncMock, return_value="Vid speech")
 @patch(
     "src.services.daily_notes.append_to_daily",
-    return_value=(FAKE_NOTE, "14:30"),
+    return_value=DailySection(FAKE_NOTE, "14:30", 0, b""),
 )
 async def test_handle_video_daily_mode(
     mock_append, mock_transcribe, mock_extract, mock_save, mock_create
@@ -457,7 +528,7 @@ async def test_handle_video_daily_mode(
     await handle_video(update, ctx)
 
     mock_append.assert_called_once()
-    assert ctx.user_data["last_capture"]["is_daily"] is True
+    assert _last_undo_step()[0]["revert"] == str(FAKE_NOTE)
 
 
 # ─── note_writer same-minute collision ───────────────────────────────────────
@@ -484,3 +555,223 @@ def test_create_note_same_minute_collision(temp_vault):
 
     assert result.name != collision_name
     assert result.exists()
+
+
+# ─── capture coalescing ─────────────────────────────────────────────────────
+
+
+async def test_coalesced_captures_become_one_note(monkeypatch):
+    """Captures inside the window are written as one note with one reply."""
+    import asyncio
+
+    from src.config import settings
+    from src.handlers.photo import handle_photo
+    from src.handlers.text import handle_text
+
+    monkeypatch.setattr(settings, "capture_coalesce_seconds", 0.05)
+    ctx = _make_context()
+    first, second = _make_update(text="First"), _make_update(text="Second")
+    photo = _make_update(photo=[MagicMock(file_id="p1")])
+    for update in (first, second, photo):
+        update.message.chat_id = 42
+
+    with (
+        patch("src.handlers.capture_buffer.create_note", return_value=FAKE_NOTE) as mock_create,
+        patch(
+            "src.handlers.photo.download_attachment",
+            new_callable=AsyncMock,
+            return_value=(FAKE_ATTACH, FAKE_WIKILINK),
+        ),
+    ):
+        await handle_text(first, ctx)
+        await handle_text(second, ctx)
+        await handle_photo(photo, ctx)
+        mock_create.assert_not_called()
+        await asyncio.sleep(0.15)
+
+    mock_create.assert_called_once_with(content=f"First\n\nSecond\n\n![[{FAKE_WIKILINK}]]")
+    first.message.reply_text.assert_not_called()
+    photo.message.reply_text.assert_called_once_with("✓ Captured 3 messages")
+    assert _last_undo_step() == [{"delete": str(FAKE_NOTE)}, {"delete": str(FAKE_ATTACH)}]
+
+
+async def test_failed_batch_is_reported_and_kept(monkeypatch):
+    """A batch the timer cannot write is reported and written with the next capture."""
+    import asyncio
+
+    from src.config import settings
+    from src.handlers.text import handle_text
+
+    monkeypatch.setattr(settings, "capture_coalesce_seconds", 0.05)
+    ctx = _make_context()
+    first, second = _make_update(text="First"), _make_update(text="Second")
+    for update in (first, second):
+        update.message.chat_id = 42
+
+    with patch(
+        "src.handlers.capture_buffer.create_note", side_effect=[OSError("unmounted"), FAKE_NOTE]
+    ) as mock_create:
+        await handle_text(first, ctx)
+        await asyncio.sleep(0.15)
+        first.message.reply_text.assert_called_once_with(
+            "❌ Capture failed; retrying with your next message"
+        )
+        await handle_text(second, ctx)
+        await asyncio.sleep(0.15)
+
+    assert mock_create.call_args.kwargs == {"content": "First\n\nSecond"}
+    second.message.reply_text.assert_called_once_with("✓ Captured 2 messages")
+
+
+async def test_capture_kept_when_mode_toggle_flush_fails(monkeypatch):
+    """If the old batch cannot be written on a daily-mode toggle, the new capture joins it."""
+    import asyncio
+
+    from src.config import settings
+    from src.handlers.text import handle_text
+
+    monkeypatch.setattr(settings, "capture_coalesce_seconds", 0.05)
+    first, second = _make_update(text="First"), _make_update(text="Second")
+    for update in (first, second):
+        update.message.chat_id = 42
+
+    with patch(
+        "src.handlers.capture_buffer.create_note", side_effect=[OSError("unmounted"), FAKE_NOTE]
+    ) as mock_create:
+        await handle_text(first, _make_context())
+        await handle_text(second, _make_context(daily_mode=True))
+        first.message.reply_text.assert_called_once_with(
+            "❌ Capture failed; retrying with your next message"
+        )
+        await asyncio.sleep(0.15)
+
+    assert mock_create.call_args.kwargs == {"content": "First\n\nSecond"}
+    second.message.reply_text.assert_called_once_with("✓ Captured 2 messages")
+
+
+@patch(
+    "src.services.daily_notes.append_to_daily",
+    return_value=DailySection(FAKE_NOTE, "12:00", 0, b""),
+)
+async def test_undo_flushes_and_removes_pending_batch(mock_daily, monkeypatch, tmp_path):
+    """/undo inside the window writes the batch first, then undoes all of it."""
+    from src.config import settings
+    from src.handlers.commands import handle_undo
+    from src.handlers.document import handle_document
+
+    monkeypatch.setattr(settings, "capture_coalesce_seconds", 60)
+    ctx = _make_context(daily_mode=True)
+    attachments = [tmp_path / "a.pdf", tmp_path / "b.pdf"]
+    for path in attachments:
+        path.write_bytes(b"pdf")
+
+    for path in attachments:
+        update = _make_update(document=MagicMock(file_id="d", file_name=path.name))
+        update.message.chat_id = 7
+        with patch(
+            "src.handlers.document.download_attachment",
+            new_callable=AsyncMock,
+            return_value=(path, path.name),
+        ):
+            await handle_document(update, ctx)
+
+    undo = _make_update()
+    undo.message.chat_id = 7
+    await handle_undo(undo, ctx)
+
+    mock_daily.assert_called_once()
+    assert mock_daily.call_args.kwargs["content"].count("Original filename") == 2
+    update.message.reply_text.assert_called_once_with("✓ Captured 2 messages")
+    # The mocked daily section was never written, so only the attachments are deleted
+    undo.message.reply_text.assert_called_once_with(
+        "Already reverted or changed: section 12:00; Deleted: a.pdf, b.pdf"
+    )
+    assert not any(path.exists() for path in attachments)
+
+
+# ─── albums ─────────────────────────────────────────────────────────────────
+
+
+def _album_update(file_id, message_id, caption=None):
+    update = _make_update(photo=[MagicMock(file_id=file_id)])
+    update.message.media_group_id = "album-1"
+    update.message.message_id = message_id
+    update.message.caption = caption
+    return update
+
+
+async def test_album_becomes_one_note_with_bounded_downloads(monkeypatch, temp_vault, tmp_path):
+    """An album is one note embedding every file, downloaded at most N at a time."""
+    import asyncio
+
+    from src.config import settings
+    from src.handlers import media_group
+    from src.handlers.photo import handle_photo
+
+    monkeypatch.setattr(media_group, "_ALBUM_WAIT_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "vault_path", temp_vault)
+    monkeypatch.setattr(settings, "album_download_workers", 2)
+    source = tmp_path / "photo.jpg"
+    source.write_bytes(b"jpeg")
+    running = peak = 0
+
+    async def get_file(file_id):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return MagicMock(file_path=str(source))  # As served by a local Bot API server
+
+    ctx = _make_context()
+    ctx.bot.get_file = get_file
+    updates = [_album_update(f"p{i}", 10 + i, "Trip" if i == 0 else None) for i in range(5)]
+
+    with patch("src.handlers.media_group.create_note", return_value=FAKE_NOTE) as mock_create:
+        for update in updates:
+            await handle_photo(update, ctx)
+        await asyncio.sleep(0.2)
+
+    assert peak == 2
+    attachments = sorted((temp_vault / "+" / "attachments").iterdir())
+    assert [path.read_bytes() for path in attachments] == [b"jpeg"] * 5
+    content = mock_create.call_args.kwargs["content"]
+    assert content.startswith("Trip\n\n![[+/attachments/tg-")
+    assert content.count("![[") == 5
+    updates[0].message.reply_text.assert_called_once_with("✓ Captured 5 files")
+    assert not any(u.message.reply_text.called for u in updates[1:])
+    step = _last_undo_step()
+    assert step[0] == {"delete": str(FAKE_NOTE)}
+    assert sorted(action["delete"] for action in step[1:]) == [str(p) for p in attachments]
+
+
+async def test_album_with_failed_download_saves_nothing(monkeypatch, temp_vault, tmp_path):
+    """If one file of an album fails, the files already saved are removed."""
+    import asyncio
+
+    from src.config import settings
+    from src.handlers import media_group
+    from src.handlers.photo import handle_photo
+
+    monkeypatch.setattr(media_group, "_ALBUM_WAIT_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "vault_path", temp_vault)
+    source = tmp_path / "photo.jpg"
+    source.write_bytes(b"jpeg")
+
+    async def get_file(file_id):
+        if file_id == "p1":
+            raise OSError("network down")
+        return MagicMock(file_path=str(source))
+
+    ctx = _make_context()
+    ctx.bot.get_file = get_file
+    updates = [_album_update(f"p{i}", 10 + i) for i in range(3)]
+
+    with patch("src.handlers.media_group.create_note") as mock_create:
+        for update in updates:
+            await handle_photo(update, ctx)
+        await asyncio.sleep(0.2)
+
+    mock_create.assert_not_called()
+    assert list((temp_vault / "+" / "attachments").iterdir()) == []
+    updates[0].message.reply_text.assert_called_once_with("❌ Album capture failed")
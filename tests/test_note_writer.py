@@ -47,3 +47,29 @@ def test_create_note_with_attachment(temp_vault):
         content = path.read_text()
         assert "![[+/attachments/test.jpg]]" in content
         assert "Caption" in content
+
+
+def test_create_note_same_minute_never_overwrites(temp_vault):
+    """Concurrent captures in the same second each get their own file."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from src.services.note_writer import create_note
+
+    with (
+        patch("src.services.note_writer.settings") as mock_settings,
+        patch("src.services.note_writer.datetime") as mock_dt,
+    ):
+        mock_settings.inbox_path = temp_vault / "+"
+        mock_settings.timezone = "UTC"
+        mock_settings.note_filename_format = "%Y-%m-%d %H%M"
+        mock_dt.now.return_value = datetime(2026, 1, 24, 14, 30, 5)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            paths = list(pool.map(lambda i: create_note(content=f"Note {i}"), range(8)))
+
+    assert len(set(paths)) == 8
+    assert paths[0].parent == temp_vault / "+"
+    assert {p.read_text().splitlines()[-1] for p in paths} == {f"Note {i}" for i in range(8)}
+    assert {p.name for p in paths} == {"2026-01-24 1430.md"} | {
+        f"2026-01-24 1430-{n}.md" for n in range(2, 9)
+    }
@@ -0,0 +1,109 @@
+"""Tests for due-date reminders."""
+
+import os
+from datetime import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+def _scheduler(vault, data_dir, monkeypatch):
+    from src.config import settings
+    from src.handlers.reminders import ReminderScheduler
+    from src.services.task_index import TaskIndex
+
+    monkeypatch.setattr(settings, "reminder_task_time", time(9, 0))
+    index = TaskIndex(vault, data_dir / "task-index.sqlite3")
+    index.sync()
+    app = MagicMock()
+    app.job_queue.run_once.side_effect = lambda *args, **kwargs: MagicMock()
+    return ReminderScheduler(app, index), index, app.job_queue
+
+
+def test_reschedule_schedules_future_due_tasks(temp_vault, isolated_data_dir, monkeypatch):
+    """One job per open task due in the future, at the reminder time on its due date."""
+    (temp_vault / "a.md").write_text(
+        "- [ ] #to/do Pay rent 📅 2030-01-01\n"
+        "- [ ] #to/do Long gone 📅 2000-01-01\n"
+        "- [ ] #to/do No date\n"
+    )
+    scheduler, _, job_queue = _scheduler(temp_vault, isolated_data_dir, monkeypatch)
+
+    scheduler.reschedule(None)
+
+    assert job_queue.run_once.call_count == 1
+    when = job_queue.run_once.call_args.args[1]
+    assert (when.date().isoformat(), when.hour) == ("2030-01-01", 9)
+    assert job_queue.run_once.call_args.kwargs["data"].task_text.startswith("- [ ] #to/do Pay rent")
+
+    scheduler.reschedule(None)
+    assert job_queue.run_once.call_count == 1
+
+
+def test_reschedule_only_touches_changed_files(temp_vault, isolated_data_dir, monkeypatch):
+    """Completing a task cancels its job; other files' jobs are left alone."""
+    a = temp_vault / "a.md"
+    a.write_text("- [ ] #to/do Pay rent 📅 2030-01-01\n")
+    (temp_vault / "b.md").write_text("- [ ] #to/do Call bank 📅 2030-02-01\n")
+    scheduler, index, job_queue = _scheduler(temp_vault, isolated_data_dir, monkeypatch)
+    scheduler.reschedule(None)
+    jobs = {key[0].name: job for key, job in scheduler._jobs.items()}
+
+    index.add_listener(scheduler.reschedule)
+    a.write_text("- [x] #to/do Pay rent 📅 2030-01-01\n- [ ] #to/do Renew 📅 2030-03-01\n")
+    os.utime(a, ns=(0, 10**18))
+    index.sync()
+
+    jobs["a.md"].schedule_removal.assert_called_once()
+    jobs["b.md"].schedule_removal.assert_not_called()
+    assert job_queue.run_once.call_count == 3
+    assert sorted(key[2] for key in scheduler._jobs) == ["2030-02-01", "2030-03-01"]
+
+
+def test_start_reminders_off_by_default():
+    """Without a reminder time nothing is scheduled."""
+    from src.handlers.reminders import start_reminders
+
+    app = MagicMock()
+    assert start_reminders(app) is None
+    app.job_queue.run_daily.assert_not_called()
+
+
+async def test_due_digest_sends_task_list_page():
+    """The digest is a /task_list page of overdue and due-today tasks."""
+    from src.handlers.reminders import send_due_digest
+    from src.services.task_manager import TaskLocation
+
+    task = TaskLocation(file_path="a.md", line_number=1, task_text="- [ ] #to/do Pay 📅 2020-01-01")
+    snapshot = {
+        "tasks": [task],
+        "due_before": None,
+        "sort": "overdue",
+        "query": "",
+        "generation": 1,
+    }
+    context = MagicMock()
+    context.user_data = {}
+    context.job.chat_id = 42
+    context.bot.send_message = AsyncMock()
+
+    with patch("src.handlers.reminders.task_list_snapshot", return_value=snapshot) as snap:
+        await send_due_digest(context)
+
+    assert snap.call_args.args[2].startswith("due:..")
+    kwargs = context.bot.send_message.call_args.kwargs
+    assert kwargs["chat_id"] == 42
+    assert kwargs["text"].startswith("📅 Due by ")
+    assert "Pay" in kwargs["text"]
+    assert context.user_data["last_task_list"] == [task]
+
+
+async def test_due_digest_silent_when_nothing_due():
+    from src.handlers.reminders import send_due_digest
+
+    context = MagicMock()
+    context.bot.send_message = AsyncMock()
+    empty = {"tasks": [], "due_before": None, "sort": "overdue", "query": "", "generation": 1}
+
+    with patch("src.handlers.reminders.task_list_snapshot", return_value=empty):
+        await send_due_digest(context)
+
+    context.bot.send_message.assert_not_called()
@@ -0,0 +1,291 @@
+"""Tests for the persistent task index."""
+
+import os
+from unittest.mock import patch
+
+
+def _index(vault, data_dir):
+    from src.services.task_index import TaskIndex
+
+    return TaskIndex(vault, data_dir / "task-index.sqlite3")
+
+
+def test_sync_indexes_open_tasks(temp_vault, isolated_data_dir):
+    """sync() picks up open tasks from every visible markdown file."""
+    (temp_vault / "a.md").write_text("- [ ] #to/do Task A\n- [x] #to/do Done\n")
+    (temp_vault / "b.md").write_text("- [ ] #to/follow-up Task B\n")
+
+    index = _index(temp_vault, isolated_data_dir)
+    assert index.sync() == 2
+
+    texts = {t.task_text for t in index.search(limit=10)}
+    assert texts == {"- [ ] #to/do Task A", "- [ ] #to/follow-up Task B"}
+
+
+def test_sync_only_rescans_changed_files(temp_vault, isolated_data_dir):
+    """Unchanged files are not re-read; modified files are."""
+    (temp_vault / "a.md").write_text("- [ ] #to/do Task A\n")
+    changed = temp_vault / "b.md"
+    changed.write_text("- [ ] #to/do Task B\n")
+
+    index = _index(temp_vault, isolated_data_dir)
+    index.sync()
+    assert index.sync() == 0
+
+    changed.write_text("- [ ] #to/do Task B changed\n")
+    os.utime(changed, ns=(0, 10**18))
+    assert index.sync() == 1
+    assert "- [ ] #to/do Task B changed" in {t.task_text for t in index.search(limit=10)}
+
+
+def test_sync_drops_deleted_files(temp_vault, isolated_data_dir):
+    """Tasks from deleted files disappear from the index."""
+    gone = temp_vault / "gone.md"
+    gone.write_text("- [ ] #to/do Gone task\n")
+
+    index = _index(temp_vault, isolated_data_dir)
+    index.sync()
+    gone.unlink()
+    index.sync()
+
+    assert index.search(limit=10) == []
+
+
+def test_index_persists_across_restarts(temp_vault, isolated_data_dir):
+    """A reopened index answers from SQLite without re-reading files."""
+    (temp_vault / "a.md").write_text("- [ ] #to/do Task A\n")
+    first = _index(temp_vault, isolated_data_dir)
+    first.sync()
+    first.close()
+
+    second = _index(temp_vault, isolated_data_dir)
+    with patch("src.services.task_index.scan_files_for_tasks") as mock_scan:
+        assert second.sync() == 0
+    mock_scan.assert_not_called()
+    assert [t.task_text for t in second.search(limit=10)] == ["- [ ] #to/do Task A"]
+
+
+def test_index_resets_for_different_vault(tmp_path, isolated_data_dir):
+    """Switching vaults discards entries from the previous one."""
+    vault_a = tmp_path / "vault-a"
+    vault_b = tmp_path / "vault-b"
+    vault_a.mkdir()
+    vault_b.mkdir()
+    (vault_a / "a.md").write_text("- [ ] #to/do From A\n")
+
+    index = _index(vault_a, isolated_data_dir)
+    index.sync()
+    index.close()
+
+    other = _index(vault_b, isolated_data_dir)
+    assert other.search(limit=10) == []
+
+
+def test_index_rebuilds_older_schema(temp_vault, isolated_data_dir):
+    """An index written with an older layout is dropped and rebuilt."""
+    import sqlite3
+
+    db_path = isolated_data_dir / "task-index.sqlite3"
+    isolated_data_dir.mkdir(parents=True, exist_ok=True)
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript(
+            "CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);"
+            "CREATE TABLE tasks (path TEXT, line_number INTEGER, task_text TEXT);"
+            "INSERT INTO meta VALUES ('schema_version', '1');"
+        )
+    conn.close()
+    (temp_vault / "a.md").write_text("- [ ] #to/do Task A\n")
+
+    index = _index(temp_vault, isolated_data_dir)
+    index.sync()
+    index.close()
+
+    reopened = _index(temp_vault, isolated_data_dir)
+    [task] = reopened.search(limit=10)
+    assert task.byte_offset == 0
+    assert task.line_hash is not None
+
+
+def test_search_orders_newest_file_first(temp_vault, isolated_data_dir):
+    """Tasks from recently modified files come first, like the direct scan."""
+    old = temp_vault / "old.md"
+    new = temp_vault / "new.md"
+    old.write_text("- [ ] #to/do Old\n")
+    new.write_text("- [ ] #to/do New\n")
+    os.utime(old, ns=(10**18, 10**18))
+    os.utime(new, ns=(2 * 10**18, 2 * 10**18))
+
+    index = _index(temp_vault, isolated_data_dir)
+    index.sync()
+
+    assert [t.task_text for t in index.search(limit=10)] == ["- [ ] #to/do New", "- [ ] #to/do Old"]
+
+
+def test_search_overdue_first(temp_vault, isolated_data_dir):
+    """Ranked search puts overdue tasks ahead of newer undated ones."""
+    (temp_vault / "old.md").write_text("- [ ] #to/do Overdue 📅 2026-01-01\n")
+    os.utime(temp_vault / "old.md", ns=(0, 0))
+    (temp_vault / "new.md").write_text("- [ ] #to/do Fresh\n- [ ] #to/do Later 📅 2099-01-01\n")
+
+    index = _index(temp_vault, isolated_data_dir)
+    index.sync()
+
+    with patch("src.services.task_manager._today", return_value="2026-03-10"):
+        tasks = index.search(limit=2, sort="overdue")
+
+    assert [t.task_text for t in tasks] == [
+        "- [ ] #to/do Overdue 📅 2026-01-01",
+        "- [ ] #to/do Fresh",
+    ]
+
+
+def test_search_tasks_direct_scan_when_index_disabled(temp_vault):
+    """TASK_INDEX_ENABLED=false falls back to scanning files directly."""
+    from src.services.task_manager import search_tasks
+
+    (temp_vault / "tasks.md").write_text("- [ ] #to/do Task one\n")
+
+    with (
+        patch("src.services.task_manager.settings") as m,
+        patch("src.services.task_index.get_task_index") as mock_get,
+    ):
+        m.vault_path = temp_vault
+        m.task_list_limit = 10
+        m.task_index_enabled = False
+        m.task_scan_workers = 1
+        tasks = search_tasks()
+
+    mock_get.assert_not_called()
+    assert [t.task_text for t in tasks] == ["- [ ] #to/do Task one"]
+
+
+def test_generation_changes_only_with_vault_changes(temp_vault, isolated_data_dir):
+    """Cached task lists can compare generations to detect stale results."""
+    note = temp_vault / "a.md"
+    note.write_text("- [ ] #to/do Task A\n")
+    index = _index(temp_vault, isolated_data_dir)
+    index.sync()
+    generation = index.generation
+
+    index.sync()
+    assert index.generation == generation
+
+    note.write_text("- [ ] #to/do Task A edited\n")
+    os.utime(note, ns=(0, 10**18))
+    index.sync()
+    assert index.generation > generation
+
+
+def test_find_uses_inverted_index_and_tracks_changes(temp_vault, isolated_data_dir):
+    """find() answers from posting sets and follows file edits and deletions."""
+    from src.services.task_query import parse_task_query
+
+    projects = temp_vault / "Projects"
+    projects.mkdir()
+    note = projects / "alpha.md"
+    note.write_text(
+        "- [ ] #to/do Buy milk #home 📅 2026-03-01\n- [ ] #to/follow-up Ask about milk\n"
+    )
+    (temp_vault / "other.md").write_text("- [ ] #to/do Buy milk\n")
+
+    index = _index(temp_vault, isolated_data_dir)
+    index.sync()
+
+    def find(text):
+        return [t.task_text for t in index.find(parse_task_query(text), limit=10)]
+
+    assert len(find("milk")) == 3
+    assert find("milk path:projects #home due:..2026-03-05") == [
+        "- [ ] #to/do Buy milk #home 📅 2026-03-01"
+    ]
+    assert find("followup") == ["- [ ] #to/follow-up Ask about milk"]
+    assert find("bread") == []
+
+    with patch("src.services.task_index.scan_files_for_tasks") as mock_scan:
+        find("milk")
+    mock_scan.assert_not_called()
+
+    note.write_text("- [ ] #to/do Buy bread\n")
+    os.utime(note, ns=(0, 10**18))
+    index.sync()
+    assert find("bread path:Projects") == ["- [ ] #to/do Buy bread"]
+    assert find("milk") == ["- [ ] #to/do Buy milk"]
+
+    note.unlink()
+    index.sync()
+    assert find("bread") == []
+
+
+def test_find_duplicate_tracks_pending_and_indexed_tasks(temp_vault, isolated_data_dir):
+    """Bot-added tasks count as open until their file is re-indexed."""
+    from src.services.task_manager import task_fingerprint
+
+    inbox = temp_vault / "inbox.md"
+    inbox.write_text("- [ ] #to/do Buy milk\n")
+    index = _index(temp_vault, isolated_data_dir)
+    index.sync()
+
+    assert index.find_duplicate(task_fingerprint("buy milk")).line_number == 1
+    assert index.find_duplicate(task_fingerprint("Call John")) is None
+
+    inbox.write_text("- [ ] #to/do Buy milk\n- [ ] #to/do Call John\n")
+    index.remember_added(inbox, ["- [ ] #to/do Call John"])
+    assert index.find_duplicate(task_fingerprint("Call John")).line_number == 0
+
+    os.utime(inbox, ns=(0, 10**18))
+    index.refresh([inbox])
+    assert index.find_duplicate(task_fingerprint("Call John")).line_number == 2
+
+    inbox.write_text("- [x] #to/do Buy milk\n- [ ] #to/do Call John\n")
+    os.utime(inbox, ns=(0, 2 * 10**18))
+    index.refresh([inbox])
+    assert index.find_duplicate(task_fingerprint("Buy milk")) is None
+
+
+def test_due_tasks_and_change_listeners(temp_vault, isolated_data_dir):
+    """due_tasks() reads the due index; listeners hear which files changed."""
+    a = temp_vault / "a.md"
+    a.write_text("- [ ] #to/do Pay rent 📅 2030-01-01\n- [ ] #to/do No date\n")
+    (temp_vault / "b.md").write_text("- [ ] #to/do Call bank 📅 2030-02-01\n")
+
+    index = _index(temp_vault, isolated_data_dir)
+    index.sync()
+    changes = []
+    index.add_listener(changes.append)
+
+    assert {t.task_text for t in index.due_tasks()} == {
+        "- [ ] #to/do Pay rent 📅 2030-01-01",
+        "- [ ] #to/do Call bank 📅 2030-02-01",
+    }
+    assert [t.task_text for t in index.due_tasks([a])] == ["- [ ] #to/do Pay rent 📅 2030-01-01"]
+
+    a.write_text("- [x] #to/do Pay rent 📅 2030-01-01\n")
+    os.utime(a, ns=(0, 10**18))
+    index.sync()
+    assert changes == [{a}]
+    assert index.due_tasks([a]) == []
+
+    index.remove_listener(changes.append)
+    os.utime(a, ns=(0, 2 * 10**18))
+    index.sync()
+    assert len(changes) == 1
+
+
+def test_bot_writes_refresh_watched_index(temp_vault, isolated_data_dir, monkeypatch):
+    """/done and /task show in a watched index without waiting for the watcher."""
+    from src.config import settings
+    from src.services.task_index import get_task_index
+    from src.services.task_manager import add_task, complete_tasks, search_tasks
+
+    monkeypatch.setattr(settings, "vault_path", temp_vault)
+    (temp_vault / "a.md").write_text("- [ ] #to/do Task A\n")
+    index = get_task_index(temp_vault)
+    index.sync()
+    index.watched = True
+    try:
+        (task,) = search_tasks()
+        assert complete_tasks([task]) == [True]
+        add_task("Task B")
+        assert [t.task_text for t in search_tasks()] == ["- [ ] #to/do Task B"]
+    finally:
+        index.watched = False
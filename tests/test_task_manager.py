@@ -453,3 +453,400 @@ def test_complete_task_line_idx_out_of_bounds(tmp_path):
         task_text="- [ ] #to/do Only one line",
     )
     assert complete_task(loc) is False
+
+
+# ─── parallel scanning ──────────────────────────────────────────────────────
+
+
+def test_scan_files_for_tasks_parallel_keeps_order(tmp_path):
+    """Thread-pool scanning yields results in the order files were given."""
+    from src.services.task_manager import scan_files_for_tasks
+
+    files = []
+    for i in range(30):
+        f = tmp_path / f"note-{i}.md"
+        f.write_text(f"- [ ] #to/do Task {i}\n")
+        files.append(f)
+
+    results = list(scan_files_for_tasks(files, workers=4))
+
+    assert [path for path, _ in results] == files
+    assert [tasks[0].task_text for _, tasks in results] == [
+        f"- [ ] #to/do Task {i}" for i in range(30)
+    ]
+
+
+def test_search_tasks_parallel_scan_stops_at_limit(temp_vault):
+    """Direct scan reads only a bounded window of files past the limit."""
+    import os
+
+    from src.services import task_manager
+
+    for i in range(100):
+        f = temp_vault / f"note-{i}.md"
+        f.write_text(f"- [ ] #to/do Task {i}\n")
+        os.utime(f, ns=(i * 10**9, i * 10**9))
+
+    real_scan = task_manager._scan_file_for_tasks
+    with (
+        patch("src.services.task_manager.settings") as m,
+        patch("src.services.task_manager._scan_file_for_tasks", side_effect=real_scan) as spy,
+    ):
+        m.vault_path = temp_vault
+        m.task_list_limit = 3
+        m.task_index_enabled = False
+        m.task_scan_workers = 2
+        tasks = task_manager.search_tasks()
+
+    # Newest-mtime-first ordering is preserved
+    assert [t.task_text for t in tasks] == [
+        "- [ ] #to/do Task 99",
+        "- [ ] #to/do Task 98",
+        "- [ ] #to/do Task 97",
+    ]
+    assert spy.call_count < 20
+
+
+# ─── byte-level scanning ────────────────────────────────────────────────────
+
+
+def test_scan_file_for_tasks_line_numbers_and_crlf(tmp_path):
+    """Line numbers count every line; CRLF endings are stripped from task text."""
+    from src.services.task_manager import TASK_PATTERN, _scan_file_for_tasks
+
+    note = tmp_path / "note.md"
+    note.write_bytes(
+        b"# Title\r\n\r\nSee #to/do in prose\r\n"
+        b"- [ ] #to/do First\r\ntext\r\n- [ ] #to/follow-up Second"
+    )
+
+    tasks = _scan_file_for_tasks(note, TASK_PATTERN, None)
+
+    assert [(t.line_number, t.task_text) for t in tasks] == [
+        (4, "- [ ] #to/do First"),
+        (6, "- [ ] #to/follow-up Second"),
+    ]
+
+
+def test_scan_file_for_tasks_rejects_without_decoding(tmp_path):
+    """Files without the #to/ marker are rejected even if they are not valid UTF-8."""
+    from src.services.task_manager import TASK_PATTERN, _scan_file_for_tasks
+
+    note = tmp_path / "binary.md"
+    note.write_bytes(b"\xff\xfe not utf-8 at all \x80")
+
+    assert _scan_file_for_tasks(note, TASK_PATTERN, None) == []
+
+
+def test_scan_file_for_tasks_skips_undecodable_lines_only(tmp_path):
+    """A broken line elsewhere in the file no longer hides valid tasks."""
+    from src.services.task_manager import TASK_PATTERN, _scan_file_for_tasks
+
+    note = tmp_path / "mixed.md"
+    note.write_bytes(b"bad \xff line #to/do\n- [ ] #to/do Good\n")
+
+    tasks = _scan_file_for_tasks(note, TASK_PATTERN, None)
+
+    assert [(t.line_number, t.task_text) for t in tasks] == [(2, "- [ ] #to/do Good")]
+
+
+def test_scan_file_for_tasks_large_file(tmp_path):
+    """A task deep in a note over 1 MiB is found with its line number."""
+    from src.services.task_manager import TASK_PATTERN, _scan_file_for_tasks
+
+    note = tmp_path / "big.md"
+    note.write_text("filler\n" * 200_000 + "- [ ] #to/do Deep task\n")
+
+    tasks = _scan_file_for_tasks(note, TASK_PATTERN, None)
+
+    assert [(t.line_number, t.task_text) for t in tasks] == [(200_001, "- [ ] #to/do Deep task")]
+
+
+# ─── ranking ────────────────────────────────────────────────────────────────
+
+
+def _ranked_candidates():
+    from pathlib import Path
+
+    from src.services.task_manager import TaskLocation
+
+    texts = [
+        ("- [ ] #to/do No date, newest", 300),
+        ("- [ ] #to/do Due later 📅 2026-03-20", 200),
+        ("- [ ] #to/do Long overdue 📅 2026-03-01", 100),
+        ("- [ ] #to/do Due soon 📅 2026-03-12", 250),
+        ("- [ ] #to/do Just overdue 📅 2026-03-09", 50),
+    ]
+    return [
+        (TaskLocation(Path("/vault/tasks.md"), i, text), mtime_ns)
+        for i, (text, mtime_ns) in enumerate(texts)
+    ]
+
+
+def test_rank_tasks_by_due_date():
+    """Earliest due date first, undated tasks last."""
+    from src.services.task_manager import rank_tasks
+
+    with patch("src.services.task_manager._today", return_value="2026-03-10"):
+        tasks = rank_tasks(_ranked_candidates(), limit=10, sort="due")
+
+    assert [t.line_number for t in tasks] == [2, 4, 3, 1, 0]
+
+
+def test_rank_tasks_overdue_first_then_recent():
+    """Overdue tasks lead (most overdue on top), the rest follow newest file first."""
+    from src.services.task_manager import rank_tasks
+
+    with patch("src.services.task_manager._today", return_value="2026-03-10"):
+        tasks = rank_tasks(_ranked_candidates(), limit=4, sort="overdue")
+
+    assert [t.line_number for t in tasks] == [2, 4, 0, 3]
+
+
+def test_rank_tasks_applies_due_filter():
+    """due_before drops later tasks before ranking; undated tasks stay."""
+    from src.services.task_manager import rank_tasks
+
+    with patch("src.services.task_manager._today", return_value="2026-03-10"):
+        tasks = rank_tasks(_ranked_candidates(), limit=10, sort="due", due_before="2026-03-10")
+
+    assert [t.line_number for t in tasks] == [2, 4, 0]
+
+
+def test_search_tasks_sort_by_due_scans_whole_vault(temp_vault):
+    """Ranked modes consider every file, not only the newest ones."""
+    import os
+
+    from src.services.task_manager import search_tasks
+
+    for i in range(20):
+        f = temp_vault / f"note-{i}.md"
+        f.write_text(f"- [ ] #to/do Task {i} 📅 2026-04-{30 - i:02d}\n")
+        os.utime(f, ns=(i * 10**9, i * 10**9))
+
+    with patch("src.services.task_manager.settings") as m:
+        m.vault_path = temp_vault
+        m.timezone = "UTC"
+        m.task_list_limit = 3
+        m.task_index_enabled = False
+        m.task_scan_workers = 2
+        tasks = search_tasks(sort="due")
+
+    # The oldest files hold the earliest due dates
+    assert [t.task_text for t in tasks] == [
+        "- [ ] #to/do Task 19 📅 2026-04-11",
+        "- [ ] #to/do Task 18 📅 2026-04-12",
+        "- [ ] #to/do Task 17 📅 2026-04-13",
+    ]
+
+
+# ─── in-place completion ────────────────────────────────────────────────────
+
+
+def test_complete_task_preserves_crlf_and_missing_final_newline(temp_vault):
+    """Only the task line changes; other bytes are copied verbatim."""
+    from src.services.task_manager import TASK_PATTERN, _scan_file_for_tasks, complete_task
+
+    task_file = temp_vault / "tasks.md"
+    original = b"# Notes\r\n- [ ] #to/do Buy milk\r\ntrailing text without newline"
+    task_file.write_bytes(original)
+    [location] = _scan_file_for_tasks(task_file, TASK_PATTERN, None)
+
+    with patch("src.services.task_manager.settings") as mock_settings:
+        mock_settings.timezone = "UTC"
+        assert complete_task(location) is True
+
+    content = task_file.read_bytes()
+    assert content.startswith(b"# Notes\r\n- [x] #to/do Buy milk \xe2\x9c\x85 ")
+    assert content.endswith(b"\r\ntrailing text without newline")
+    assert len(content) == len(original) + len(" ✅ 2026-01-01".encode())
+
+
+def test_complete_task_falls_back_to_line_number(temp_vault):
+    """A stale byte offset (lines above edited) still finds the task by line number."""
+    from src.services.task_manager import TASK_PATTERN, _scan_file_for_tasks, complete_task
+
+    task_file = temp_vault / "tasks.md"
+    task_file.write_text("short\n- [ ] #to/do Buy milk\n")
+    [location] = _scan_file_for_tasks(task_file, TASK_PATTERN, None)
+    task_file.write_text("a much longer first line\n- [ ] #to/do Buy milk\n")
+
+    with patch("src.services.task_manager.settings") as mock_settings:
+        mock_settings.timezone = "UTC"
+        assert complete_task(location) is True
+
+    assert task_file.read_text().startswith("a much longer first line\n- [x] #to/do Buy milk ✅")
+
+
+def test_complete_task_rejects_changed_bytes_at_offset(temp_vault):
+    """An edited task line is left alone and nothing is rewritten."""
+    from src.services.task_manager import TASK_PATTERN, _scan_file_for_tasks, complete_task
+
+    task_file = temp_vault / "tasks.md"
+    task_file.write_text("- [ ] #to/do Buy milk\n")
+    [location] = _scan_file_for_tasks(task_file, TASK_PATTERN, None)
+    task_file.write_text("- [ ] #to/do Buy oat milk\n")
+
+    assert complete_task(location) is False
+    assert task_file.read_text() == "- [ ] #to/do Buy oat milk\n"
+    assert not list(temp_vault.glob(".tasks.md.*"))
+
+
+def test_complete_tasks_one_write_per_file(temp_vault):
+    """Tasks sharing a note are completed together; stale ones are reported."""
+    from src.services import vault_writer
+    from src.services.task_manager import (
+        TASK_PATTERN,
+        TaskLocation,
+        _scan_file_for_tasks,
+        complete_tasks,
+    )
+
+    a = temp_vault / "a.md"
+    b = temp_vault / "b.md"
+    a.write_text("- [ ] #to/do A1\ntext\n- [ ] #to/do A2\n")
+    b.write_text("- [ ] #to/do B1\n")
+    locations = [
+        *_scan_file_for_tasks(a, TASK_PATTERN, None),
+        *_scan_file_for_tasks(b, TASK_PATTERN, None),
+        TaskLocation(b, 1, "- [ ] #to/do Gone"),
+    ]
+
+    with (
+        patch("src.services.task_manager.settings") as mock_settings,
+        patch.object(vault_writer, "_commit", wraps=vault_writer._commit) as commits,
+    ):
+        mock_settings.timezone = "UTC"
+        results = complete_tasks(locations)
+
+    assert results == [True, True, True, False]
+    assert commits.call_count == 2
+    assert a.read_text().count("- [x]") == 2
+    assert "text\n" in a.read_text()
+    assert b.read_text().startswith("- [x] #to/do B1 ✅")
+
+
+def test_add_task_never_reads_inbox(temp_vault):
+    """Adding a task appends without reading or rewriting the inbox."""
+    from pathlib import Path
+
+    from src.services.task_manager import add_task
+
+    inbox = temp_vault / "+" / "task-inbox.md"
+    inbox.write_text("- [ ] #to/do Existing\r\n")
+
+    with (
+        patch("src.services.task_manager.settings") as mock_settings,
+        patch.object(Path, "read_text", side_effect=AssertionError("read")),
+        patch.object(Path, "write_text", side_effect=AssertionError("rewrite")),
+    ):
+        mock_settings.task_inbox_path = inbox
+        mock_settings.task_tag = "#to/do"
+        mock_settings.task_tag_followup = "#to/follow-up"
+        add_task("New task")
+
+    assert inbox.read_bytes() == b"- [ ] #to/do Existing\r\n- [ ] #to/do New task\n"
+
+
+# ─── bulk capture ───────────────────────────────────────────────────────────
+
+
+def test_split_bulk_tasks_detection():
+    """Only task-headed messages and checklists count as bulk task captures."""
+    from src.services.task_manager import split_bulk_tasks
+
+    assert split_bulk_tasks("tasks:\n- Buy milk\n\n- Call John") == [
+        "tasks:",
+        "- Buy milk",
+        "- Call John",
+    ]
+    assert split_bulk_tasks("- [ ] One\n- [ ] Two") == ["- [ ] One", "- [ ] Two"]
+    assert split_bulk_tasks("task: Buy milk") is None
+    assert split_bulk_tasks("Shopping\n- eggs\n- flour") is None
+
+
+def test_add_tasks_per_line_flags_single_write(temp_vault):
+    """Every line keeps its own flags and all tasks land in one append."""
+    from src.services import vault_writer
+    from src.services.task_manager import add_tasks
+
+    inbox = temp_vault / "+" / "task-inbox.md"
+    inbox.write_text("- [ ] #to/do Existing")
+
+    with (
+        patch("src.services.task_manager.settings") as mock_settings,
+        patch.object(vault_writer, "append_bytes", wraps=vault_writer.append_bytes) as append,
+    ):
+        mock_settings.task_inbox_path = inbox
+        mock_settings.task_tag = "#to/do"
+        mock_settings.task_tag_followup = "#to/follow-up"
+        mock_settings.timezone = "UTC"
+        _, tasks, duplicates = add_tasks(
+            [
+                "tasks:",
+                "- Buy milk --2026-03-01",
+                "task: Call John —follow-up",
+                "- [ ] Water plants today",
+            ]
+        )
+
+    assert append.call_count == 1
+    assert duplicates == []
+    assert tasks == [
+        "- [ ] #to/do Buy milk 📅 2026-03-01",
+        "- [ ] #to/follow-up Call John",
+        "- [ ] #to/do Water plants today",
+    ]
+    assert inbox.read_text() == "- [ ] #to/do Existing\n" + "".join(f"{t}\n" for t in tasks)
+
+
+# ─── duplicate detection ────────────────────────────────────────────────────
+
+
+def test_task_fingerprint_ignores_tag_dates_case_and_spacing():
+    """Re-sent tasks match regardless of tag, dates, case or spacing."""
+    from src.services.task_manager import task_fingerprint
+
+    base = task_fingerprint("- [ ] #to/do Buy milk 📅 2026-03-01")
+    assert task_fingerprint("task: buy   MILK") == base
+    assert task_fingerprint("- [ ] #to/follow-up Buy milk ⏳ 2026-04-01") == base
+    assert task_fingerprint("- [ ] #to/do Buy oat milk") != base
+
+
+def test_add_tasks_and_add_task_checked_skip_duplicates(temp_vault, monkeypatch):
+    """With TASK_DUPLICATES=skip, open and just-added tasks are not appended again."""
+    from src.config import settings
+    from src.services.task_index import get_task_index
+    from src.services.task_manager import add_task_checked, add_tasks
+
+    monkeypatch.setattr(settings, "vault_path", temp_vault)
+    monkeypatch.setattr(settings, "task_duplicates", "skip")
+    (temp_vault / "project.md").write_text("- [ ] #to/do Call John 📅 2026-01-01\n")
+    get_task_index(temp_vault).sync()
+
+    _, added, duplicates = add_tasks(["tasks:", "- Call john --today", "- Buy milk", "- Buy milk"])
+    assert added == ["- [ ] #to/do Buy milk"]
+    assert [d.split(" 📅")[0] for d in duplicates] == [
+        "- [ ] #to/do Call john",
+        "- [ ] #to/do Buy milk",
+    ]
+
+    # Not re-indexed yet: the pending add still counts as open
+    path, duplicate = add_task_checked("Buy milk")
+    assert path is None
+    assert duplicate.task_text == "- [ ] #to/do Buy milk"
+    assert settings.task_inbox_path.read_text().count("Buy milk") == 1
+
+
+def test_format_duplicate_reply():
+    """Single-task replies mention where the duplicate lives."""
+    from pathlib import Path
+
+    from src.services.task_manager import TaskLocation, format_duplicate_reply
+
+    dup = TaskLocation(Path("/vault/project.md"), 3, "- [ ] #to/do Buy milk")
+    assert format_duplicate_reply(Path("/vault/inbox.md"), None) == "✓ Task added"
+    assert format_duplicate_reply(Path("/vault/inbox.md"), dup) == (
+        "✓ Task added (already open in project.md)"
+    )
+    assert format_duplicate_reply(None, dup) == "Already open in project.md: Buy milk"
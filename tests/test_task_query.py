@@ -0,0 +1,61 @@
+"""Tests for the /task_find query language."""
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+
+def _task(text, rel="Projects/Alpha/notes.md"):
+    from src.services.task_manager import TaskLocation
+
+    return TaskLocation(Path("/vault") / rel, 1, text), rel
+
+
+def test_task_terms_words_tags_and_folders():
+    """Words, tags (with parents) and containing folders become index terms."""
+    from src.services.task_query import task_terms
+
+    task, rel = _task("- [ ] #to/follow-up Call John about #home/garden 📅 2026-03-01")
+    terms = task_terms(task, rel)
+
+    assert {"w:call", "w:john", "w:about"} <= terms
+    assert {"t:to", "t:to/follow-up", "t:home", "t:home/garden"} <= terms
+    assert {"p:projects", "p:projects/alpha"} <= terms
+    assert "w:home" not in terms
+
+
+def test_parse_task_query_terms():
+    """Free text, tags, path and followup turn into index terms."""
+    from src.services.task_query import parse_task_query
+
+    query = parse_task_query("Milk #Home path:Projects/Alpha/ followup")
+
+    assert query.terms == ["w:milk", "t:home", "p:projects/alpha", "t:to/follow-up"]
+    assert query.has_due is None
+
+
+def test_parse_task_query_due_ranges():
+    """due: accepts days, open and closed ranges, overdue, week and none."""
+    from src.services.task_query import parse_task_query
+
+    with patch("src.services.task_query._today", return_value="2026-03-10"):
+        overdue = parse_task_query("due:overdue")
+        week = parse_task_query("due:week")
+    closed = parse_task_query("due:2026-03-01..2026-03-31")
+    open_end = parse_task_query("due:2026-03-01..")
+    none = parse_task_query("due:none")
+
+    assert (overdue.due_from, overdue.due_to) == (None, "2026-03-09")
+    assert (week.due_from, week.due_to) == ("2026-03-10", "2026-03-16")
+    assert closed.matches_due("2026-03-15") and not closed.matches_due("2026-04-01")
+    assert open_end.matches_due("2030-01-01") and not open_end.matches_due(None)
+    assert none.matches_due(None) and not none.matches_due("2026-03-01")
+
+
+def test_parse_task_query_rejects_bad_dates():
+    """Unknown due: values raise TaskQueryError."""
+    from src.services.task_query import TaskQueryError, parse_task_query
+
+    with pytest.raises(TaskQueryError):
+        parse_task_query("due:someday")
@@ -0,0 +1,53 @@
+"""Tests for the persistent undo journal."""
+
+from unittest.mock import patch
+
+
+def test_journal_keeps_only_newest_steps(isolated_data_dir):
+    """The journal is bounded: the oldest steps drop out, newest pops first."""
+    from src.services.undo_journal import UndoJournal
+
+    journal = UndoJournal(isolated_data_dir / "undo.sqlite3", depth=3)
+    for i in range(5):
+        journal.record([{"delete": f"note-{i}.md"}])
+    journal.close()
+
+    reopened = UndoJournal(isolated_data_dir / "undo.sqlite3", depth=3)
+    popped = [reopened.pop() for _ in range(4)]
+    assert popped == [
+        [{"delete": "note-4.md"}],
+        [{"delete": "note-3.md"}],
+        [{"delete": "note-2.md"}],
+        None,
+    ]
+
+
+def test_undo_task_add_and_completion(temp_vault):
+    """Added tasks are cut from the inbox; completed tasks are reopened in place."""
+    from src.services.task_manager import (
+        TASK_PATTERN,
+        _scan_file_for_tasks,
+        add_tasks,
+        complete_tasks,
+    )
+    from src.services.undo_journal import undo_last
+
+    note = temp_vault / "note.md"
+    original = b"- [ ] #to/do A1\r\ntext\r\n- [ ] #to/do A2\r\n"
+    note.write_bytes(original)
+    inbox = temp_vault / "+" / "task-inbox.md"
+    inbox.write_bytes(b"- [ ] #to/do Old\n")
+
+    with patch("src.services.task_manager.settings") as mock_settings:
+        mock_settings.timezone = "UTC"
+        mock_settings.task_tag = "#to/do"
+        mock_settings.task_inbox_path = inbox
+        mock_settings.task_duplicates = "allow"
+        add_tasks(["tasks:", "New 1", "New 2"])
+        assert complete_tasks(_scan_file_for_tasks(note, TASK_PATTERN, None)) == [True, True]
+
+    assert undo_last() == [{"Reopened": ["A1", "A2"]}]
+    assert note.read_bytes() == original
+
+    assert undo_last() == [{"Deleted": ["2 tasks"]}]
+    assert inbox.read_bytes() == b"- [ ] #to/do Old\n"
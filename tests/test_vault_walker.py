@@ -0,0 +1,116 @@
+"""Tests for the vault walker."""
+
+import json
+from unittest.mock import patch
+
+
+def _rel_paths(vault, files):
+    return sorted(f.path.relative_to(vault).as_posix() for f in files)
+
+
+def test_walk_vault_prunes_hidden_dirs(temp_vault):
+    """Hidden folders are never descended into."""
+    from src.services.vault_walker import IgnoreRules, walk_vault
+
+    (temp_vault / ".git" / "objects").mkdir(parents=True)
+    (temp_vault / ".git" / "objects" / "x.md").write_text("x")
+    (temp_vault / "note.md").write_text("x")
+
+    with patch("src.services.vault_walker.os.scandir", wraps=__import__("os").scandir) as spy:
+        files = list(walk_vault(temp_vault, IgnoreRules()))
+
+    assert _rel_paths(temp_vault, files) == ["note.md"]
+    scanned = {str(call.args[0]) for call in spy.call_args_list}
+    assert str(temp_vault / ".git") not in scanned
+
+
+def test_walk_vault_reports_stat_data(temp_vault):
+    """Yielded entries carry mtime and size from the directory scan."""
+    from src.services.vault_walker import IgnoreRules, walk_vault
+
+    note = temp_vault / "note.md"
+    note.write_text("hello")
+
+    (entry,) = walk_vault(temp_vault, IgnoreRules())
+
+    assert entry.size == 5
+    assert entry.mtime_ns == note.stat().st_mtime_ns
+
+
+def test_ignore_globs_by_name_and_path(temp_vault):
+    """Bare names match at any depth; slashed patterns are anchored to the root."""
+    from src.services.vault_walker import IgnoreRules, walk_vault
+
+    for rel in ["Templates/t.md", "a/Templates/t.md", "archive/old/o.md", "x/archive/old/k.md"]:
+        (temp_vault / rel).parent.mkdir(parents=True, exist_ok=True)
+        (temp_vault / rel).write_text("x")
+
+    files = walk_vault(temp_vault, IgnoreRules(["Templates", "/archive/old"]))
+
+    assert _rel_paths(temp_vault, files) == ["x/archive/old/k.md"]
+
+
+def test_obsidian_excluded_files_are_honoured(temp_vault):
+    """userIgnoreFilters in .obsidian/app.json prune folders and regex matches."""
+    from src.services.vault_walker import load_ignore_rules, walk_vault
+
+    (temp_vault / ".obsidian").mkdir()
+    (temp_vault / ".obsidian" / "app.json").write_text(
+        json.dumps({"userIgnoreFilters": ["Templates/", "/^tmp-/"]})
+    )
+    for rel in ["Templates/t.md", "tmp-scratch.md", "keep.md", "sub/Templates/s.md"]:
+        (temp_vault / rel).parent.mkdir(parents=True, exist_ok=True)
+        (temp_vault / rel).write_text("x")
+
+    with patch("src.services.vault_walker.settings") as m:
+        m.vault_ignore_globs = []
+        m.vault_use_obsidian_excludes = True
+        rules = load_ignore_rules(temp_vault)
+
+    assert _rel_paths(temp_vault, walk_vault(temp_vault, rules)) == [
+        "keep.md",
+        "sub/Templates/s.md",
+    ]
+
+
+def test_is_ignored_path_checks_parents(temp_vault):
+    """A file is ignored when any folder above it is."""
+    from src.services.vault_walker import IgnoreRules
+
+    rules = IgnoreRules(["drafts"])
+
+    assert rules.is_ignored_path(temp_vault, temp_vault / "drafts" / "a" / "b.md")
+    assert rules.is_ignored_path(temp_vault, temp_vault / ".trash" / "b.md")
+    assert not rules.is_ignored_path(temp_vault, temp_vault / "notes" / "b.md")
+
+
+def test_walk_vault_dirs_prunes_ignored(temp_vault):
+    """Folder walk used for watches skips ignored folders."""
+    from src.services.vault_walker import IgnoreRules, walk_vault_dirs
+
+    (temp_vault / "a" / "b").mkdir(parents=True)
+    (temp_vault / ".obsidian" / "plugins").mkdir(parents=True)
+    (temp_vault / "cache").mkdir()
+
+    dirs = {
+        p.relative_to(temp_vault).as_posix()
+        for p in walk_vault_dirs(temp_vault, IgnoreRules(["cache"]))
+    }
+
+    assert dirs == {".", "+", "+/attachments", "a", "a/b"}
+
+
+def test_search_tasks_inside_hidden_parent(tmp_path):
+    """A vault living under a hidden folder is still searched."""
+    from src.services.task_manager import search_tasks
+
+    vault = tmp_path / ".hidden-parent" / "vault"
+    vault.mkdir(parents=True)
+    (vault / "tasks.md").write_text("- [ ] #to/do Visible\n")
+
+    with patch("src.services.task_manager.settings") as m:
+        m.vault_path = vault
+        m.task_list_limit = 10
+        tasks = search_tasks()
+
+    assert [t.task_text for t in tasks] == ["- [ ] #to/do Visible"]
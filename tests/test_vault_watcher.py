@@ -0,0 +1,163 @@
+"""Tests for the vault watcher."""
+
+import sys
+import time
+
+import pytest
+
+
+def _index(vault, data_dir):
+    from src.services.task_index import TaskIndex
+
+    return TaskIndex(vault, data_dir / "task-index.sqlite3")
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def _texts(index):
+    return {t.task_text for t in index.search(limit=100)}
+
+
+def test_refresh_updates_and_drops_files(temp_vault, isolated_data_dir):
+    """refresh() re-indexes touched files and forgets deleted ones."""
+    note = temp_vault / "a.md"
+    note.write_text("- [ ] #to/do First\n")
+    index = _index(temp_vault, isolated_data_dir)
+    index.sync()
+
+    note.write_text("- [ ] #to/do First\n- [ ] #to/do Second\n")
+    index.refresh([note])
+    assert _texts(index) == {"- [ ] #to/do First", "- [ ] #to/do Second"}
+
+    note.unlink()
+    index.refresh([note])
+    assert _texts(index) == set()
+
+
+def test_refresh_ignores_hidden_and_non_markdown(temp_vault, isolated_data_dir):
+    """Paths under hidden folders or without .md suffix are never indexed."""
+    hidden = temp_vault / ".obsidian"
+    hidden.mkdir()
+    (hidden / "x.md").write_text("- [ ] #to/do Hidden\n")
+    (temp_vault / "x.txt").write_text("- [ ] #to/do Text\n")
+
+    index = _index(temp_vault, isolated_data_dir)
+    assert index.refresh([hidden / "x.md", temp_vault / "x.txt"]) == 0
+
+
+def test_remove_tree_drops_folder(temp_vault, isolated_data_dir):
+    """remove_tree() forgets every file below a folder."""
+    folder = temp_vault / "projects"
+    folder.mkdir()
+    (folder / "p.md").write_text("- [ ] #to/do Project task\n")
+    (temp_vault / "keep.md").write_text("- [ ] #to/do Keep\n")
+    index = _index(temp_vault, isolated_data_dir)
+    index.sync()
+
+    index.remove_tree(folder)
+
+    assert _texts(index) == {"- [ ] #to/do Keep"}
+
+
+def test_search_tasks_skips_sync_when_watched(temp_vault, isolated_data_dir):
+    """A watched index answers without touching the vault."""
+    from unittest.mock import patch
+
+    from src.services.task_index import get_task_index
+    from src.services.task_manager import search_tasks
+
+    index = get_task_index(temp_vault)
+    index.watched = True
+
+    with (
+        patch("src.services.task_manager.settings") as m,
+        patch.object(index, "sync") as mock_sync,
+    ):
+        m.vault_path = temp_vault
+        m.task_list_limit = 10
+        search_tasks()
+
+    mock_sync.assert_not_called()
+
+
+def test_polling_watcher_reconciles(temp_vault, isolated_data_dir):
+    """Polling backend picks up new files on its next reconcile."""
+    from src.services.vault_watcher import VaultWatcher
+
+    index = _index(temp_vault, isolated_data_dir)
+    watcher = VaultWatcher(index, mode="poll", poll_seconds=0.05)
+    watcher.start()
+    try:
+        assert _wait_for(lambda: index.watched)
+        (temp_vault / "new.md").write_text("- [ ] #to/do Polled\n")
+        assert _wait_for(lambda: "- [ ] #to/do Polled" in _texts(index))
+    finally:
+        watcher.stop()
+    assert index.watched is False
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")
+def test_inotify_watch_limit_falls_back_to_polling(temp_vault, isolated_data_dir):
+    """Hitting the watch limit on a new folder switches the watcher to polling."""
+    import errno
+    from unittest.mock import patch
+
+    from src.services.vault_watcher import InotifyUnavailableError, VaultWatcher, _Inotify
+
+    index = _index(temp_vault, isolated_data_dir)
+    watcher = VaultWatcher(index, mode="inotify", poll_seconds=0.05)
+    watcher.start()
+    try:
+        assert _wait_for(lambda: watcher._inotify is not None and index.watched)
+        with patch.object(
+            _Inotify,
+            "add_watch",
+            side_effect=InotifyUnavailableError(errno.ENOSPC, "inotify watch limit reached"),
+        ):
+            (temp_vault / "projects").mkdir()
+            assert _wait_for(lambda: watcher._inotify is None)
+        (temp_vault / "projects" / "p.md").write_text("- [ ] #to/do Polled\n")
+        assert _wait_for(lambda: "- [ ] #to/do Polled" in _texts(index))
+        assert index.watched is True
+    finally:
+        watcher.stop()
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")
+def test_inotify_watcher_tracks_changes(temp_vault, isolated_data_dir):
+    """inotify backend follows creates, new folders, moves and deletes."""
+    from src.services.vault_watcher import VaultWatcher
+
+    (temp_vault / "existing.md").write_text("- [ ] #to/do Existing\n")
+    index = _index(temp_vault, isolated_data_dir)
+    watcher = VaultWatcher(index, mode="inotify")
+    watcher.start()
+    try:
+        # Startup reconcile covers files that predate the watcher
+        assert _wait_for(lambda: index.watched)
+        assert "- [ ] #to/do Existing" in _texts(index)
+
+        folder = temp_vault / "projects"
+        folder.mkdir()
+        (folder / "p.md").write_text("- [ ] #to/do In folder\n")
+        assert _wait_for(lambda: "- [ ] #to/do In folder" in _texts(index))
+
+        folder.rename(temp_vault / "archive")
+        assert _wait_for(
+            lambda: (
+                {t.file_path for t in index.search(limit=100)}
+                == {temp_vault / "existing.md", temp_vault / "archive" / "p.md"}
+            )
+        )
+
+        (temp_vault / "existing.md").unlink()
+        assert _wait_for(lambda: "- [ ] #to/do Existing" not in _texts(index))
+    finally:
+        watcher.stop()
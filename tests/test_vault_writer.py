@@ -0,0 +1,163 @@
+"""Tests for byte-exact vault writes."""
+
+import os
+
+
+def test_replace_span_keeps_surrounding_bytes_and_mode(tmp_path):
+    """Only the span changes; permissions survive the atomic rename."""
+    from src.services.vault_writer import replace_span
+
+    path = tmp_path / "note.md"
+    path.write_bytes(b"one\r\ntwo\r\nthree")
+    os.chmod(path, 0o640)
+
+    assert replace_span(path, 5, b"two", b"TWO!") is True
+
+    assert path.read_bytes() == b"one\r\nTWO!\r\nthree"
+    assert os.stat(path).st_mode & 0o777 == 0o640
+    assert [p.name for p in tmp_path.iterdir()] == ["note.md"]
+
+
+def test_replace_span_refuses_mismatched_bytes(tmp_path):
+    """Nothing is written when the expected bytes are not at the offset."""
+    from src.services.vault_writer import replace_span
+
+    path = tmp_path / "note.md"
+    path.write_bytes(b"one\ntwo\n")
+
+    assert replace_span(path, 4, b"TWO", b"2") is False
+    assert path.read_bytes() == b"one\ntwo\n"
+
+
+def test_append_bytes_repairs_missing_newline_only(tmp_path):
+    """A newline is added before appending only when the file lacks one."""
+    from src.services.vault_writer import append_bytes
+
+    path = tmp_path / "inbox.md"
+    append_bytes(path, b"one\n")
+    path.write_bytes(path.read_bytes() + b"two")
+    append_bytes(path, b"three\n")
+    append_bytes(path, b"four\n")
+
+    assert path.read_bytes() == b"one\ntwo\nthree\nfour\n"
+
+
+def test_append_bytes_serializes_concurrent_writers(tmp_path):
+    """Concurrent appends never interleave or drop lines."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from src.services.vault_writer import append_bytes
+
+    path = tmp_path / "inbox.md"
+    lines = [f"- [ ] #to/do Task {i}\n".encode() for i in range(200)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda line: append_bytes(path, line), lines))
+
+    assert sorted(path.read_bytes().splitlines(keepends=True)) == sorted(lines)
+
+
+def test_create_exclusive_only_creates_new_files(tmp_path):
+    """The first writer creates the file; later ones leave it untouched."""
+    from src.services.vault_writer import create_exclusive
+
+    path = tmp_path / "note.md"
+    assert create_exclusive(path, b"first\n") is True
+    assert create_exclusive(path, b"second\n") is False
+
+    assert path.read_bytes() == b"first\n"
+    assert (path.stat().st_mode & 0o777) == 0o644
+    assert list(tmp_path.glob(".*.tmp")) == []
+
+
+def test_create_unique_counts_suffixes_without_probing(tmp_path):
+    """Names taken on disk are skipped once; later files go straight to the next suffix."""
+    import os
+    from unittest.mock import patch
+
+    from src.services import vault_writer
+
+    (tmp_path / "note.md").write_bytes(b"old")
+    (tmp_path / "note-2.md").write_bytes(b"old")
+
+    with patch.object(os, "link", wraps=os.link) as link, patch.object(os, "stat") as stat:
+        created = [vault_writer.create_unique(tmp_path / "note.md", b"new") for _ in range(3)]
+
+    assert [p.name for p in created] == ["note-3.md", "note-4.md", "note-5.md"]
+    assert link.call_count == 5  # two taken names, then one attempt per file
+    stat.assert_not_called()
+    assert (tmp_path / "note.md").read_bytes() == b"old"
+    assert all(p.read_bytes() == b"new" for p in created)
+
+
+def test_durability_modes_control_fsync(tmp_path, monkeypatch):
+    """fsync flushes file and folder per write, none never, group in the background.
+
+    Group mode still flushes a rewrite before renaming it over the existing note.
+    """
+    import os
+    import time
+    from unittest.mock import patch
+
+    from src.config import settings
+    from src.services import vault_writer
+
+    path = tmp_path / "note.md"
+    path.write_bytes(b"x")
+    calls = {}
+    for mode in ("fsync", "none", "group"):
+        monkeypatch.setattr(settings, "vault_durability", mode)
+        monkeypatch.setattr(settings, "vault_group_commit_ms", 10_000)
+        with patch.object(os, "fsync", wraps=os.fsync) as fsync:
+            vault_writer.replace_span(path, 0, b"x", b"x")
+            vault_writer.append_bytes(path, b"\n")
+            calls[mode] = fsync.call_count
+            if mode == "group":
+                vault_writer.flush_pending()
+                calls["group flushed"] = fsync.call_count
+
+    # fsync: temp file + folder for the rename, then the append; group: the temp file
+    assert calls == {"fsync": 3, "none": 0, "group": 1, "group flushed": 3}
+
+    # The background thread flushes on its own after the interval
+    monkeypatch.setattr(settings, "vault_group_commit_ms", 1)
+    monkeypatch.setattr(vault_writer, "_group_committer", vault_writer._GroupCommitter())
+    with patch.object(os, "fsync", wraps=os.fsync) as fsync:
+        vault_writer.append_bytes(path, b"more\n")
+        deadline = time.monotonic() + 2
+        while fsync.call_count < 2 and time.monotonic() < deadline:
+            time.sleep(0.005)
+    assert fsync.call_count == 2
+
+
+def test_failed_write_leaves_original_intact(tmp_path):
+    """A write that dies before the rename leaves the old file and no temp behind."""
+    import os
+    from unittest.mock import patch
+
+    import pytest
+
+    from src.services.vault_writer import replace_span
+
+    path = tmp_path / "project.md"
+    path.write_bytes(b"- [ ] one\n- [ ] two\n")
+
+    with patch.object(os, "replace", side_effect=OSError("disk gone")), pytest.raises(OSError):
+        replace_span(path, 0, b"- [ ] one", b"- [x] one")
+
+    assert path.read_bytes() == b"- [ ] one\n- [ ] two\n"
+    assert list(tmp_path.glob(".*.tmp")) == []
+
+
+def test_file_locks_are_shared_while_held_and_then_dropped(tmp_path):
+    """Writers of one path share a lock; idle paths leave no lock behind."""
+    from src.services import vault_writer
+
+    path = tmp_path / "note.md"
+    held = vault_writer.file_lock(path)
+    with held:
+        assert vault_writer.file_lock(tmp_path / "." / "note.md") is held
+    del held
+
+    for i in range(50):
+        vault_writer.append_bytes(tmp_path / f"note-{i}.md", b"x\n")
+    assert not any(key.is_relative_to(tmp_path) for key in vault_writer._file_locks)
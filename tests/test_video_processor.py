@@ -1,83 +1,55 @@
 """Tests for video_processor service."""
 
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import pytest
 
-def test_extract_audio_from_video_calls_pydub():
-    """Test that audio extraction uses pydub correctly."""
+
+def test_extract_audio_from_video_calls_pydub(tmp_path):
+    """Test that audio extraction reads the video file with pydub."""
     from src.services.video_processor import extract_audio_from_video
 
-    fake_video_data = b"fake video data"
-    fake_mp3_data = b"fake mp3 data"
-
-    with (
-        patch("src.services.video_processor.tempfile") as mock_tempfile,
-        patch("src.services.video_processor.AudioSegment") as mock_audio_segment,
-        patch("src.services.video_processor.Path") as mock_path_class,
-    ):
-        # Setup temp file mock
-        mock_temp_file = MagicMock()
-        mock_temp_file.__enter__ = MagicMock(return_value=mock_temp_file)
-        mock_temp_file.__exit__ = MagicMock(return_value=False)
-        mock_temp_file.name = "/tmp/test.mp4"
-        mock_tempfile.NamedTemporaryFile.return_value = mock_temp_file
-
-        # Setup path mock
-        mock_video_path = MagicMock()
-        mock_mp3_path = MagicMock()
-        mock_mp3_path.read_bytes.return_value = fake_mp3_data
-        mock_video_path.with_suffix.return_value = mock_mp3_path
-        mock_path_class.return_value = mock_video_path
-
-        # Setup audio segment mock
+    video_path = tmp_path / "vid.mp4"
+    video_path.write_bytes(b"fake video data")
+
+    def export(mp3_path, format):
+        Path(mp3_path).write_bytes(b"fake mp3 data")
+
+    with patch("src.services.video_processor.AudioSegment") as mock_audio_segment:
         mock_audio = MagicMock()
+        mock_audio.export.side_effect = export
         mock_audio_segment.from_file.return_value = mock_audio
 
-        result = extract_audio_from_video(fake_video_data, "mp4")
-
-        # Verify pydub was called
-        mock_audio_segment.from_file.assert_called_once_with(mock_video_path, format="mp4")
-        mock_audio.export.assert_called_once_with(mock_mp3_path, format="mp3")
+        result = extract_audio_from_video(video_path, "mp4")
 
-        # Verify cleanup was called
-        mock_video_path.unlink.assert_called_once()
-        mock_mp3_path.unlink.assert_called_once()
+    # Verify pydub read the file in place
+    mock_audio_segment.from_file.assert_called_once_with(video_path, format="mp4")
+    assert result == b"fake mp3 data"
 
-        assert result == fake_mp3_data
+    # The video is left alone and nothing is written next to it
+    assert list(tmp_path.iterdir()) == [video_path]
 
 
-def test_extract_audio_cleanup_on_error():
+def test_extract_audio_cleanup_on_error(tmp_path):
     """Test that temp files are cleaned up even on error."""
     from src.services.video_processor import extract_audio_from_video
 
-    fake_video_data = b"fake video data"
-
-    with (
-        patch("src.services.video_processor.tempfile") as mock_tempfile,
-        patch("src.services.video_processor.AudioSegment") as mock_audio_segment,
-        patch("src.services.video_processor.Path") as mock_path_class,
-    ):
-        # Setup temp file mock
-        mock_temp_file = MagicMock()
-        mock_temp_file.__enter__ = MagicMock(return_value=mock_temp_file)
-        mock_temp_file.__exit__ = MagicMock(return_value=False)
-        mock_temp_file.name = "/tmp/test.mp4"
-        mock_tempfile.NamedTemporaryFile.return_value = mock_temp_file
-
-        # Setup path mock
-        mock_video_path = MagicMock()
-        mock_mp3_path = MagicMock()
-        mock_video_path.with_suffix.return_value = mock_mp3_path
-        mock_path_class.return_value = mock_video_path
-
-        # Make pydub raise an error
-        mock_audio_segment.from_file.side_effect = Exception("Codec error")
-
-        try:
-            extract_audio_from_video(fake_video_data, "mp4")
-        except Exception:
-            pass
-
-        # Verify cleanup was still called
-        mock_video_path.unlink.assert_called_once()
-        mock_mp3_path.unlink.assert_called_once()
+    video_path = tmp_path / "vid.mp4"
+    video_path.write_bytes(b"fake video data")
+    temp_dirs = []
+
+    def export(mp3_path, format):
+        temp_dirs.append(Path(mp3_path).parent)
+        Path(mp3_path).write_bytes(b"partial")
+        raise Exception("Codec error")
+
+    with patch("src.services.video_processor.AudioSegment") as mock_audio_segment:
+        mock_audio_segment.from_file.return_value.export.side_effect = export
+
+        with pytest.raises(Exception, match="Codec error"):
+            extract_audio_from_video(video_path, "mp4")
+
+    # Verify cleanup was still done
+    assert temp_dirs and not temp_dirs[0].exists()
+    assert video_path.exists()